@@ -0,0 +1,175 @@
+"""
+Нагрузочный бенчмарк HTTP-сервиса запросов к БД: задержка ответа (p50/p99) и запросов/с
+при заданном количестве одновременных клиентов.
+Задержки и запросы/с считаются только по успешным ответам (2xx и 304); при ошибочных ответах
+результаты сохраняются, но бенчмарк завершается с ненулевым кодом.
+
+Пример запуска из корня проекта (сервис запускается в том же процессе на БД --dbname):
+    python -m benchmarks.bench_api --clients 32 --duration 10
+Для уже запущенного сервиса (python -m src.cli serve):
+    python -m benchmarks.bench_api --url http://127.0.0.1:8080 --clients 32
+"""
+
+import argparse
+import http.client
+import json
+import os
+import platform
+import sys
+import threading
+import time
+from datetime import datetime, timezone
+from typing import Any
+from urllib.parse import urlparse
+
+from benchmarks.bench_ingest import RESULTS_DIR, git_revision
+
+# Запросы, которые клиенты выполняют по кругу
+PATHS = [
+    "/companies",
+    "/stats",
+    "/avg-salary",
+    "/vacancies?limit=100",
+    "/vacancies/higher-salary?limit=100",
+    "/vacancies/keyword?q=python&limit=100",
+    "/search?q=python&limit=50",
+]
+
+
+def percentile(values: list[float], q: float) -> float:
+    """Перцентиль q (0..100) отсортированного списка"""
+    if not values:
+        return 0.0
+    index = min(len(values) - 1, max(0, round(q / 100 * len(values)) - 1))
+    return values[index]
+
+
+def _is_ok(status: int) -> bool:
+    """Успешный ответ: 2xx или 304 (ответ не изменился); 0 - ошибка соединения"""
+    return 200 <= status < 300 or status == 304
+
+
+def _client(url: str, deadline: float, offset: int, revalidate: bool, results: list[tuple[str, int, float]]) -> None:
+    """Клиент с постоянным соединением, выполняющий запросы PATHS до момента deadline"""
+    parsed = urlparse(url)
+    conn = http.client.HTTPConnection(parsed.hostname or "127.0.0.1", parsed.port or 80, timeout=30)
+    etags: dict[str, str] = {}
+    local = []
+    n = offset
+    while time.perf_counter() < deadline:
+        path = PATHS[n % len(PATHS)]
+        n += 1
+        headers = {"If-None-Match": etags[path]} if revalidate and path in etags else {}
+        started = time.perf_counter()
+        try:
+            conn.request("GET", path, headers=headers)
+            response = conn.getresponse()
+            response.read()
+        except (OSError, http.client.HTTPException):
+            conn.close()
+            local.append((path, 0, time.perf_counter() - started))
+            continue
+        local.append((path, response.status, time.perf_counter() - started))
+        etag = response.getheader("ETag")
+        if etag:
+            etags[path] = etag
+    conn.close()
+    results.extend(local)
+
+
+def run(args: argparse.Namespace) -> dict[str, Any]:
+    """Запуск бенчмарка и формирование результатов"""
+    server = dbmanager = None
+    url = args.url
+    if url is None:
+        from src.api_server import ApiServer
+        from src.config import config
+        from src.DBManager import DBManager
+
+        dbmanager = DBManager(args.dbname, config(args.config), maxconn=args.maxconn, cache_bytes=args.cache_bytes)
+        server = ApiServer(dbmanager, port=0, cache_ttl=args.cache_ttl).start()
+        url = server.url
+
+    results: list[tuple[str, int, float]] = []
+    started = time.perf_counter()
+    deadline = started + args.duration
+    threads = [
+        threading.Thread(target=_client, args=(url, deadline, client_n, args.revalidate, results))
+        for client_n in range(args.clients)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - started
+
+    if server is not None:
+        server.stop()
+    if dbmanager is not None:
+        dbmanager.disconnect()
+
+    # Задержки считаются только по успешным ответам (2xx и 304), ошибки учитываются отдельно
+    ok_results = [result for result in results if _is_ok(result[1])]
+    latencies = sorted(latency for _, _, latency in ok_results)
+    per_path = {}
+    for path in PATHS:
+        path_latencies = sorted(latency for result_path, _, latency in ok_results if result_path == path)
+        per_path[path] = {
+            "requests": len(path_latencies),
+            "errors": sum(1 for result_path, status, _ in results if result_path == path and not _is_ok(status)),
+            "p50_ms": round(percentile(path_latencies, 50) * 1000, 2),
+            "p99_ms": round(percentile(path_latencies, 99) * 1000, 2),
+        }
+    statuses: dict[str, int] = {}
+    for _, status, _ in results:
+        statuses[str(status)] = statuses.get(str(status), 0) + 1
+
+    return {
+        "benchmark": "api",
+        "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "revision": git_revision(),
+        "python": platform.python_version(),
+        "parameters": vars(args),
+        "results": {
+            "requests": len(ok_results),
+            "errors": len(results) - len(ok_results),
+            "requests_per_second": round(len(ok_results) / elapsed, 1),
+            "p50_ms": round(percentile(latencies, 50) * 1000, 2),
+            "p99_ms": round(percentile(latencies, 99) * 1000, 2),
+            "statuses": statuses,
+            "paths": per_path,
+        },
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Нагрузочный бенчмарк HTTP-сервиса запросов к БД")
+    parser.add_argument("--url", help="адрес запущенного сервиса (по умолчанию сервис запускается в процессе)")
+    parser.add_argument("--clients", type=int, default=16, help="количество одновременных клиентов")
+    parser.add_argument("--duration", type=float, default=10.0, help="длительность нагрузки, с")
+    parser.add_argument("--revalidate", action="store_true", help="отправлять If-None-Match с полученным ETag")
+    parser.add_argument("--dbname", default="vacancies_db", help="имя БД")
+    parser.add_argument("--config", default="database.ini", help="файл с параметрами подключения к PostgreSQL")
+    parser.add_argument("--maxconn", type=int, default=10, help="максимальное количество соединений с БД")
+    parser.add_argument("--cache-ttl", type=float, default=5.0, help="время жизни ответов в кэше сервиса, с")
+    parser.add_argument("--cache-bytes", type=int, default=64 * 1024 * 1024, help="объём кэша результатов DBManager")
+    parser.add_argument("--output", help="файл для сохранения результатов (по умолчанию benchmarks/results/)")
+    args = parser.parse_args()
+
+    report = run(args)
+    output = args.output
+    if output is None:
+        os.makedirs(RESULTS_DIR, exist_ok=True)
+        stamp = datetime.now().strftime("%Y%m%d-%H%M%S")
+        output = os.path.join(RESULTS_DIR, f"api-{report['revision']}-{stamp}.json")
+    with open(output, "w", encoding="utf-8") as file:
+        json.dump(report, file, ensure_ascii=False, indent=2)
+
+    print(json.dumps(report["results"], ensure_ascii=False, indent=2))
+    print(f"Результаты сохранены в {output}")
+    if report["results"]["errors"]:
+        sys.exit(f"Ошибочных ответов: {report['results']['errors']}, статусы: {report['results']['statuses']}")
+
+
+if __name__ == "__main__":
+    main()
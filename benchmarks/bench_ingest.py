@@ -0,0 +1,145 @@
+"""
+Бенчмарк загрузки: получение данных get_hh_data_full с локального имитатора API HH.ru
+и запись в PostgreSQL через save_data_to_database.
+
+Пример запуска из корня проекта:
+    python -m benchmarks.bench_ingest --employers 1000 --pages 20 --latency 0.02
+С --pipeline получение и запись выполняются одновременно (src.pipeline), измеряется общее время:
+    python -m benchmarks.bench_ingest --employers 1000 --pages 20 --latency 0.02 --pipeline
+"""
+
+import argparse
+import json
+import os
+import platform
+import resource
+import subprocess
+import sys
+import time
+from datetime import datetime, timezone
+from typing import Any
+
+from benchmarks.fake_hh_server import FakeHHServer
+from src import HH_api, metrics, rate_limit, transport
+
+RESULTS_DIR = os.path.join(os.path.dirname(__file__), "results")
+
+
+def peak_rss_mb() -> float:
+    """Пиковый объём резидентной памяти процесса в МБ"""
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # В macOS значение в байтах, в Linux - в килобайтах
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+def git_revision() -> str:
+    """Текущая ревизия git (для сравнения результатов между версиями)"""
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def run(args: argparse.Namespace) -> dict[str, Any]:
+    """Запуск бенчмарка и формирование результатов"""
+    metrics.enable()
+    pipelined = args.pipeline and not args.skip_db
+    if pipelined:
+        from src.config import config
+        from src.pipeline import run_pipeline
+
+        params = config(args.config)
+    with FakeHHServer(args.employers, args.pages, args.per_page, args.latency, args.error_rate) as server:
+        HH_api.HH_API_URL = server.url
+        # Повторы после ошибок имитатора не должны искажать время ожиданием
+        transport.BACKOFF_MAX = 0.0
+        if args.rate_limit:
+            rate_limit.configure(max_rate=args.rate_limit)
+        else:
+            rate_limit.disable()
+
+        started = time.perf_counter()
+        if pipelined:
+            # Получение и запись выполняются одновременно, поэтому измеряется только общее время
+            run_pipeline(server.employers_id, args.dbname, params, workers=args.workers, queue_size=args.queue_size)
+            hh_data = []
+            rows_count = args.employers * args.pages * args.per_page
+        else:
+            hh_data = HH_api.get_hh_data_full(server.employers_id, max_workers=args.workers)
+            rows_count = sum(len(company["vacancies"]) for company in hh_data)
+        fetch_seconds = time.perf_counter() - started
+        requests_count = server.requests
+        errors_count = server.errors
+
+    result: dict[str, Any] = {
+        "fetch_seconds": None if pipelined else round(fetch_seconds, 3),
+        "requests": requests_count,
+        "injected_errors": errors_count,
+        "requests_per_second": round(requests_count / fetch_seconds, 1),
+        "vacancies": rows_count,
+        "rate_limit": rate_limit.stats() if args.rate_limit else None,
+    }
+
+    total_seconds = fetch_seconds
+    if not args.skip_db and not pipelined:
+        from src.config import config
+        from src.database_utils import create_database, save_data_to_database
+
+        params = config(args.config)
+        create_database(args.dbname, params)
+        started = time.perf_counter()
+        save_data_to_database(hh_data, args.dbname, params)
+        load_seconds = time.perf_counter() - started
+        total_seconds += load_seconds
+        result["load_seconds"] = round(load_seconds, 3)
+        result["load_rows_per_second"] = round(rows_count / load_seconds, 1)
+
+    result["total_seconds"] = round(total_seconds, 3)
+    result["rows_per_second"] = round(rows_count / total_seconds, 1)
+    result["peak_rss_mb"] = round(peak_rss_mb(), 1)
+
+    return {
+        "benchmark": "ingest",
+        "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "revision": git_revision(),
+        "python": platform.python_version(),
+        "parameters": vars(args),
+        "results": result,
+        "metrics": metrics.snapshot(),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Бенчмарк загрузки вакансий с локального имитатора API HH.ru")
+    parser.add_argument("--employers", type=int, default=1000, help="количество работодателей")
+    parser.add_argument("--pages", type=int, default=20, help="количество страниц вакансий у работодателя")
+    parser.add_argument("--per-page", type=int, default=100, help="количество вакансий на странице")
+    parser.add_argument("--latency", type=float, default=0.0, help="задержка ответа сервера, с")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="доля ответов 503")
+    parser.add_argument("--workers", type=int, default=HH_api.MAX_WORKERS, help="количество одновременных запросов")
+    parser.add_argument("--rate-limit", type=float, default=0.0, help="максимальная частота запросов в секунду")
+    parser.add_argument("--dbname", default="bench_vacancies_db", help="имя БД для загрузки")
+    parser.add_argument("--config", default="database.ini", help="файл с параметрами подключения к PostgreSQL")
+    parser.add_argument("--pipeline", action="store_true", help="получать и записывать данные одновременно")
+    parser.add_argument("--queue-size", type=int, default=64, help="максимум страниц, ожидающих записи (--pipeline)")
+    parser.add_argument("--skip-db", action="store_true", help="измерять только получение данных")
+    parser.add_argument("--output", help="файл для сохранения результатов (по умолчанию benchmarks/results/)")
+    args = parser.parse_args()
+
+    report = run(args)
+    output = args.output
+    if output is None:
+        os.makedirs(RESULTS_DIR, exist_ok=True)
+        stamp = datetime.now().strftime("%Y%m%d-%H%M%S")
+        output = os.path.join(RESULTS_DIR, f"ingest-{report['revision']}-{stamp}.json")
+    with open(output, "w", encoding="utf-8") as file:
+        json.dump(report, file, ensure_ascii=False, indent=2)
+
+    print(json.dumps(report["results"], ensure_ascii=False, indent=2))
+    print(f"Результаты сохранены в {output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,58 @@
+"""
+Бенчмарк памяти: сравнение записей Vacancy со словарями с теми же полями.
+Вакансии формируются из ответов локального имитатора API HH.ru без обращения к сети.
+
+Пример запуска из корня проекта:
+    python -m benchmarks.bench_records --vacancies 200000
+"""
+
+import argparse
+import json
+import tracemalloc
+from typing import Any, Callable
+
+from benchmarks.fake_hh_server import FakeHHServer
+from src.models import Vacancy
+
+
+def _as_dict(vac: dict[str, Any]) -> dict[str, Any]:
+    """Прежнее представление вакансии - словарь с теми же полями"""
+    return Vacancy.from_api(vac)._asdict()
+
+
+def measure(items: list[dict[str, Any]], parse: Callable[[dict[str, Any]], Any]) -> float:
+    """Количество байт, выделенных на одну вакансию при разборе items функцией parse"""
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    records = [parse(vac) for vac in items]
+    allocated = tracemalloc.get_traced_memory()[0] - before
+    tracemalloc.stop()
+    del records
+    return allocated / len(items)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Сравнение памяти записей Vacancy и словарей")
+    parser.add_argument("--vacancies", type=int, default=200000, help="количество вакансий")
+    args = parser.parse_args()
+
+    per_page = 100
+    pages = (args.vacancies + per_page - 1) // per_page
+    server = FakeHHServer(employers=1, pages=pages, per_page=per_page, search_depth=None)
+    items = []
+    for page in range(server.pages):
+        items.extend(server.vacancies("1", page, per_page)["items"])
+
+    dict_bytes = measure(items, _as_dict)
+    record_bytes = measure(items, Vacancy.from_api)
+    result = {
+        "vacancies": len(items),
+        "dict_bytes_per_vacancy": round(dict_bytes, 1),
+        "record_bytes_per_vacancy": round(record_bytes, 1),
+        "reduction": round(1 - record_bytes / dict_bytes, 3),
+    }
+    print(json.dumps(result, indent=2))
+
+
+if __name__ == "__main__":
+    main()
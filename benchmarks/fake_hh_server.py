@@ -0,0 +1,197 @@
+import json
+import math
+import random
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any
+from urllib.parse import parse_qs, urlparse
+
+CURRENCIES = ["RUR", "RUR", "RUR", "USD", "KZT", None]
+# Глубина выдачи поиска, как у API HH.ru (page * per_page)
+SEARCH_DEPTH = 2000
+# Интервал между датами публикации соседних вакансий
+PUBLISH_STEP = timedelta(minutes=10)
+
+
+class FakeHHServer:
+    """
+    Локальный HTTP-сервер, имитирующий /employers/{id} и постраничную выдачу /vacancies API HH.ru.
+    Позволяет задать размер набора данных, задержку ответа и долю ответов с ошибкой 503.
+    Как и API HH.ru, поддерживает фильтры date_from/date_to и отдаёт не более search_depth результатов запроса
+    (search_depth=None снимает ограничение, например, чтобы получить весь набор данных без фильтров).
+    """
+
+    def __init__(
+        self,
+        employers: int = 1000,
+        pages: int = 20,
+        per_page: int = 100,
+        latency: float = 0.0,
+        error_rate: float = 0.0,
+        seed: int = 0,
+        search_depth: int | None = SEARCH_DEPTH,
+    ) -> None:
+        """Инициализация параметров сервера"""
+        self.employers = employers
+        self.pages = pages
+        self.per_page = per_page
+        self.latency = latency
+        self.error_rate = error_rate
+        self.search_depth = search_depth
+        self.requests = 0
+        self.errors = 0
+        self._random = random.Random(seed)
+        # Вакансия n опубликована в момент published(n): чем больше n, тем раньше
+        self._newest = datetime.now(timezone.utc).replace(microsecond=0)
+        self._lock = threading.Lock()
+        self._server: ThreadingHTTPServer | None = None
+        self._thread: threading.Thread | None = None
+
+    @property
+    def url(self) -> str:
+        """Адрес запущенного сервера"""
+        assert self._server is not None
+        host, port = self._server.server_address[:2]
+        return f"http://{host!s}:{port}"
+
+    @property
+    def employers_id(self) -> list[str]:
+        """Список ID работодателей, известных серверу"""
+        return [str(employer_id) for employer_id in range(1, self.employers + 1)]
+
+    def start(self) -> "FakeHHServer":
+        """Запуск сервера в фоновом потоке на свободном порту"""
+        server = ThreadingHTTPServer(("127.0.0.1", 0), self._handler_class())
+        server.daemon_threads = True
+        self._server = server
+        self._thread = threading.Thread(target=server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        """Остановка сервера"""
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+
+    def __enter__(self) -> "FakeHHServer":
+        return self.start()
+
+    def __exit__(self, exc_type: Any, exc_val: Any, exc_tb: Any) -> None:
+        self.stop()
+
+    def _should_fail(self) -> bool:
+        """Подсчёт запроса и решение, вернуть ли ошибку"""
+        with self._lock:
+            self.requests += 1
+            fail = self._random.random() < self.error_rate
+            if fail:
+                self.errors += 1
+            return fail
+
+    def employer(self, employer_id: str) -> dict[str, Any] | None:
+        """Ответ /employers/{id}"""
+        if not employer_id.isdigit() or not 1 <= int(employer_id) <= self.employers:
+            return None
+        return {
+            "id": employer_id,
+            "name": f"Компания {employer_id}",
+            "area": {"name": "Москва"},
+            "open_vacancies": self.pages * self.per_page,
+            "industries": [{"name": "Информационные технологии"}],
+            "alternate_url": f"https://hh.ru/employer/{employer_id}",
+            "vacancies_url": f"https://api.hh.ru/vacancies?employer_id={employer_id}",
+        }
+
+    def published(self, n: int) -> datetime:
+        """Дата публикации вакансии с номером n"""
+        return self._newest - n * PUBLISH_STEP
+
+    def vacancies(
+        self, employer_id: str, page: int, per_page: int, date_from: str | None = None, date_to: str | None = None
+    ) -> dict[str, Any]:
+        """Ответ /vacancies для страницы page работодателя employer_id"""
+        per_page = min(per_page, self.per_page)
+        total = self.pages * self.per_page if self.employer(employer_id) is not None else 0
+        # Номера вакансий [first, last), опубликованных в интервале [date_from, date_to]
+        first, last = 0, total
+        if date_to:
+            first = max(first, math.ceil((self._newest - datetime.fromisoformat(date_to)) / PUBLISH_STEP))
+        if date_from:
+            last = min(last, math.floor((self._newest - datetime.fromisoformat(date_from)) / PUBLISH_STEP) + 1)
+        found = max(0, last - first)
+        depth = found if self.search_depth is None else min(found, self.search_depth)
+        pages = (depth + per_page - 1) // per_page
+        items = []
+        if page < pages:
+            for n in range(first + page * per_page, min(last, first + (page + 1) * per_page)):
+                vacancy_id = f"{employer_id}{n:06d}"
+                currency = CURRENCIES[n % len(CURRENCIES)]
+                salary = None
+                if currency is not None:
+                    salary = {"from": 50000 + n * 10, "to": 90000 + n * 10, "currency": currency}
+                items.append(
+                    {
+                        "id": vacancy_id,
+                        "name": f"Python-разработчик {n}" if n % 3 else f"Аналитик данных {n}",
+                        "area": {"name": "Москва"},
+                        "salary": salary,
+                        "published_at": self.published(n).strftime("%Y-%m-%dT%H:%M:%S%z"),
+                        "snippet": {"responsibility": f"Разработка сервисов и поддержка проекта {n}"},
+                        "alternate_url": f"https://hh.ru/vacancy/{vacancy_id}",
+                    }
+                )
+        return {"items": items, "found": found, "pages": pages, "page": page, "per_page": per_page}
+
+    def _handler_class(self) -> type[BaseHTTPRequestHandler]:
+        """Класс обработчика запросов, привязанный к этому серверу"""
+        fake = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+            # Заголовки и тело отправляются отдельными записями, без этого ответы задерживаются алгоритмом Нейгла
+            disable_nagle_algorithm = True
+
+            def do_GET(self) -> None:
+                if fake.latency:
+                    time.sleep(fake.latency)
+                if fake._should_fail():
+                    self._send(503, {"errors": [{"type": "service_unavailable"}]}, {"Retry-After": "0"})
+                    return
+                parsed = urlparse(self.path)
+                query = {key: values[0] for key, values in parse_qs(parsed.query).items()}
+                if parsed.path.startswith("/employers/"):
+                    body = fake.employer(parsed.path.rsplit("/", 1)[-1])
+                    if body is None:
+                        self._send(404, {"errors": [{"type": "not_found"}]})
+                    else:
+                        self._send(200, body)
+                elif parsed.path == "/vacancies":
+                    body = fake.vacancies(
+                        query.get("employer_id", ""),
+                        int(query.get("page", 0)),
+                        int(query.get("per_page", 20)),
+                        query.get("date_from"),
+                        query.get("date_to"),
+                    )
+                    self._send(200, body)
+                else:
+                    self._send(404, {"errors": [{"type": "not_found"}]})
+
+            def _send(self, status: int, body: dict[str, Any], headers: dict[str, str] | None = None) -> None:
+                data = json.dumps(body, ensure_ascii=False).encode("utf-8")
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json; charset=utf-8")
+                self.send_header("Content-Length", str(len(data)))
+                for name, value in (headers or {}).items():
+                    self.send_header(name, value)
+                self.end_headers()
+                self.wfile.write(data)
+
+            def log_message(self, format: str, *args: Any) -> None:
+                pass
+
+        return Handler
@@ -1,13 +1,25 @@
-from src.config import config
+import os
+
+from src.config import config, load_employers
 from src.database_utils import create_database, save_data_to_database
 from src.DBManager import DBManager
 from src.HH_api import get_hh_data_full, get_hh_data_short
+from src.transport import enable_cache
+
+# Файл со списком ID компаний (если его нет, используются компании по умолчанию)
+EMPLOYERS_FILE = "employers.txt"
+# Переменная окружения с каталогом дискового кэша ответов API (если не задана, кэш не используется)
+CACHE_DIR_ENV = "HH_CACHE_DIR"
 
 
 def main() -> None:
     """Функция взаимодействия с пользователем. Объединяет логику проекта"""
     # Записываем ID выбранных компаний переменную
     employers_id = ["15478", "1740", "3529", "78638", "4181", "80", "1057", "3776", "2381", "84585"]
+    if os.path.exists(EMPLOYERS_FILE):
+        employers_id = load_employers(EMPLOYERS_FILE)
+    if os.environ.get(CACHE_DIR_ENV):
+        enable_cache(os.environ[CACHE_DIR_ENV])
     running = True
 
     # Запускаем цикл
@@ -0,0 +1,131 @@
+import asyncio
+from abc import ABC, abstractmethod
+from typing import Any, Tuple
+
+from src import metrics
+from src.DBManager import (ALL_VACANCIES_QUERY, AVG_SALARY_QUERY, COMPANIES_COUNT_QUERY, HIGHER_SALARY_QUERY,
+                           KEYWORD_QUERY, SEARCH_QUERY)
+
+
+class AsyncDBase(ABC):
+    """Абстрактный класс для асинхронной работы с базой данных о вакансиях (асинхронный аналог DBase)"""
+
+    @abstractmethod
+    async def connect(self) -> Any:
+        pass    # pragma: no cover
+
+    @abstractmethod
+    async def disconnect(self) -> None:
+        pass    # pragma: no cover
+
+    @abstractmethod
+    async def get_companies_and_vacancies_count(self) -> list[Tuple]:
+        pass    # pragma: no cover
+
+    @abstractmethod
+    async def get_all_vacancies(self) -> list[Tuple]:
+        pass    # pragma: no cover
+
+    @abstractmethod
+    async def get_avg_salary(self) -> float:
+        pass    # pragma: no cover
+
+    @abstractmethod
+    async def get_vacancies_with_higher_salary(self) -> list[Tuple]:
+        pass    # pragma: no cover
+
+    @abstractmethod
+    async def get_vacancies_with_keyword(self, keyword: str) -> list[Tuple]:
+        pass    # pragma: no cover
+
+
+class AsyncDBManager(AsyncDBase):
+    """
+    Асинхронный класс для работы с базой данных вакансий на драйвере psycopg 3. Наследуется от AsyncDBase.
+    Запросы выполняются на соединениях из асинхронного пула, поэтому несколько запросов
+    из одного цикла событий выполняются одновременно (не более maxconn, остальные ожидают соединения).
+    Требует установленных пакетов psycopg и psycopg_pool: pip install "psycopg[pool]".
+    """
+
+    def __init__(self, dbname: str, params: dict, minconn: int = 1, maxconn: int = 10) -> None:
+        """Инициализация параметров подключения и размеров пула соединений"""
+        self.dbname = dbname
+        self.params = params
+        self.minconn = minconn
+        self.maxconn = maxconn
+        self.pool: Any = None
+        self._pool_lock = asyncio.Lock()
+
+    async def connect(self) -> Any:
+        """Открытие пула соединений с базой данных. Возвращает пул (повторный вызов возвращает открытый пул)."""
+        async with self._pool_lock:
+            if self.pool is None:
+                try:
+                    from psycopg_pool import AsyncConnectionPool
+                except ImportError as e:
+                    raise ImportError('Для AsyncDBManager установите psycopg 3: pip install "psycopg[pool]"') from e
+                pool = AsyncConnectionPool(
+                    kwargs={"dbname": self.dbname, "autocommit": True, **self.params},
+                    min_size=self.minconn,
+                    max_size=self.maxconn,
+                    open=False,
+                )
+                await pool.open()
+                self.pool = pool
+            return self.pool
+
+    async def disconnect(self) -> None:
+        """Закрытие всех соединений пула"""
+        async with self._pool_lock:
+            if self.pool is not None:
+                await self.pool.close()
+                self.pool = None
+
+    async def __aenter__(self) -> "AsyncDBManager":
+        """Поддержка асинхронного контекстного менеджера"""
+        await self.connect()
+        return self
+
+    async def __aexit__(self, exc_type: Any, exc_val: Any, exc_tb: Any) -> None:
+        """Поддержка асинхронного контекстного менеджера"""
+        await self.disconnect()
+
+    async def _fetchall(self, method: str, query: str, params: Tuple | None = None) -> list[Tuple]:
+        """Выполнение запроса на соединении из пула и получение всех строк результата"""
+        pool = await self.connect()
+        with metrics.timer("db_query_seconds", method=method):
+            async with pool.connection() as conn:
+                async with conn.cursor() as cur:
+                    await cur.execute(query, params)
+                    result: list[Tuple] = await cur.fetchall()
+        return result
+
+    async def get_companies_and_vacancies_count(self) -> list[Tuple]:
+        """Получение списка всех компаний и количества вакансий у каждой компании."""
+        return await self._fetchall("get_companies_and_vacancies_count", COMPANIES_COUNT_QUERY)
+
+    async def get_all_vacancies(self) -> list[Tuple]:
+        """Получение списка всех вакансий с указанием компании, названия, зарплаты и ссылки."""
+        return await self._fetchall("get_all_vacancies", ALL_VACANCIES_QUERY)
+
+    async def get_avg_salary(self) -> float | Any:
+        """Получение средней зарплаты по вакансиям в рублях."""
+        result = await self._fetchall("get_avg_salary", AVG_SALARY_QUERY)
+        return round(result[0][0], 2) if result and result[0][0] is not None else 0.0
+
+    async def get_vacancies_with_higher_salary(self) -> list[Tuple]:
+        """Получение списка вакансий с зарплатой выше средней."""
+        return await self._fetchall("get_vacancies_with_higher_salary", HIGHER_SALARY_QUERY)
+
+    async def get_vacancies_with_keyword(self, keyword: str) -> list[Tuple]:
+        """Получение списка вакансий, содержащих ключевое слово в названии."""
+        return await self._fetchall("get_vacancies_with_keyword", KEYWORD_QUERY, (f"%{keyword}%",))
+
+    async def get_vacancies_with_keywords(self, keywords: list[str]) -> dict[str, list[Tuple]]:
+        """Одновременный поиск вакансий по нескольким ключевым словам. Возвращает результаты по каждому слову."""
+        results = await asyncio.gather(*(self.get_vacancies_with_keyword(keyword) for keyword in keywords))
+        return dict(zip(keywords, results))
+
+    async def search_vacancies(self, query: str, limit: int = 50) -> list[Tuple]:
+        """Полнотекстовый поиск вакансий по названию и описанию обязанностей (как DBManager.search_vacancies)."""
+        return await self._fetchall("search_vacancies", SEARCH_QUERY, (query, query, limit))
@@ -1,7 +1,135 @@
+import functools
+import sys
+import threading
+import time
+import uuid
 from abc import ABC, abstractmethod
-from typing import Any, Tuple
+from collections import OrderedDict
+from contextlib import contextmanager
+from datetime import date
+from typing import Any, Callable, Iterator, Tuple, TypeVar, cast
 
 import psycopg2
+from psycopg2.extensions import TRANSACTION_STATUS_UNKNOWN
+from psycopg2.pool import ThreadedConnectionPool
+
+from src import metrics
+
+T = TypeVar("T")
+
+# Соединение, простаивавшее в пуле дольше этого времени (в секундах), перед выдачей проверяется запросом SELECT 1
+PING_IDLE_SECONDS = 1.0
+
+COMPANIES_COUNT_QUERY = """
+    SELECT name AS company_name, vacancies_count
+    FROM company_stats
+    ORDER BY vacancies_count DESC;
+"""
+
+AVG_SALARY_QUERY = """
+    SELECT AVG(salary_mid_rub)
+    FROM vacancies
+    WHERE NOT archived;
+"""
+
+ALL_VACANCIES_QUERY = """
+    SELECT
+        companies.name AS company_name,
+        vacancies.name AS vacancy_name,
+        vacancies.salary_from,
+        vacancies.salary_to,
+        vacancies.currency,
+        vacancies.url AS vacancy_url
+    FROM vacancies
+    JOIN companies ON vacancies.company_id = companies.company_id
+    WHERE NOT vacancies.archived
+    ORDER BY company_name, vacancy_name;
+"""
+
+HIGHER_SALARY_QUERY = """
+    SELECT
+        companies.name AS company_name,
+        vacancies.name AS vacancy_name,
+        vacancies.salary_from,
+        vacancies.salary_to,
+        vacancies.currency,
+        vacancies.url AS vacancy_url
+    FROM vacancies
+    JOIN companies ON vacancies.company_id = companies.company_id
+    WHERE NOT vacancies.archived
+    AND vacancies.salary_mid_rub > (SELECT AVG(salary_mid_rub) FROM vacancies WHERE NOT archived)
+    ORDER BY vacancies.salary_mid_rub DESC;
+"""
+
+KEYWORD_QUERY = """
+    SELECT
+        companies.name AS company_name,
+        vacancies.name AS vacancy_name,
+        vacancies.salary_from,
+        vacancies.salary_to,
+        vacancies.currency,
+        vacancies.url AS vacancy_url
+    FROM vacancies
+    JOIN companies ON vacancies.company_id = companies.company_id
+    WHERE NOT vacancies.archived AND vacancies.name ILIKE %s
+    ORDER BY company_name, vacancy_name;
+"""
+
+PAGE_QUERY = """
+    SELECT
+        companies.name AS company_name,
+        vacancies.name AS vacancy_name,
+        vacancies.salary_from,
+        vacancies.salary_to,
+        vacancies.currency,
+        vacancies.url AS vacancy_url,
+        vacancies.vacancy_id
+    FROM vacancies
+    JOIN companies ON vacancies.company_id = companies.company_id
+    WHERE NOT vacancies.archived {condition}
+    ORDER BY companies.name, vacancies.name, vacancies.vacancy_id
+    LIMIT %s;
+"""
+
+
+SEARCH_QUERY = """
+    SELECT
+        companies.name AS company_name,
+        vacancies.name AS vacancy_name,
+        vacancies.salary_from,
+        vacancies.salary_to,
+        vacancies.currency,
+        vacancies.url AS vacancy_url
+    FROM vacancies
+    JOIN companies ON vacancies.company_id = companies.company_id
+    CROSS JOIN (
+        SELECT websearch_to_tsquery('russian', %s) || websearch_to_tsquery('english', %s) AS query
+    ) AS q
+    WHERE NOT vacancies.archived AND vacancies.search_vector @@ q.query
+    ORDER BY ts_rank(vacancies.search_vector, q.query) DESC, vacancies.vacancy_id
+    LIMIT %s;
+"""
+
+# Запросы к истории вакансий. Условие на snapshot_date задаётся значениями,
+# поэтому планировщик читает только месячные секции vacancy_history, попадающие в диапазон дат.
+VACANCIES_COUNT_TREND_QUERY = """
+    SELECT snapshot_date, MAX(company_name) AS company_name, COUNT(*) AS vacancies_count
+    FROM vacancy_history
+    WHERE snapshot_date BETWEEN %s AND %s {condition}
+    GROUP BY company_hh_id, snapshot_date
+    ORDER BY company_name, snapshot_date;
+"""
+
+MEDIAN_SALARY_TREND_QUERY = """
+    SELECT
+        snapshot_date,
+        MAX(company_name) AS company_name,
+        ROUND(percentile_cont(0.5) WITHIN GROUP (ORDER BY salary_mid_rub)::NUMERIC, 2) AS median_salary
+    FROM vacancy_history
+    WHERE snapshot_date BETWEEN %s AND %s AND salary_mid_rub IS NOT NULL {condition}
+    GROUP BY company_hh_id, snapshot_date
+    ORDER BY company_name, snapshot_date;
+"""
 
 
 class DBase(ABC):
@@ -36,27 +164,207 @@ class DBase(ABC):
         pass    # pragma: no cover
 
 
+def _estimate_size(value: Any) -> int:
+    """Приблизительный размер результата запроса в памяти (в байтах)"""
+    size = sys.getsizeof(value)
+    if isinstance(value, (list, tuple)):
+        for item in value:
+            size += _estimate_size(item)
+    return size
+
+
+def _copy_result(value: T) -> T:
+    """Копия списка из кэша, чтобы изменение результата вызывающим кодом не портило кэш"""
+    return cast(T, list(value)) if isinstance(value, list) else value
+
+
+def _cached_query(method: Callable[..., T]) -> Callable[..., T]:
+    """Декоратор метода DBManager: результат кэшируется, если кэш включён (cache_bytes > 0)"""
+
+    @functools.wraps(method)
+    def wrapper(self: "DBManager", *args: Any, **kwargs: Any) -> T:
+        with metrics.timer("db_query_seconds", method=method.__name__):
+            if self.cache_bytes <= 0:
+                return method(self, *args, **kwargs)
+            key = (method.__name__, args, tuple(sorted(kwargs.items())))
+            return self._cached(key, lambda: method(self, *args, **kwargs))
+
+    return wrapper
+
+
 class DBManager(DBase):
-    """Класс для работы с базой данных вакансий. Наследуется от DBase."""
+    """
+    Класс для работы с базой данных вакансий. Наследуется от DBase.
+    Соединения берутся из потокобезопасного пула и переиспользуются между вызовами методов,
+    пул закрывается методом disconnect (или при выходе из контекстного менеджера).
+    При cache_bytes > 0 результаты запросов кэшируются в памяти (LRU) до следующей загрузки данных.
+    """
 
-    def __init__(self, dbname: str, params: dict) -> None:
-        """Инициализация параметров подключения"""
+    def __init__(
+        self, dbname: str, params: dict, minconn: int = 1, maxconn: int = 5, cache_bytes: int = 0
+    ) -> None:
+        """Инициализация параметров подключения, размеров пула соединений и объёма кэша результатов"""
         self.dbname = dbname
         self.params = params
+        self.minconn = minconn
+        self.maxconn = maxconn
         self.conn: psycopg2.extensions.connection | Any = None
+        self.pool: ThreadedConnectionPool | None = None
+        self._pool_lock = threading.Lock()
+        self._slots = threading.BoundedSemaphore(maxconn)
+        # Время возврата соединений в пул (по id соединения) для проверки простаивавших соединений
+        self._released_at: dict[int, float] = {}
+        self.cache_bytes = cache_bytes
+        self.cache_hits = 0
+        self.cache_misses = 0
+        self._cache: OrderedDict[tuple, tuple[Any, int]] = OrderedDict()
+        self._cache_size = 0
+        self._cache_generation: Tuple | None = None
+        self._cache_lock = threading.Lock()
+
+    def _get_pool(self) -> ThreadedConnectionPool:
+        """Получение пула соединений. Пул создаётся при первом обращении."""
+        with self._pool_lock:
+            if self.pool is None or self.pool.closed:
+                self.pool = ThreadedConnectionPool(self.minconn, self.maxconn, dbname=self.dbname, **self.params)
+            return self.pool
+
+    def _is_alive(self, conn: psycopg2.extensions.connection) -> bool:
+        """
+        Проверка соединения перед выдачей. Соединение, простаивавшее дольше PING_IDLE_SECONDS,
+        проверяется запросом к серверу, чтобы разрыв соединения сервером не приводил к ошибке запроса.
+        """
+        if conn.closed or conn.get_transaction_status() == TRANSACTION_STATUS_UNKNOWN:
+            return False
+        released_at = self._released_at.get(id(conn))
+        if released_at is None or time.monotonic() - released_at < PING_IDLE_SECONDS:
+            return True
+        try:
+            conn.autocommit = True
+            with conn.cursor() as cur:
+                cur.execute("SELECT 1")
+            return True
+        except (psycopg2.OperationalError, psycopg2.InterfaceError):
+            return False
+
+    def _checkout(self) -> psycopg2.extensions.connection:
+        """
+        Получение исправного соединения из пула. Если свободных соединений нет, вызов ожидает их освобождения.
+        Закрытые и потерявшие связь с сервером соединения отбрасываются и заменяются новыми.
+        """
+        self._slots.acquire()
+        try:
+            pool = self._get_pool()
+            for _ in range(self.maxconn + 1):
+                conn = pool.getconn()
+                if self._is_alive(conn):
+                    conn.autocommit = True
+                    return conn
+                self._released_at.pop(id(conn), None)
+                pool.putconn(conn, close=True)
+            raise psycopg2.OperationalError("Не удалось получить исправное соединение из пула")
+        except BaseException:
+            self._slots.release()
+            raise
+
+    def _release(self, conn: psycopg2.extensions.connection, broken: bool = False) -> None:
+        """Возврат соединения в пул. Неисправные соединения закрываются."""
+        try:
+            if self.pool is not None and not self.pool.closed:
+                close = broken or bool(conn.closed)
+                if close:
+                    self._released_at.pop(id(conn), None)
+                else:
+                    self._released_at[id(conn)] = time.monotonic()
+                self.pool.putconn(conn, close=close)
+        finally:
+            self._slots.release()
+
+    @contextmanager
+    def _cursor(self) -> Iterator[psycopg2.extensions.cursor]:
+        """Курсор на соединении из пула. После использования соединение возвращается в пул."""
+        conn = self._checkout()
+        broken = False
+        try:
+            with conn.cursor() as cur:
+                yield cur
+        except (psycopg2.OperationalError, psycopg2.InterfaceError):
+            broken = True
+            raise
+        finally:
+            self._release(conn, broken)
 
     def connect(self) -> psycopg2.extensions.connection:
-        """Соединение с базой данных"""
-        if self.conn is None or self.conn.closed:
-            self.conn = psycopg2.connect(dbname=self.dbname, **self.params)
-            self.conn.autocommit = True
-        return self.conn
+        """
+        Соединение с базой данных: создание пула и проверка подключения.
+        Возвращает проверенное соединение пула. Соединение остаётся в пуле и используется методами запросов,
+        поэтому место в пуле не занимается на всё время работы с экземпляром.
+        """
+        conn = self._checkout()
+        self._release(conn)
+        self.conn = conn
+        return conn
 
     def disconnect(self) -> None:
-        """Закрытие соединения с базой данных"""
-        if self.conn and not self.conn.closed:
-            self.conn.close()
-            self.conn = None
+        """Закрытие всех соединений пула"""
+        self.conn = None
+        self._released_at.clear()
+        with self._pool_lock:
+            if self.pool is not None and not self.pool.closed:
+                self.pool.closeall()
+            self.pool = None
+
+    def _get_generation(self) -> Tuple:
+        """
+        Текущее поколение данных: номер, увеличиваемый каждой загрузкой, и OID базы данных
+        (на случай пересоздания БД, при котором номер начинается заново).
+        """
+        with self._cursor() as cur:
+            cur.execute(
+                """
+                SELECT generation, (SELECT oid FROM pg_database WHERE datname = current_database())
+                FROM load_generation;
+                """
+            )
+            result = cur.fetchone()
+        return tuple(result) if result is not None else ()
+
+    def _cached(self, key: tuple, loader: Callable[[], T]) -> T:
+        """
+        Получение результата из кэша или выполнение запроса loader с сохранением результата.
+        Если со времени заполнения кэша поколение данных изменилось, кэш очищается.
+        """
+        generation = self._get_generation()
+        with self._cache_lock:
+            if generation != self._cache_generation:
+                self._cache.clear()
+                self._cache_size = 0
+                self._cache_generation = generation
+            if key in self._cache:
+                self._cache.move_to_end(key)
+                self.cache_hits += 1
+                metrics.inc("db_cache_total", result="hit")
+                return cast(T, _copy_result(self._cache[key][0]))
+            self.cache_misses += 1
+            metrics.inc("db_cache_total", result="miss")
+
+        value = loader()
+        size = _estimate_size(value)
+        with self._cache_lock:
+            if size <= self.cache_bytes and generation == self._cache_generation and key not in self._cache:
+                self._cache[key] = (value, size)
+                self._cache_size += size
+                while self._cache_size > self.cache_bytes:
+                    _, (_, evicted_size) = self._cache.popitem(last=False)
+                    self._cache_size -= evicted_size
+        return _copy_result(value)
+
+    def clear_cache(self) -> None:
+        """Очистка кэша результатов запросов"""
+        with self._cache_lock:
+            self._cache.clear()
+            self._cache_size = 0
+            self._cache_generation = None
 
     def __enter__(self) -> "DBManager":
         """Поддержка контекстного менеджера"""
@@ -67,112 +375,184 @@ class DBManager(DBase):
         """Поддержка контекстного менеджера"""
         self.disconnect()
 
+    @_cached_query
     def get_companies_and_vacancies_count(self) -> list[Tuple]:
         """Получение списка всех компаний и количества вакансий у каждой компании."""
-        self.connect()
-        with self.conn.cursor() as cur:
+        with self._cursor() as cur:
+            cur.execute(COMPANIES_COUNT_QUERY)
+            result = cur.fetchall()
+        return result
+
+    @_cached_query
+    def get_company_salary_stats(self) -> list[Tuple]:
+        """
+        Получение статистики по компаниям: количество вакансий, количество вакансий с указанной зарплатой,
+        средняя, минимальная и максимальная зарплата (середина вилки в рублях).
+        """
+        with self._cursor() as cur:
             cur.execute(
                 """
-                SELECT companies.name AS company_name, COUNT (vacancy_id) AS vacancies_count
-                FROM companies
-                LEFT JOIN vacancies ON companies.company_id = vacancies.company_id
-                GROUP BY companies.company_id, companies.name
-                ORDER BY vacancies_count DESC;
+                SELECT name AS company_name, vacancies_count, salaried_count, avg_salary, min_salary, max_salary
+                FROM company_stats
+                ORDER BY avg_salary DESC NULLS LAST, company_name;
                 """
             )
             result = cur.fetchall()
-            self.disconnect()
         return result
 
+    @_cached_query
     def get_all_vacancies(self) -> list[Tuple]:
         """Получение списка всех вакансий с указанием компании, названия, зарплаты и ссылки."""
-        self.connect()
-        with self.conn.cursor() as cur:
-            cur.execute(
-                """
-                SELECT
-                companies.name AS company_name,
-                vacancies.name AS vacancy_name,
-                vacancies.salary_from,
-                vacancies.salary_to,
-                vacancies.currency,
-                vacancies.url AS vacancy_url
-                FROM vacancies
-                JOIN companies ON vacancies.company_id = companies.company_id
-                ORDER BY company_name, vacancy_name;
-                """
-            )
+        with self._cursor() as cur:
+            cur.execute(ALL_VACANCIES_QUERY)
             result = cur.fetchall()
-            self.disconnect()
         return result
 
+    @_cached_query
     def get_avg_salary(self) -> float | Any:
-        """Получение средней зарплаты по вакансиям."""
-        self.connect()
-        with self.conn.cursor() as cur:
-            cur.execute(
-                """
-                SELECT AVG((salary_from + salary_to) / 2)
-                FROM vacancies;
-                """
-            )
+        """
+        Получение средней зарплаты по вакансиям в рублях. Вакансии без указанной зарплаты
+        и с валютой, для которой нет курса, не учитываются.
+        """
+        with self._cursor() as cur:
+            cur.execute(AVG_SALARY_QUERY)
             result = cur.fetchone()
-            self.disconnect()
-        return round(result[0], 2) if result is not None else 0.0
+        return round(result[0], 2) if result is not None and result[0] is not None else 0.0
 
+    @_cached_query
     def get_vacancies_with_higher_salary(self) -> list[Tuple]:
-        """Получение списка вакансий с зарплатой выше средней."""
-        self.connect()
-        with self.conn.cursor() as cur:
-            cur.execute(
-                """
-                    SELECT AVG((salary_from + salary_to) / 2)
-                    FROM vacancies;
-                    """
-            )
-            avg_salary = cur.fetchone()[0]  # type: ignore
-
-            cur.execute(
-                """
-                    SELECT
-                        companies.name AS company_name,
-                        vacancies.name AS vacancy_name,
-                        vacancies.salary_from,
-                        vacancies.salary_to,
-                        vacancies.currency,
-                        vacancies.url AS vacancy_url
-                    FROM vacancies
-                    JOIN companies ON vacancies.company_id = companies.company_id
-                    WHERE ((vacancies.salary_from + vacancies.salary_to) / 2 > %s)
-                    ORDER BY ((vacancies.salary_from + vacancies.salary_to) / 2) DESC;
-                    """,
-                (avg_salary,),
-            )
+        """Получение списка вакансий с зарплатой выше средней (одним запросом на стороне сервера)."""
+        with self._cursor() as cur:
+            cur.execute(HIGHER_SALARY_QUERY)
             result = cur.fetchall()
-            self.disconnect()
         return result
 
+    @_cached_query
     def get_vacancies_with_keyword(self, keyword: str) -> list[Tuple]:
         """Получение списка вакансий, содержащих ключевое слово в названии."""
-        self.connect()
-        with self.conn.cursor() as cur:
+        with self._cursor() as cur:
             search_pattern = f"%{keyword}%"
-            cur.execute(
-                """
-                    SELECT
-                        companies.name AS company_name,
-                        vacancies.name AS vacancy_name,
-                        vacancies.salary_from,
-                        vacancies.salary_to,
-                        vacancies.currency,
-                        vacancies.url AS vacancy_url
-                    FROM vacancies
-                    JOIN companies ON vacancies.company_id = companies.company_id
-                    WHERE vacancies.name ILIKE %s
-                    ORDER BY company_name, vacancy_name;
-                    """,
-                (search_pattern,),
-            )
+            cur.execute(KEYWORD_QUERY, (search_pattern,))
+            result = cur.fetchall()
+        return result
+
+    def _iter_query(self, query: str, params: Tuple | None = None, batch_size: int = 1000) -> Iterator[Tuple]:
+        """
+        Построчная выдача результата запроса через именованный (серверный) курсор.
+        Строки запрашиваются у сервера пачками по batch_size, поэтому в памяти находится не более одной пачки,
+        а первая строка доступна сразу после выполнения запроса.
+        """
+        conn = self._checkout()
+        broken = False
+        try:
+            # Серверный курсор существует только внутри транзакции
+            conn.autocommit = False
+            with conn.cursor(name=f"dbmanager_{uuid.uuid4().hex}") as cur:
+                cur.itersize = batch_size
+                with metrics.timer("db_query_seconds", method="iter_query"):
+                    cur.execute(query, params)
+                while True:
+                    rows = cur.fetchmany(batch_size)
+                    if not rows:
+                        break
+                    yield from rows
+        except (psycopg2.OperationalError, psycopg2.InterfaceError):
+            broken = True
+            raise
+        finally:
+            if not conn.closed:
+                conn.rollback()
+                conn.autocommit = True
+            self._release(conn, broken)
+
+    def iter_all_vacancies(self, batch_size: int = 1000) -> Iterator[Tuple]:
+        """Итератор по всем вакансиям (аналог get_all_vacancies без загрузки результата в память)."""
+        return self._iter_query(ALL_VACANCIES_QUERY, batch_size=batch_size)
+
+    def iter_vacancies_with_higher_salary(self, batch_size: int = 1000) -> Iterator[Tuple]:
+        """Итератор по вакансиям с зарплатой выше средней (аналог get_vacancies_with_higher_salary)."""
+        return self._iter_query(HIGHER_SALARY_QUERY, batch_size=batch_size)
+
+    def iter_vacancies_with_keyword(self, keyword: str, batch_size: int = 1000) -> Iterator[Tuple]:
+        """Итератор по вакансиям с ключевым словом в названии (аналог get_vacancies_with_keyword)."""
+        return self._iter_query(KEYWORD_QUERY, (f"%{keyword}%",), batch_size)
+
+    @staticmethod
+    def _page_query(after: Tuple | None, limit: int) -> tuple[str, Tuple]:
+        """
+        Запрос страницы вакансий и его параметры. Условие companies.name >= ... выполняется по индексу
+        companies_name_idx, поэтому компании до ключа пропускаются без чтения их вакансий.
+        Сравнение по полному ключу затрагивает две таблицы и проверяется только для строк после этого условия.
+        """
+        if after is None:
+            return PAGE_QUERY.format(condition=""), (limit,)
+        condition = (
+            "AND companies.name >= %s AND (companies.name, vacancies.name, vacancies.vacancy_id) > (%s, %s, %s)"
+        )
+        return PAGE_QUERY.format(condition=condition), (after[0], *after, limit)
+
+    @_cached_query
+    def get_vacancies_page(self, after: Tuple | None = None, limit: int = 100) -> tuple[list[Tuple], Tuple | None]:
+        """
+        Постраничное получение вакансий с пагинацией по ключу (company_name, vacancy_name, vacancy_id).
+        Стоимость получения страницы не зависит от её номера, в отличие от OFFSET.
+        :param after: Ключ последней строки предыдущей страницы (None - первая страница).
+        :param limit: Количество вакансий на странице.
+        :return: Возвращает вакансии страницы и ключ для запроса следующей страницы (None, если страница последняя).
+        """
+        with self._cursor() as cur:
+            cur.execute(*self._page_query(after, limit))
+            rows = cur.fetchall()
+        next_key = (rows[-1][0], rows[-1][1], rows[-1][6]) if len(rows) == limit else None
+        return [row[:6] for row in rows], next_key
+
+    @_cached_query
+    def search_vacancies(self, query: str, limit: int = 50) -> list[Tuple]:
+        """
+        Полнотекстовый поиск вакансий по названию и описанию обязанностей.
+        Поддерживает запросы из нескольких слов (синтаксис websearch: "фраза", OR, -слово),
+        учитывает морфологию русского и английского языков. Результаты упорядочены по релевантности.
+        """
+        with self._cursor() as cur:
+            cur.execute(SEARCH_QUERY, (query, query, limit))
             result = cur.fetchall()
-            self.disconnect()
         return result
+
+    def _trend(self, query: str, date_from: date, date_to: date | None, employer_id: str | None) -> list[Tuple]:
+        """Выполнение запроса к истории вакансий за период с необязательным отбором по ID компании на HH.ru"""
+        params: Tuple = (date_from, date_to or date.today())
+        condition = ""
+        if employer_id is not None:
+            condition = "AND company_hh_id = %s"
+            params += (employer_id,)
+        with self._cursor() as cur:
+            cur.execute(query.format(condition=condition), params)
+            result = cur.fetchall()
+        return result
+
+    @_cached_query
+    def get_vacancies_count_trend(
+        self, date_from: date, date_to: date | None = None, employer_id: str | None = None
+    ) -> list[Tuple]:
+        """
+        Получение количества открытых вакансий каждой компании по датам снимков истории.
+        :param date_from: Начальная дата периода.
+        :param date_to: Конечная дата периода включительно (None - сегодня).
+        :param employer_id: ID компании на HH.ru (None - все компании).
+        :return: Возвращает строки (дата снимка, название компании, количество вакансий).
+        """
+        return self._trend(VACANCIES_COUNT_TREND_QUERY, date_from, date_to, employer_id)
+
+    @_cached_query
+    def get_median_salary_trend(
+        self, date_from: date, date_to: date | None = None, employer_id: str | None = None
+    ) -> list[Tuple]:
+        """
+        Получение медианной зарплаты (середина вилки в рублях) каждой компании по датам снимков истории.
+        Вакансии без указанной зарплаты не учитываются.
+        :param date_from: Начальная дата периода.
+        :param date_to: Конечная дата периода включительно (None - сегодня).
+        :param employer_id: ID компании на HH.ru (None - все компании).
+        :return: Возвращает строки (дата снимка, название компании, медианная зарплата).
+        """
+        return self._trend(MEDIAN_SALARY_TREND_QUERY, date_from, date_to, employer_id)
@@ -1,125 +1,401 @@
-from typing import Any
+import math
+import os
+import sys
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone
+from typing import Any, Callable, Iterable, Iterator
 
-import requests
+from src import metrics
+from src.archive import EmployerArchive, archive_employer, archive_path, new_run_dir
+from src.checkpoint import Checkpoint
+from src.models import Company, Vacancy, parse_vacancies
+from src.transport import get_json
 
+# Адрес API HH.ru (может быть заменён, например, на локальный тестовый сервер)
+HH_API_URL = "https://api.hh.ru"
+# Максимальное количество одновременных запросов к API HH.ru
+MAX_WORKERS = 8
+# Количество вакансий на странице выдачи
+PER_PAGE = 100
+# Глубина выдачи поиска вакансий: API HH.ru отдаёт не более 2000 результатов одного запроса
+SEARCH_DEPTH = 2000
+# Период публикации вакансий, который делится на интервалы для работодателей с большим числом вакансий, в днях
+SHARD_PERIOD_DAYS = 365
+# Начало последнего интервала, в который попадают вакансии, опубликованные раньше SHARD_PERIOD_DAYS
+OLDEST_PUBLICATION = datetime(2000, 1, 1, tzinfo=timezone.utc)
+# Минимальная длительность интервала публикации (более узкие интервалы не делятся)
+MIN_SHARD = timedelta(minutes=1)
 
-def get_hh_data_short(employers_id: list[str]) -> list[dict[str, Any]]:
+# Интервал дат публикации (date_from, date_to), которым ограничивается поиск вакансий
+Shard = tuple[datetime, datetime]
+
+
+def _get_vacancies_page(employer_id: str, page_n: int, shard: Shard | None = None) -> dict[str, Any]:
+    """Получение одной страницы вакансий работодателя (опционально в интервале дат публикации shard)"""
+    url_vac = f"{HH_API_URL}/vacancies"
+    params: dict[str, Any] = {"employer_id": employer_id, "per_page": PER_PAGE, "page": page_n}
+    if shard is not None:
+        params["date_from"] = shard[0].isoformat(timespec="seconds")
+        params["date_to"] = shard[1].isoformat(timespec="seconds")
+    return get_json(url_vac, params)
+
+
+def _get_employer_first_page(employer_id: str) -> tuple[dict[str, Any], dict[str, Any]]:
+    """Получение ответа API о компании и первой страницы её вакансий"""
+    url_emp_inf = f"{HH_API_URL}/employers/{employer_id}"
+    company_data = get_json(url_emp_inf)
+    return company_data, _get_vacancies_page(employer_id, 0)
+
+
+def _page_count(first_page: dict[str, Any]) -> int | None:
     """
-    Функция получения данных от API HH.ru. Функция возвращает вакансии первой страницы.
-    :param employers_id: Список ID выбираемых компаний.
-    :return: Возвращает список словарей с информацией о компании и её вакансиями.
+    Количество страниц выдачи: из поля pages ответа API, а если его нет - из количества найденных вакансий
+    с учётом глубины выдачи. None, если ответ не содержит ни того, ни другого.
+    """
+    if "pages" in first_page:
+        pages: int = first_page["pages"]
+        return pages
+    if "found" not in first_page:
+        return None
+    found: int = first_page["found"]
+    per_page: int = first_page.get("per_page", PER_PAGE)
+    return math.ceil(min(found, SEARCH_DEPTH) / per_page)
+
+
+def _iter_remaining_pages(
+    employer_id: str,
+    first_page: dict[str, Any],
+    shard: Shard | None = None,
+    start: int = 1,
+    previous: dict[str, Any] | None = None,
+) -> Iterator[dict[str, Any]]:
+    """
+    Последовательное получение оставшихся страниц вакансий работодателя, начиная со страницы start.
+    Если количество страниц известно (_page_count), обходятся только они, иначе - до пустой страницы
+    (previous - последняя полученная страница при продолжении обхода).
+    """
+    pages = _page_count(first_page)
+    if pages is not None:
+        for page_n in range(start, pages):
+            yield _get_vacancies_page(employer_id, page_n, shard)
+        return
+    page_n = start
+    data_vac = previous if previous is not None else first_page
+    while len(data_vac.get("items", "")) != 0:
+        data_vac = _get_vacancies_page(employer_id, page_n, shard)
+        yield data_vac
+        page_n += 1
+
+
+def _needs_sharding(first_page: dict[str, Any]) -> bool:
+    """Проверка, что вакансий больше, чем API HH.ru отдаёт по одному запросу"""
+    found: int = first_page.get("found", 0)
+    return found > SEARCH_DEPTH
+
+
+def _shard_first_pages(
+    employers: Iterable[tuple[int, str]], map_func: Callable[..., Iterable[Any]] = map
+) -> list[tuple[int, str, Shard, dict[str, Any]]]:
+    """
+    Разбиение поиска вакансий работодателей на непересекающиеся интервалы дат публикации.
+    Поиск начинается с двух интервалов: последние SHARD_PERIOD_DAYS дней и всё время до них.
+    Интервал делится пополам, пока найденные в нём вакансии не поместятся в глубину выдачи SEARCH_DEPTH.
+    Первые страницы интервалов одного уровня загружаются через map_func (например, executor.map).
+    :param employers: Пары (номер работодателя, ID работодателя).
+    :return: Возвращает список (номер работодателя, ID работодателя, интервал, первая страница интервала).
+    """
+    now = datetime.now(timezone.utc).replace(microsecond=0)
+    period_start = now - timedelta(days=SHARD_PERIOD_DAYS)
+    frontier = []
+    for i, employer_id in employers:
+        frontier.extend([(i, employer_id, (period_start, now)), (i, employer_id, (OLDEST_PUBLICATION, period_start))])
+    leaves = []
+    while frontier:
+        first_pages = map_func(lambda item: _get_vacancies_page(item[1], 0, item[2]), frontier)
+        next_frontier = []
+        for (i, employer_id, shard), first_page in zip(frontier, first_pages):
+            date_from, date_to = shard
+            if _needs_sharding(first_page) and date_to - date_from > MIN_SHARD:
+                middle = date_from + (date_to - date_from) // 2
+                next_frontier.extend([(i, employer_id, (date_from, middle)), (i, employer_id, (middle, date_to))])
+            else:
+                if _needs_sharding(first_page):
+                    metrics.inc("hh_shards_incomplete_total", reason="search_depth")
+                    print(
+                        f"Работодатель {employer_id}: в интервале {date_from} - {date_to} получены не все вакансии",
+                        file=sys.stderr,
+                    )
+                leaves.append((i, employer_id, shard, first_page))
+        frontier = next_frontier
+    return leaves
+
+
+def _check_shards_found(employer_id: str, found: int, shard_pages: Iterable[dict[str, Any]]) -> None:
+    """Сообщение о том, что в интервалы дат публикации попали не все найденные вакансии работодателя"""
+    shards_found = sum(first_page.get("found", 0) for first_page in shard_pages)
+    if shards_found < found:
+        metrics.inc("hh_shards_incomplete_total", reason="found")
+        print(
+            f"Работодатель {employer_id}: в интервалах дат публикации найдено {shards_found} вакансий из {found}",
+            file=sys.stderr,
+        )
+
+
+def _shard_key(shard: Shard) -> list[str]:
+    """Интервал дат публикации в виде, сохраняемом в архив"""
+    return [shard[0].isoformat(), shard[1].isoformat()]
+
+
+def _iter_sharded_pages(
+    employer_id: str, leaves: list[tuple[Shard, dict[str, Any] | None]], archived: list[dict[str, Any]]
+) -> Iterator[tuple[Shard, dict[str, Any]]]:
+    """
+    Последовательное получение всех страниц вакансий работодателя по интервалам дат публикации.
+    :param leaves: Интервалы и их первые страницы (None - первая страница ещё не получена).
+    :param archived: Записи архива со страницами интервалов, полученными до прерывания загрузки
+        (они не запрашиваются повторно).
+    :return: Возвращает итератор пар (интервал, страница).
+    """
+    done: dict[tuple[str, ...], list[dict[str, Any]]] = {}
+    for record in archived:
+        done.setdefault(tuple(record["shard"]), []).append(record["vacancies"])
+    for shard, first_page in leaves:
+        pages = done.get(tuple(_shard_key(shard)), [])
+        if pages:
+            first_page = pages[0]
+        else:
+            if first_page is None:
+                first_page = _get_vacancies_page(employer_id, 0, shard)
+            yield shard, first_page
+        previous = pages[-1] if pages else first_page
+        for data_vac in _iter_remaining_pages(employer_id, first_page, shard, max(1, len(pages)), previous):
+            yield shard, data_vac
+
+
+def _iter_employer_pages(
+    employer_id: str, first_page: dict[str, Any], archived: list[dict[str, Any]], checkpoint: Checkpoint | None
+) -> Iterator[tuple[Shard | None, dict[str, Any]]]:
+    """
+    Последовательное получение страниц вакансий работодателя после первой.
+    :param archived: Записи архива со страницами после первой, полученными до прерывания загрузки.
+    :param checkpoint: Контрольная точка, в которой сохраняются интервалы дат публикации.
+    :return: Возвращает итератор пар (интервал дат публикации или None, страница).
     """
+    if not _needs_sharding(first_page):
+        previous = archived[-1]["vacancies"] if archived else first_page
+        for data_vac in _iter_remaining_pages(employer_id, first_page, None, len(archived) + 1, previous):
+            yield None, data_vac
+        return
+    state = checkpoint.get(employer_id) if checkpoint else None
+    leaves: list[tuple[Shard, dict[str, Any] | None]]
+    if state is not None and state.shards is not None:
+        leaves = [(shard, None) for shard in state.shards]
+    else:
+        leaves = [(shard, first_page) for _, _, shard, first_page in _shard_first_pages([(0, employer_id)])]
+        _check_shards_found(employer_id, first_page.get("found", 0), [page for _, page in leaves if page])
+        if checkpoint:
+            checkpoint.shards_planned(employer_id, [shard for shard, _ in leaves])
+    yield from _iter_sharded_pages(employer_id, leaves, archived)
+
+
+def _unique_vacancies(vacancies: list[Vacancy], seen: set[str]) -> list[Vacancy]:
+    """Исключение вакансий, уже полученных ранее (интервалы дат соседних шардов пересекаются на границе)"""
+    unique = []
+    for vacancy in vacancies:
+        if vacancy.id not in seen:
+            seen.add(vacancy.id)
+            unique.append(vacancy)
+    return unique
+
+
+def _get_hh_data(
+    employers_id: list[str], full: bool, max_workers: int, archive_dir: str | None = None
+) -> list[dict[str, Any]]:
+    """
+    Параллельное получение данных о компаниях и их вакансиях.
+    Сначала параллельно загружаются данные о компаниях вместе с первыми страницами вакансий,
+    затем параллельно загружаются все оставшиеся страницы. Поиск работодателей, у которых вакансий больше
+    глубины выдачи API, разбивается на интервалы дат публикации. Порядок результата совпадает с employers_id.
+    Если указан archive_dir, необработанные ответы API сохраняются в архив.
+    """
+    with ThreadPoolExecutor(max_workers=max(1, max_workers)) as executor:
+        first_pages = list(executor.map(_get_employer_first_page, employers_id))
+
+        pages: list[list[dict[str, Any]]] = [[first_page] for _, first_page in first_pages]
+        if full:
+            # Страницы, количество которых известно из ответа API, загружаем параллельно
+            tasks: list[tuple[int, str, int, Shard | None]] = []
+            # Поиски с неизвестным количеством страниц обходятся постранично до пустой страницы
+            unknown: list[tuple[int, str, dict[str, Any], Shard | None]] = []
+            sharded = [(i, employer_id) for i, employer_id in enumerate(employers_id) if _needs_sharding(pages[i][0])]
+            for i, employer_id, shard, first_page in _shard_first_pages(sharded, executor.map):
+                pages[i].append(first_page)
+                page_count = _page_count(first_page)
+                if page_count is None:
+                    unknown.append((i, employer_id, first_page, shard))
+                else:
+                    tasks.extend((i, employer_id, page_n, shard) for page_n in range(1, page_count))
+            for i, employer_id in sharded:
+                _check_shards_found(employer_id, pages[i][0].get("found", 0), pages[i][1:])
+            sharded_ids = {i for i, _ in sharded}
+            for i, (employer_id, (_, first_page)) in enumerate(zip(employers_id, first_pages)):
+                if i in sharded_ids:
+                    continue
+                page_count = _page_count(first_page)
+                if page_count is None:
+                    unknown.append((i, employer_id, first_page, None))
+                else:
+                    tasks.extend((i, employer_id, page_n, None) for page_n in range(1, page_count))
+            results = executor.map(lambda task: _get_vacancies_page(task[1], task[2], task[3]), tasks)
+            for (i, _, _, _), data_vac in zip(tasks, results):
+                pages[i].append(data_vac)
+
+            rest = executor.map(lambda item: list(_iter_remaining_pages(item[1], item[2], item[3])), unknown)
+            for (i, _, _, _), data_vacs in zip(unknown, rest):
+                pages[i].extend(data_vacs)
+
+    run_dir = new_run_dir(archive_dir) if archive_dir else None
     data = []
-    for employer_id in employers_id:
-        # Получаем данные о компании и формируем словарь с данными
-        url_emp_inf = f"https://api.hh.ru/employers/{employer_id}"
-        response_emp_inf = requests.get(url_emp_inf)
-        company_data = response_emp_inf.json()
-
-        company_inf = {
-            "name": company_data["name"],
-            "area": company_data["area"]["name"],
-            "open_vacancies": company_data["open_vacancies"],
-            "industries": company_data["industries"],
-            "url": company_data["alternate_url"],
-            "vacancies_url": company_data["vacancies_url"],
-        }
-
-        # Получаем вакансии от компании и формируем словарь с вакансиями
-        url_vac = "https://api.hh.ru/vacancies"
-        page_n = 0
-        data_vacs = []
-        params = {"employer_id": employer_id, "per_page": 100, "page": page_n}
-        response_vac = requests.get(url_vac, params)  # type: ignore
-        data_vac = response_vac.json()
-        vacancies = []
-        for vac in data_vac["items"]:
-            name = vac["name"]
-            area = vac["area"].get("name") if vac["area"].get("name") is not None else "Нет данных"
-            salary = vac.get("salary")
-            if salary is None:
-                salary = {"salary": 0, "salary_range": 0, "currency": "Не указана"}
-            salary_from = salary.get("from") if salary.get("from") is not None else 0
-            salary_to = salary.get("to") if salary.get("to") is not None else salary_from
-            currency = salary.get("currency") if salary.get("currency") is not None else "Не указано"
-            published_at = vac["published_at"]
-            responsibility = vac["snippet"]["responsibility"]
-            url = vac["alternate_url"]
-            vacancy_inf = {
-                "name": name,
-                "area": area,
-                "salary_from": salary_from,
-                "salary_to": salary_to,
-                "currency": currency,
-                "published_at": published_at,
-                "responsibility": responsibility,
-                "url": url,
-            }
-            vacancies.append(vacancy_inf)
-        data_vacs.extend(vacancies)
-
-        data.append({"company": company_inf, "vacancies": data_vacs})
+    for employer_id, (company_data, _), employer_pages in zip(employers_id, first_pages, pages):
+        if run_dir:
+            archive_employer(run_dir, employer_id, company_data, employer_pages)
+        vacancies: list[Vacancy] = []
+        seen: set[str] = set()
+        for data_vac in employer_pages:
+            vacancies.extend(_unique_vacancies(parse_vacancies(data_vac), seen))
+        data.append({"company": Company.from_api(employer_id, company_data), "vacancies": vacancies})
     return data
 
 
-def get_hh_data_full(employers_id: list[str]) -> list[dict[str, Any]]:
+def _get_checkpointed_data(
+    employers_id: list[str], full: bool, max_workers: int, checkpoint: Checkpoint
+) -> list[dict[str, Any]]:
+    """
+    Параллельное получение данных о компаниях и их вакансиях с контрольными точками (по работодателю на поток).
+    Уже полученные страницы читаются из архива контрольной точки. Порядок результата совпадает с employers_id.
+    """
+
+    def collect(employer_id: str) -> dict[str, Any]:
+        data: dict[str, Any] = {"company": None, "vacancies": []}
+        for company, vacancies in iter_employer_vacancies(employer_id, full, checkpoint=checkpoint):
+            data["company"] = company
+            data["vacancies"].extend(vacancies)
+        return data
+
+    with ThreadPoolExecutor(max_workers=max(1, max_workers)) as executor:
+        return list(executor.map(collect, employers_id))
+
+
+def get_hh_data_short(
+    employers_id: list[str],
+    max_workers: int = MAX_WORKERS,
+    archive_dir: str | None = None,
+    checkpoint: Checkpoint | None = None,
+) -> list[dict[str, Any]]:
+    """
+    Функция получения данных от API HH.ru. Функция возвращает вакансии первой страницы.
+    :param employers_id: Список ID выбираемых компаний.
+    :param max_workers: Максимальное количество одновременных запросов.
+    :param archive_dir: Каталог для сохранения необработанных ответов API (None - не сохранять).
+    :param checkpoint: Контрольная точка для продолжения прерванной загрузки (src.checkpoint).
+    :return: Возвращает список словарей {"company": Company, "vacancies": [Vacancy, ...]}.
+    """
+    if checkpoint is not None:
+        return _get_checkpointed_data(employers_id, False, max_workers, checkpoint)
+    return _get_hh_data(employers_id, False, max_workers, archive_dir)
+
+
+def get_hh_data_full(
+    employers_id: list[str],
+    max_workers: int = MAX_WORKERS,
+    archive_dir: str | None = None,
+    checkpoint: Checkpoint | None = None,
+) -> list[dict[str, Any]]:
     """
     Функция получения данных от API HH.ru. Функция возвращает все вакансии работодателя.
     :param employers_id: Список ID выбираемых компаний.
-    :return: Возвращает список словарей с информацией о компании и её вакансиями.
+    :param max_workers: Максимальное количество одновременных запросов.
+    :param archive_dir: Каталог для сохранения необработанных ответов API (None - не сохранять).
+    :param checkpoint: Контрольная точка для продолжения прерванной загрузки (src.checkpoint).
+    :return: Возвращает список словарей {"company": Company, "vacancies": [Vacancy, ...]}.
     """
-    data = []
+    if checkpoint is not None:
+        return _get_checkpointed_data(employers_id, True, max_workers, checkpoint)
+    return _get_hh_data(employers_id, True, max_workers, archive_dir)
+
+
+def iter_employer_vacancies(
+    employer_id: str, full: bool = True, run_dir: str | None = None, checkpoint: Checkpoint | None = None
+) -> Iterator[tuple[Company, list[Vacancy]]]:
+    """
+    Потоковое получение вакансий одного работодателя постранично.
+    :param employer_id: ID компании.
+    :param full: Получать все вакансии работодателя (True) или только первую страницу (False).
+    :param run_dir: Каталог запуска архива (new_run_dir) для сохранения необработанных ответов API.
+    :param checkpoint: Контрольная точка: ответы сохраняются в её каталог архива, прогресс - в файл состояния.
+        Страницы, полученные до прерывания загрузки, читаются из архива, получение продолжается со следующей.
+    :return: Возвращает итератор пар (Company, список Vacancy одной страницы).
+    """
+    state = None
+    if checkpoint is not None:
+        run_dir = checkpoint.run_dir
+        state = checkpoint.get(employer_id)
+        path = archive_path(run_dir, employer_id)
+        if state is not None and (not os.path.exists(path) or os.path.getsize(path) < state.size):
+            # Сохранённые страницы недоступны: данные работодателя получаются заново
+            checkpoint.employer_restarted(employer_id)
+            state = None
+    archive = EmployerArchive(run_dir, employer_id, state.size if state else None) if run_dir else None
+    try:
+        records = archive.records() if archive and state else []
+        if records:
+            company_data, first_page = records[0]["employer"], records[1]["vacancies"]
+        else:
+            company_data, first_page = _get_employer_first_page(employer_id)
+            if archive:
+                archive.write_employer(company_data)
+                archive.write_page(0, first_page)
+                if checkpoint:
+                    checkpoint.page_done(employer_id, 1, archive.size)
+        company_inf = Company.from_api(employer_id, company_data)
+        seen: set[str] = set()
+        yield company_inf, _unique_vacancies(parse_vacancies(first_page), seen)
+        # Страницы, сохранённые в архив до прерывания загрузки
+        archived = records[2:]
+        for record in archived:
+            vacancies = _unique_vacancies(parse_vacancies(record["vacancies"]), seen)
+            if vacancies:
+                yield company_inf, vacancies
+        if full and not (state and state.done):
+            page_n = len(archived) + 1
+            for shard, data_vac in _iter_employer_pages(employer_id, first_page, archived, checkpoint):
+                if archive:
+                    archive.write_page(page_n, data_vac, _shard_key(shard) if shard else None)
+                    if checkpoint:
+                        checkpoint.page_done(employer_id, page_n + 1, archive.size)
+                page_n += 1
+                vacancies = _unique_vacancies(parse_vacancies(data_vac), seen)
+                if vacancies:
+                    yield company_inf, vacancies
+        if checkpoint and not (state and state.done):
+            checkpoint.employer_done(employer_id)
+    finally:
+        if archive:
+            archive.close()
+
+
+def iter_hh_vacancies(
+    employers_id: list[str], full: bool = True, archive_dir: str | None = None, checkpoint: Checkpoint | None = None
+) -> Iterator[tuple[Company, list[Vacancy]]]:
+    """
+    Потоковое получение данных от API HH.ru. Вакансии выдаются постранично по мере загрузки,
+    поэтому в памяти одновременно находится только одна страница.
+    :param employers_id: Список ID выбираемых компаний.
+    :param full: Получать все вакансии работодателя (True) или только первую страницу (False).
+    :param archive_dir: Каталог для сохранения необработанных ответов API (None - не сохранять).
+    :param checkpoint: Контрольная точка для продолжения прерванной загрузки (src.checkpoint).
+    :return: Возвращает итератор пар (Company, список Vacancy одной страницы).
+    """
+    run_dir = new_run_dir(archive_dir) if archive_dir and checkpoint is None else None
     for employer_id in employers_id:
-        # Получаем данные о компании и формируем словарь с данными
-        url_emp_inf = f"https://api.hh.ru/employers/{employer_id}"
-        response_emp_inf = requests.get(url_emp_inf)
-        company_data = response_emp_inf.json()
-
-        company_inf = {
-            "name": company_data["name"],
-            "area": company_data["area"]["name"],
-            "open_vacancies": company_data["open_vacancies"],
-            "industries": company_data["industries"],
-            "url": company_data["alternate_url"],
-            "vacancies_url": company_data["vacancies_url"],
-        }
-
-        # Получаем вакансии от компании и формируем словарь с вакансиями
-        url_vac = "https://api.hh.ru/vacancies"
-        page_n = 0
-        data_vacs = []
-        while True:
-            params = {"employer_id": employer_id, "per_page": 100, "page": page_n}
-            response_vac = requests.get(url_vac, params)  # type: ignore
-            data_vac = response_vac.json()
-            if len(data_vac.get("items", "")) == 0:
-                break
-            vacancies = []
-            for vac in data_vac["items"]:
-                name = vac["name"]
-                area = vac["area"].get("name") if vac["area"].get("name") is not None else "Нет данных"
-                salary = vac.get("salary")
-                if salary is None:
-                    salary = {"salary": 0, "salary_range": 0, "currency": "Не указана"}
-                salary_from = salary.get("from") if salary.get("from") is not None else 0
-                salary_to = salary.get("to") if salary.get("to") is not None else salary_from
-                currency = salary.get("currency") if salary.get("currency") is not None else "Не указано"
-                published_at = vac["published_at"]
-                responsibility = vac["snippet"]["responsibility"]
-                url = vac["alternate_url"]
-                vacancy_inf = {
-                    "name": name,
-                    "area": area,
-                    "salary_from": salary_from,
-                    "salary_to": salary_to,
-                    "currency": currency,
-                    "published_at": published_at,
-                    "responsibility": responsibility,
-                    "url": url,
-                }
-                vacancies.append(vacancy_inf)
-            data_vacs.extend(vacancies)
-            page_n += 1
-
-        data.append({"company": company_inf, "vacancies": data_vacs})
-    return data
+        yield from iter_employer_vacancies(employer_id, full, run_dir, checkpoint)
@@ -0,0 +1,308 @@
+"""
+HTTP-сервис только для чтения, отдающий результаты запросов DBManager в формате JSON.
+
+Запуск:
+    python -m src.cli serve --port 8080
+
+Эндпоинты:
+    GET /health                                    - проверка работоспособности
+    GET /companies                                 - компании и количество вакансий
+    GET /stats                                     - статистика зарплат по компаниям
+    GET /avg-salary                                - средняя зарплата
+    GET /vacancies?limit=100&after=<next>          - все вакансии, пагинация по ключу
+    GET /vacancies/higher-salary?limit=100&offset=0 - вакансии с зарплатой выше средней
+    GET /vacancies/keyword?q=python&limit=100&offset=0 - вакансии с ключевым словом в названии
+    GET /search?q=python&limit=50                  - полнотекстовый поиск
+
+Ответы кэшируются в памяти на cache_ttl секунд и снабжаются заголовком ETag;
+запрос с совпадающим If-None-Match получает ответ 304 без тела.
+"""
+
+import base64
+import hashlib
+import json
+import sys
+import threading
+import time
+import traceback
+from collections import OrderedDict
+from datetime import date
+from decimal import Decimal
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Callable, Tuple
+from urllib.parse import parse_qs, urlparse
+
+import psycopg2
+
+from src import metrics
+from src.DBManager import DBManager
+
+# Время жизни ответа в кэше в секундах
+CACHE_TTL = 5.0
+# Максимальное количество ответов в кэше
+CACHE_MAX_ENTRIES = 1024
+# Количество строк на странице по умолчанию и максимальное
+DEFAULT_LIMIT = 100
+MAX_LIMIT = 1000
+
+VACANCY_FIELDS = ("company_name", "vacancy_name", "salary_from", "salary_to", "currency", "url")
+STATS_FIELDS = ("company_name", "vacancies_count", "salaried_count", "avg_salary", "min_salary", "max_salary")
+
+
+class BadRequest(ValueError):
+    """Некорректные параметры запроса"""
+
+
+def _json_default(value: Any) -> Any:
+    """Преобразование значений из БД, не поддерживаемых JSON"""
+    if isinstance(value, Decimal):
+        return float(value)
+    if isinstance(value, date):
+        return value.isoformat()
+    raise TypeError(f"Тип {type(value).__name__} не поддерживается")
+
+
+def _records(rows: list[Tuple], fields: tuple[str, ...]) -> list[dict[str, Any]]:
+    """Строки результата запроса в виде словарей"""
+    return [dict(zip(fields, row)) for row in rows]
+
+
+def encode_key(key: Tuple | None) -> str | None:
+    """Кодирование ключа пагинации в непрозрачную строку для параметра after"""
+    if key is None:
+        return None
+    return base64.urlsafe_b64encode(json.dumps(list(key), ensure_ascii=False).encode("utf-8")).decode("ascii")
+
+
+def decode_key(token: str) -> Tuple:
+    """Декодирование параметра after в ключ пагинации (название компании, название вакансии, ID вакансии)"""
+    try:
+        key = json.loads(base64.urlsafe_b64decode(token.encode("ascii")))
+    except ValueError as e:
+        raise BadRequest("Некорректный параметр after") from e
+    if not isinstance(key, list) or len(key) != 3:
+        raise BadRequest("Некорректный параметр after")
+    company_name, vacancy_name, vacancy_id = key
+    if not isinstance(company_name, str) or not isinstance(vacancy_name, str) or type(vacancy_id) is not int:
+        raise BadRequest("Некорректный параметр after")
+    return company_name, vacancy_name, vacancy_id
+
+
+def _int_param(query: dict[str, str], name: str, default: int, maximum: int | None = None) -> int:
+    """Целочисленный параметр запроса с проверкой диапазона"""
+    try:
+        value = int(query.get(name, default))
+    except ValueError as e:
+        raise BadRequest(f"Параметр {name} должен быть целым числом") from e
+    if value < 0 or (maximum is not None and not 0 < value <= maximum):
+        raise BadRequest(f"Недопустимое значение параметра {name}")
+    return value
+
+
+def _text_param(query: dict[str, str], name: str) -> str:
+    """Обязательный текстовый параметр запроса"""
+    value = query.get(name, "").strip()
+    if not value:
+        raise BadRequest(f"Не указан параметр {name}")
+    return value
+
+
+class ResponseCache:
+    """Потокобезопасный кэш ответов с ограниченным временем жизни и вытеснением давно использованных"""
+
+    def __init__(self, ttl: float = CACHE_TTL, max_entries: int = CACHE_MAX_ENTRIES) -> None:
+        """Инициализация времени жизни и максимального количества ответов"""
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._entries: OrderedDict[str, tuple[float, bytes, str]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> tuple[bytes, str] | None:
+        """Получение тела ответа и ETag (None, если ответа нет или он устарел)"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[0] < time.monotonic():
+                return None
+            self._entries.move_to_end(key)
+            return entry[1], entry[2]
+
+    def put(self, key: str, body: bytes, etag: str) -> None:
+        """Сохранение ответа"""
+        if self.ttl <= 0:
+            return
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl, body, etag)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+
+class ApiServer:
+    """HTTP-сервер с JSON-эндпоинтами поверх DBManager"""
+
+    def __init__(
+        self, dbmanager: DBManager, host: str = "127.0.0.1", port: int = 8080, cache_ttl: float = CACHE_TTL
+    ) -> None:
+        """Инициализация сервера. Запросы к БД выполняются через пул соединений dbmanager."""
+        self.dbmanager = dbmanager
+        self.host = host
+        self.port = port
+        self.cache = ResponseCache(cache_ttl)
+        self.routes: dict[str, Callable[[dict[str, str]], Any]] = {
+            "/health": lambda query: {"status": "ok"},
+            "/companies": self.companies,
+            "/stats": self.stats,
+            "/avg-salary": self.avg_salary,
+            "/vacancies": self.vacancies,
+            "/vacancies/higher-salary": self.higher_salary,
+            "/vacancies/keyword": self.keyword,
+            "/search": self.search,
+        }
+        self._server: ThreadingHTTPServer | None = None
+        self._thread: threading.Thread | None = None
+
+    @property
+    def url(self) -> str:
+        """Адрес запущенного сервера"""
+        assert self._server is not None
+        host, port = self._server.server_address[:2]
+        return f"http://{host!s}:{port}"
+
+    def companies(self, query: dict[str, str]) -> Any:
+        """GET /companies"""
+        rows = self.dbmanager.get_companies_and_vacancies_count()
+        return {"items": _records(rows, ("company_name", "vacancies_count"))}
+
+    def stats(self, query: dict[str, str]) -> Any:
+        """GET /stats"""
+        return {"items": _records(self.dbmanager.get_company_salary_stats(), STATS_FIELDS)}
+
+    def avg_salary(self, query: dict[str, str]) -> Any:
+        """GET /avg-salary"""
+        return {"avg_salary": self.dbmanager.get_avg_salary()}
+
+    def vacancies(self, query: dict[str, str]) -> Any:
+        """GET /vacancies: пагинация по ключу, ключ следующей страницы передаётся в поле next"""
+        limit = _int_param(query, "limit", DEFAULT_LIMIT, MAX_LIMIT)
+        after = decode_key(query["after"]) if query.get("after") else None
+        rows, next_key = self.dbmanager.get_vacancies_page(after, limit)
+        return {"items": _records(rows, VACANCY_FIELDS), "next": encode_key(next_key)}
+
+    def _offset_page(self, rows: list[Tuple], query: dict[str, str]) -> Any:
+        """Страница результата запроса по параметрам offset и limit"""
+        limit = _int_param(query, "limit", DEFAULT_LIMIT, MAX_LIMIT)
+        offset = _int_param(query, "offset", 0)
+        next_offset = offset + limit if offset + limit < len(rows) else None
+        items = _records(rows[offset : offset + limit], VACANCY_FIELDS)
+        return {"items": items, "total": len(rows), "next": next_offset}
+
+    def higher_salary(self, query: dict[str, str]) -> Any:
+        """GET /vacancies/higher-salary"""
+        return self._offset_page(self.dbmanager.get_vacancies_with_higher_salary(), query)
+
+    def keyword(self, query: dict[str, str]) -> Any:
+        """GET /vacancies/keyword?q=..."""
+        return self._offset_page(self.dbmanager.get_vacancies_with_keyword(_text_param(query, "q")), query)
+
+    def search(self, query: dict[str, str]) -> Any:
+        """GET /search?q=..."""
+        limit = _int_param(query, "limit", 50, MAX_LIMIT)
+        rows = self.dbmanager.search_vacancies(_text_param(query, "q"), limit=limit)
+        return {"items": _records(rows, VACANCY_FIELDS)}
+
+    def respond(self, path: str, query: dict[str, str]) -> tuple[int, bytes, str | None]:
+        """Формирование ответа на запрос: код ответа, тело и ETag"""
+        key = path + "?" + "&".join(f"{name}={value}" for name, value in sorted(query.items()))
+        cached = self.cache.get(key)
+        if cached is not None:
+            metrics.inc("api_cache_total", result="hit")
+            return 200, cached[0], cached[1]
+        route = self.routes.get(path)
+        if route is None:
+            return 404, json.dumps({"error": "not found"}).encode("utf-8"), None
+        try:
+            payload = route(query)
+        except BadRequest as e:
+            return 400, json.dumps({"error": str(e)}, ensure_ascii=False).encode("utf-8"), None
+        except psycopg2.Error:
+            return 503, json.dumps({"error": "database unavailable"}).encode("utf-8"), None
+        except Exception:
+            # Непредвиденная ошибка обработчика не должна останавливать сервер, но и не должна теряться
+            metrics.inc("api_errors_total", path=path)
+            print(f"Ошибка при обработке запроса {path}:", file=sys.stderr)
+            traceback.print_exc()
+            return 500, json.dumps({"error": "internal error"}).encode("utf-8"), None
+        metrics.inc("api_cache_total", result="miss")
+        body = json.dumps(payload, ensure_ascii=False, default=_json_default).encode("utf-8")
+        etag = '"' + hashlib.md5(body).hexdigest() + '"'
+        self.cache.put(key, body, etag)
+        return 200, body, etag
+
+    def _handler_class(self) -> type[BaseHTTPRequestHandler]:
+        """Класс обработчика запросов, привязанный к этому серверу"""
+        api = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+            disable_nagle_algorithm = True
+
+            def do_GET(self) -> None:
+                parsed = urlparse(self.path)
+                query = {name: values[0] for name, values in parse_qs(parsed.query).items()}
+                with metrics.timer("api_request_seconds", path=parsed.path if parsed.path in api.routes else "other"):
+                    status, body, etag = api.respond(parsed.path.rstrip("/") or "/", query)
+                    if etag is not None and etag in self.headers.get("If-None-Match", ""):
+                        status, body = 304, b""
+                    self.send_response(status)
+                    if status != 304:
+                        self.send_header("Content-Type", "application/json; charset=utf-8")
+                    self.send_header("Content-Length", str(len(body)))
+                    if etag is not None:
+                        self.send_header("ETag", etag)
+                        self.send_header("Cache-Control", f"max-age={int(api.cache.ttl)}")
+                    self.end_headers()
+                    self.wfile.write(body)
+                metrics.inc("api_requests_total", status=status)
+
+            def log_message(self, format: str, *args: Any) -> None:
+                pass
+
+        return Handler
+
+    def _create_server(self) -> ThreadingHTTPServer:
+        """Создание HTTP-сервера на адресе host:port"""
+        server = ThreadingHTTPServer((self.host, self.port), self._handler_class())
+        server.daemon_threads = True
+        self._server = server
+        return server
+
+    def start(self) -> "ApiServer":
+        """Запуск сервера в фоновом потоке"""
+        server = self._create_server()
+        self._thread = threading.Thread(target=server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def serve_forever(self) -> None:
+        """Запуск сервера в текущем потоке (до прерывания Ctrl+C)"""
+        server = self._create_server()
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            server.server_close()
+            self._server = None
+
+    def stop(self) -> None:
+        """Остановка сервера"""
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+
+    def __enter__(self) -> "ApiServer":
+        return self.start()
+
+    def __exit__(self, exc_type: Any, exc_val: Any, exc_tb: Any) -> None:
+        self.stop()
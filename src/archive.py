@@ -0,0 +1,154 @@
+"""
+Архив необработанных ответов API HH.ru.
+
+Каждый запуск получения данных с параметром archive_dir сохраняет ответы в каталог
+<archive_dir>/<run_id>/, по одному сжатому NDJSON-файлу на работодателя. Первая строка файла -
+ответ /employers/{id}, далее - страницы /vacancies в порядке получения. Каждая строка сжимается
+отдельным членом gzip, поэтому при прерывании записи повреждается только последняя строка,
+а файл можно обрезать до последней сохранённой страницы и дописать (src.checkpoint).
+Архив можно повторно загрузить в БД без обращения к сети (iter_archive, load_archive).
+"""
+
+import glob
+import gzip
+import io
+import json
+import os
+from datetime import datetime
+from typing import Any, BinaryIO, Iterable, Iterator
+
+from src.models import Company, Vacancy, parse_vacancies
+
+# Расширение файлов архива
+ARCHIVE_SUFFIX = ".ndjson.gz"
+# Степень сжатия gzip (компромисс между размером архива и нагрузкой на процессор при получении данных)
+COMPRESS_LEVEL = 5
+# Размер буфера чтения распакованных данных в байтах
+READ_BUFFER_SIZE = 1024 * 1024
+
+
+def archive_path(run_dir: str, employer_id: str) -> str:
+    """Путь к файлу архива работодателя в каталоге запуска"""
+    return os.path.join(run_dir, f"{employer_id}{ARCHIVE_SUFFIX}")
+
+
+def new_run_dir(archive_dir: str) -> str:
+    """Создание каталога архива для нового запуска"""
+    run_dir = os.path.join(archive_dir, datetime.now().strftime("%Y%m%d-%H%M%S-%f"))
+    os.makedirs(run_dir, exist_ok=True)
+    return run_dir
+
+
+class EmployerArchive:
+    """Запись ответов API HH.ru об одном работодателе в файл архива"""
+
+    def __init__(self, run_dir: str, employer_id: str, resume_size: int | None = None) -> None:
+        """
+        Открытие файла архива работодателя.
+        :param resume_size: Размер ранее записанной части файла в байтах: файл обрезается до этого размера
+            и дописывается (None - файл создаётся заново).
+        """
+        self.path = archive_path(run_dir, employer_id)
+        self.employer_id = employer_id
+        self._file: BinaryIO
+        if resume_size is not None and os.path.exists(self.path):
+            self._file = open(self.path, "r+b")
+            self._file.truncate(resume_size)
+            self._file.seek(resume_size)
+        else:
+            self._file = open(self.path, "wb")
+
+    @property
+    def size(self) -> int:
+        """Размер записанной части файла в байтах"""
+        return self._file.tell()
+
+    def records(self) -> list[dict[str, Any]]:
+        """Чтение записей, сохранённых в файл ранее (при продолжении записи)"""
+        return list(_iter_records(self.path)) if self.size else []
+
+    def write_employer(self, company_data: dict[str, Any]) -> None:
+        """Запись ответа /employers/{id}"""
+        self._write({"employer_id": self.employer_id, "employer": company_data})
+
+    def write_page(self, page_n: int, data_vac: dict[str, Any], shard: list[str] | None = None) -> None:
+        """Запись страницы ответа /vacancies (shard - интервал дат публикации, в котором получена страница)"""
+        record: dict[str, Any] = {"page": page_n, "vacancies": data_vac}
+        if shard is not None:
+            record["shard"] = shard
+        self._write(record)
+
+    def _write(self, record: dict[str, Any]) -> None:
+        line = json.dumps(record, ensure_ascii=False) + "\n"
+        self._file.write(gzip.compress(line.encode("utf-8"), COMPRESS_LEVEL))
+        self._file.flush()
+
+    def close(self) -> None:
+        """Закрытие файла архива"""
+        self._file.close()
+
+    def __enter__(self) -> "EmployerArchive":
+        return self
+
+    def __exit__(self, exc_type: Any, exc_val: Any, exc_tb: Any) -> None:
+        self.close()
+
+
+def archive_employer(
+    run_dir: str, employer_id: str, company_data: dict[str, Any], pages: Iterable[dict[str, Any]]
+) -> None:
+    """Запись в архив всех полученных ответов об одном работодателе"""
+    with EmployerArchive(run_dir, employer_id) as archive:
+        archive.write_employer(company_data)
+        for page_n, data_vac in enumerate(pages):
+            archive.write_page(page_n, data_vac)
+
+
+def archive_files(path: str) -> list[str]:
+    """Список файлов архива: path может быть файлом или каталогом запуска"""
+    if os.path.isdir(path):
+        return sorted(glob.glob(os.path.join(path, f"*{ARCHIVE_SUFFIX}")))
+    return [path]
+
+
+def _iter_records(filename: str) -> Iterator[dict[str, Any]]:
+    """Построчное чтение записей из файла архива с буферизованной распаковкой"""
+    with gzip.open(filename, "rb") as raw:
+        with io.TextIOWrapper(io.BufferedReader(raw, READ_BUFFER_SIZE), encoding="utf-8") as file:
+            for line in file:
+                if line.strip():
+                    yield json.loads(line)
+
+
+def iter_archive(path: str) -> Iterator[tuple[Company, list[Vacancy]]]:
+    """
+    Потоковое чтение архива ответов API HH.ru.
+    :param path: Каталог запуска или отдельный файл архива.
+    :return: Возвращает итератор пар (Company, список Vacancy одной страницы), как iter_hh_vacancies.
+    """
+    for filename in archive_files(path):
+        company: Company | None = None
+        for record in _iter_records(filename):
+            if "employer" in record:
+                company = Company.from_api(record["employer_id"], record["employer"])
+                continue
+            if company is None:
+                raise ValueError(f"В файле архива {filename} нет данных о работодателе")
+            vacancies = parse_vacancies(record["vacancies"])
+            # Первая страница выдаётся и без вакансий, чтобы в данных были все компании
+            if vacancies or record["page"] == 0:
+                yield company, vacancies
+
+
+def load_archive(path: str) -> list[dict[str, Any]]:
+    """
+    Чтение архива ответов API HH.ru целиком.
+    :param path: Каталог запуска или отдельный файл архива.
+    :return: Возвращает список словарей {"company": Company, "vacancies": [Vacancy, ...]}, как get_hh_data_full.
+    """
+    data: list[dict[str, Any]] = []
+    for company, vacancies in iter_archive(path):
+        if not data or data[-1]["company"] is not company:
+            data.append({"company": company, "vacancies": []})
+        data[-1]["vacancies"].extend(vacancies)
+    return data
@@ -0,0 +1,146 @@
+"""
+Контрольные точки получения данных от API HH.ru для продолжения прерванной загрузки.
+
+Ответы API сохраняются в архив (src.archive), а прогресс - в файл состояния формата JSON Lines.
+Первая строка файла описывает запуск (каталог архива, полная или краткая загрузка), каждая следующая -
+сохранённую страницу работодателя (с размером файла архива после неё), план интервалов дат публикации,
+завершение работодателя или сброс его прогресса. Строки только дописываются в конец файла, поэтому
+стоимость контрольной точки не зависит от количества работодателей, а обрыв записи портит не более
+последней строки (при чтении она отбрасывается).
+
+При продолжении (resume=True) завершённые работодатели читаются из архива без обращения к сети,
+а у прерванного работодателя архив обрезается до последней сохранённой страницы и загрузка
+продолжается со следующей страницы. Если файл архива работодателя утерян или короче сохранённого размера,
+данные работодателя получаются заново.
+"""
+
+import json
+import os
+import threading
+from datetime import datetime
+from typing import Any
+
+from src.archive import new_run_dir
+
+# Файл состояния по умолчанию
+STATE_FILE = "hh_fetch_state.jsonl"
+# Каталог архива по умолчанию для загрузки с контрольными точками
+ARCHIVE_DIR = "archive"
+
+# Интервал дат публикации (date_from, date_to), как Shard в src.HH_api
+Shard = tuple[datetime, datetime]
+
+
+class EmployerState:
+    """Сохранённый прогресс получения данных об одном работодателе"""
+
+    def __init__(self) -> None:
+        # Количество сохранённых страниц вакансий и размер файла архива после последней из них
+        self.pages = 0
+        self.size = 0
+        # Интервалы дат публикации, на которые разбит поиск вакансий (None - поиск не разбивался)
+        self.shards: list[Shard] | None = None
+        self.done = False
+
+
+class Checkpoint:
+    """Файл состояния загрузки и прогресс работодателей. Методы записи потокобезопасны."""
+
+    def __init__(self, path: str, run_dir: str, full: bool) -> None:
+        """Инициализация файла состояния, каталога запуска архива и вида загрузки"""
+        self.path = path
+        self.run_dir = run_dir
+        self.full = full
+        self.employers: dict[str, EmployerState] = {}
+        self._lock = threading.Lock()
+
+    @classmethod
+    def open(
+        cls, path: str = STATE_FILE, archive_dir: str = ARCHIVE_DIR, full: bool = True, resume: bool = False
+    ) -> "Checkpoint":
+        """
+        Открытие файла состояния.
+        :param path: Файл состояния.
+        :param archive_dir: Каталог архива, в котором создаётся каталог нового запуска.
+        :param full: Полная (True) или краткая (False) загрузка.
+        :param resume: Продолжить загрузку из существующего файла состояния (если файла нет, начинается новая).
+        """
+        if resume and os.path.exists(path):
+            checkpoint = cls.load(path)
+            if checkpoint.full != full:
+                kind = "полной" if checkpoint.full else "краткой"
+                raise ValueError(f"Файл состояния {path} создан для {kind} загрузки")
+            return checkpoint
+        checkpoint = cls(path, new_run_dir(archive_dir), full)
+        with open(path, "w", encoding="utf-8") as file:
+            file.write(json.dumps({"run_dir": checkpoint.run_dir, "full": full}, ensure_ascii=False) + "\n")
+        return checkpoint
+
+    @classmethod
+    def load(cls, path: str) -> "Checkpoint":
+        """
+        Чтение файла состояния. Неполная последняя строка (обрыв записи) отбрасывается: файл обрезается
+        до последней полной строки, чтобы следующие записи не дописывались к оборванной строке.
+        """
+        with open(path, "r+b") as file:
+            header = json.loads(file.readline())
+            checkpoint = cls(path, header["run_dir"], header["full"])
+            end = file.tell()
+            for line in file:
+                try:
+                    record = json.loads(line) if line.endswith(b"\n") else None
+                except ValueError:
+                    record = None
+                if record is None:
+                    file.truncate(end)
+                    break
+                end += len(line)
+                if record.get("restart"):
+                    checkpoint.employers[record["employer"]] = EmployerState()
+                    continue
+                state = checkpoint.employers.setdefault(record["employer"], EmployerState())
+                if "pages" in record:
+                    state.pages, state.size = record["pages"], record["size"]
+                if "shards" in record:
+                    state.shards = [
+                        (datetime.fromisoformat(date_from), datetime.fromisoformat(date_to))
+                        for date_from, date_to in record["shards"]
+                    ]
+                if record.get("done"):
+                    state.done = True
+        return checkpoint
+
+    def get(self, employer_id: str) -> EmployerState | None:
+        """Сохранённый прогресс работодателя (None, если данные о нём ещё не получались)"""
+        return self.employers.get(employer_id)
+
+    def page_done(self, employer_id: str, pages: int, size: int) -> None:
+        """Сохранение страницы: pages - количество сохранённых страниц, size - размер файла архива"""
+        with self._lock:
+            state = self.employers.setdefault(employer_id, EmployerState())
+            state.pages, state.size = pages, size
+            self._append({"employer": employer_id, "pages": pages, "size": size})
+
+    def shards_planned(self, employer_id: str, shards: list[Shard]) -> None:
+        """Сохранение интервалов дат публикации, на которые разбит поиск вакансий работодателя"""
+        with self._lock:
+            self.employers.setdefault(employer_id, EmployerState()).shards = shards
+            self._append(
+                {"employer": employer_id, "shards": [[shard[0].isoformat(), shard[1].isoformat()] for shard in shards]}
+            )
+
+    def employer_done(self, employer_id: str) -> None:
+        """Отметка о получении всех данных работодателя"""
+        with self._lock:
+            self.employers.setdefault(employer_id, EmployerState()).done = True
+            self._append({"employer": employer_id, "done": True})
+
+    def employer_restarted(self, employer_id: str) -> None:
+        """Сброс прогресса работодателя, данные которого получаются заново (например, при потере файла архива)"""
+        with self._lock:
+            self.employers[employer_id] = EmployerState()
+            self._append({"employer": employer_id, "restart": True})
+
+    def _append(self, record: dict[str, Any]) -> None:
+        with open(self.path, "a", encoding="utf-8") as file:
+            file.write(json.dumps(record, ensure_ascii=False) + "\n")
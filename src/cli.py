@@ -0,0 +1,386 @@
+"""
+Неинтерактивный интерфейс командной строки.
+
+Примеры:
+    python -m src.cli fetch --employers 1740,80 --format ndjson > vacancies.ndjson
+    python -m src.cli load --employers 1740,80
+    python -m src.cli sync --employers 1740,80
+    python -m src.cli query higher-salary --format csv --output higher.csv
+    python -m src.cli query keyword python
+    python -m src.cli query salary-trend 1740 --date-from 2025-01-01
+    python -m src.cli load --archive-dir archive
+    python -m src.cli load --pipeline --workers 8
+    python -m src.cli load --employers-file employers.txt --resume
+    python -m src.cli sync --cache-dir .hh_cache
+    python -m src.cli replay archive/20250701-120000-000000
+    python -m src.cli serve --port 8080
+
+Модули requests и psycopg2 импортируются только командами, которым они нужны,
+поэтому, например, query не загружает HTTP-клиент.
+"""
+
+import argparse
+import csv
+import json
+import os
+import sys
+from datetime import date, timedelta
+from typing import Any, Iterable, Iterator, TextIO
+
+from src import metrics
+
+# ID компаний по умолчанию (те же, что в main.py)
+DEFAULT_EMPLOYERS = ["15478", "1740", "3529", "78638", "4181", "80", "1057", "3776", "2381", "84585"]
+
+VACANCY_COLUMNS = ["company_name", "vacancy_name", "salary_from", "salary_to", "currency", "url"]
+FETCH_COLUMNS = [
+    "company_id",
+    "company_name",
+    "vacancy_id",
+    "vacancy_name",
+    "area",
+    "salary_from",
+    "salary_to",
+    "currency",
+    "published_at",
+    "responsibility",
+    "url",
+]
+# Размер буфера вывода в байтах
+OUTPUT_BUFFER_SIZE = 1 << 16
+# Переменная окружения с каталогом дискового кэша ответов API (значение --cache-dir по умолчанию)
+CACHE_DIR_ENV = "HH_CACHE_DIR"
+
+
+def write_rows(rows: Iterable[Iterable[Any]], columns: list[str], output_format: str, output: TextIO) -> int:
+    """
+    Потоковая запись строк в формате CSV (с заголовком) или NDJSON (объект на строку).
+    Возвращает количество записанных строк.
+    """
+    count = 0
+    if output_format == "csv":
+        writer = csv.writer(output)
+        writer.writerow(columns)
+        for row in rows:
+            writer.writerow(row)
+            count += 1
+    else:
+        for row in rows:
+            output.write(json.dumps(dict(zip(columns, row)), ensure_ascii=False, default=str))
+            output.write("\n")
+            count += 1
+    return count
+
+
+def _open_output(path: str | None) -> TextIO:
+    """Открытие файла вывода с буферизацией (stdout, если путь не указан или равен '-')"""
+    if path is None or path == "-":
+        return sys.stdout
+    return open(path, "w", encoding="utf-8", newline="", buffering=OUTPUT_BUFFER_SIZE)
+
+
+def _employers(args: argparse.Namespace) -> list[str]:
+    """Список ID работодателей из аргументов командной строки или файла --employers-file"""
+    if args.employers_file:
+        from src.config import load_employers
+
+        return load_employers(args.employers_file)
+    if args.employers:
+        return [employer_id.strip() for employer_id in args.employers.split(",") if employer_id.strip()]
+    return DEFAULT_EMPLOYERS
+
+
+def _checkpoint(args: argparse.Namespace) -> Any:
+    """Контрольная точка загрузки, если указаны --resume или --state-file (иначе None)"""
+    if not args.resume and not args.state_file:
+        return None
+    from src.checkpoint import ARCHIVE_DIR, STATE_FILE, Checkpoint
+
+    return Checkpoint.open(
+        args.state_file or STATE_FILE, args.archive_dir or ARCHIVE_DIR, full=not args.short, resume=args.resume
+    )
+
+
+def _enable_cache(args: argparse.Namespace) -> None:
+    """Включение дискового кэша ответов API HH.ru, если указан --cache-dir"""
+    if args.cache_dir:
+        from src import transport
+
+        transport.enable_cache(args.cache_dir)
+
+
+def _db_params(args: argparse.Namespace) -> dict:
+    """Параметры подключения к PostgreSQL из файла конфигурации"""
+    from src.config import config
+
+    return config(args.config)
+
+
+def _fetch_rows(args: argparse.Namespace) -> Iterator[tuple]:
+    """Постраничное получение вакансий от API HH.ru в виде строк для вывода"""
+    from src.HH_api import iter_hh_vacancies
+
+    stream = iter_hh_vacancies(
+        _employers(args), full=not args.short, archive_dir=args.archive_dir, checkpoint=_checkpoint(args)
+    )
+    for company, vacancies in stream:
+        for vacancy in vacancies:
+            yield (
+                company["id"],
+                company["name"],
+                vacancy["id"],
+                vacancy["name"],
+                vacancy["area"],
+                vacancy["salary_from"],
+                vacancy["salary_to"],
+                vacancy["currency"],
+                vacancy["published_at"],
+                vacancy["responsibility"],
+                vacancy["url"],
+            )
+
+
+def cmd_fetch(args: argparse.Namespace) -> int:
+    """Команда fetch: вывод вакансий от API HH.ru без записи в БД"""
+    _enable_cache(args)
+    output = _open_output(args.output)
+    try:
+        write_rows(_fetch_rows(args), FETCH_COLUMNS, args.format, output)
+    finally:
+        if output is not sys.stdout:
+            output.close()
+    return 0
+
+
+def cmd_load(args: argparse.Namespace) -> int:
+    """Команда load: полная перезагрузка БД данными от API HH.ru"""
+    from src.database_utils import create_database, save_data_to_database, save_stream_to_database
+    from src.HH_api import get_hh_data_full, get_hh_data_short, iter_hh_vacancies
+
+    params = _db_params(args)
+    employers_id = _employers(args)
+    checkpoint = _checkpoint(args)
+    _enable_cache(args)
+    if args.pipeline:
+        from src.pipeline import run_pipeline
+
+        run_pipeline(
+            employers_id,
+            args.dbname,
+            params,
+            workers=args.workers,
+            queue_size=args.queue_size,
+            full=not args.short,
+            archive_dir=args.archive_dir,
+            checkpoint=checkpoint,
+        )
+    elif args.stream:
+        create_database(args.dbname, params)
+        stream = iter_hh_vacancies(
+            employers_id, full=not args.short, archive_dir=args.archive_dir, checkpoint=checkpoint
+        )
+        save_stream_to_database(stream, args.dbname, params)
+    else:
+        fetch = get_hh_data_short if args.short else get_hh_data_full
+        hh_data = fetch(employers_id, max_workers=args.workers, archive_dir=args.archive_dir, checkpoint=checkpoint)
+        create_database(args.dbname, params)
+        save_data_to_database(hh_data, args.dbname, params)
+    return 0
+
+
+def cmd_sync(args: argparse.Namespace) -> int:
+    """Команда sync: инкрементальная синхронизация БД с данными от API HH.ru"""
+    from src.database_utils import ensure_database, sync_data_to_database
+    from src.HH_api import get_hh_data_full
+
+    params = _db_params(args)
+    _enable_cache(args)
+    hh_data = get_hh_data_full(
+        _employers(args), max_workers=args.workers, archive_dir=args.archive_dir, checkpoint=_checkpoint(args)
+    )
+    ensure_database(args.dbname, params)
+    sync_data_to_database(hh_data, args.dbname, params)
+    return 0
+
+
+def cmd_replay(args: argparse.Namespace) -> int:
+    """Команда replay: загрузка в БД сохранённого архива ответов API HH.ru без обращения к сети"""
+    from src.archive import iter_archive, load_archive
+    from src.database_utils import (create_database, ensure_database, save_data_to_database, save_stream_to_database,
+                                    sync_data_to_database)
+
+    params = _db_params(args)
+    if args.sync:
+        ensure_database(args.dbname, params)
+        sync_data_to_database(load_archive(args.path), args.dbname, params)
+    elif args.stream:
+        create_database(args.dbname, params)
+        save_stream_to_database(iter_archive(args.path), args.dbname, params)
+    else:
+        hh_data = load_archive(args.path)
+        create_database(args.dbname, params)
+        save_data_to_database(hh_data, args.dbname, params)
+    return 0
+
+
+def cmd_query(args: argparse.Namespace) -> int:
+    """Команда query: потоковый вывод результата запроса к БД"""
+    from src.DBManager import DBManager
+
+    dbmanager = DBManager(args.dbname, _db_params(args))
+    rows: Iterable[Iterable[Any]]
+    if args.name == "companies":
+        rows, columns = dbmanager.get_companies_and_vacancies_count(), ["company_name", "vacancies_count"]
+    elif args.name == "stats":
+        rows = dbmanager.get_company_salary_stats()
+        columns = ["company_name", "vacancies_count", "salaried_count", "avg_salary", "min_salary", "max_salary"]
+    elif args.name == "vacancies":
+        rows, columns = dbmanager.iter_all_vacancies(), VACANCY_COLUMNS
+    elif args.name == "avg-salary":
+        rows, columns = [(dbmanager.get_avg_salary(),)], ["avg_salary"]
+    elif args.name == "higher-salary":
+        rows, columns = dbmanager.iter_vacancies_with_higher_salary(), VACANCY_COLUMNS
+    elif args.name == "keyword":
+        if not args.text:
+            print("Для запроса keyword укажите ключевое слово", file=sys.stderr)
+            return 2
+        rows, columns = dbmanager.iter_vacancies_with_keyword(args.text), VACANCY_COLUMNS
+    elif args.name in ("count-trend", "salary-trend"):
+        date_from = args.date_from or date.today() - timedelta(days=365)
+        if args.name == "count-trend":
+            rows = dbmanager.get_vacancies_count_trend(date_from, args.date_to, args.text)
+            columns = ["snapshot_date", "company_name", "vacancies_count"]
+        else:
+            rows = dbmanager.get_median_salary_trend(date_from, args.date_to, args.text)
+            columns = ["snapshot_date", "company_name", "median_salary"]
+    else:
+        if not args.text:
+            print("Для запроса search укажите поисковую фразу", file=sys.stderr)
+            return 2
+        rows, columns = dbmanager.search_vacancies(args.text, limit=args.limit), VACANCY_COLUMNS
+
+    output = _open_output(args.output)
+    try:
+        write_rows(rows, columns, args.format, output)
+    finally:
+        if output is not sys.stdout:
+            output.close()
+        dbmanager.disconnect()
+    return 0
+
+
+def cmd_serve(args: argparse.Namespace) -> int:
+    """Команда serve: HTTP-сервис с JSON-эндпоинтами запросов к БД"""
+    from src.api_server import ApiServer
+    from src.DBManager import DBManager
+
+    dbmanager = DBManager(args.dbname, _db_params(args), maxconn=args.maxconn, cache_bytes=args.cache_bytes)
+    server = ApiServer(dbmanager, args.host, args.port, args.cache_ttl)
+    print(f"Сервис запущен на http://{args.host}:{args.port}", file=sys.stderr)
+    try:
+        server.serve_forever()
+    finally:
+        dbmanager.disconnect()
+    return 0
+
+
+def build_parser() -> argparse.ArgumentParser:
+    """Описание команд и аргументов командной строки"""
+    common = argparse.ArgumentParser(add_help=False)
+    common.add_argument("--dbname", default="vacancies_db", help="имя базы данных (по умолчанию vacancies_db)")
+    common.add_argument("--config", default="database.ini", help="файл с параметрами подключения к PostgreSQL")
+    common.add_argument("--metrics", help="сохранить метрики в файл (Prometheus или .json)")
+
+    fetching = argparse.ArgumentParser(add_help=False)
+    fetching.add_argument("--employers", help="ID работодателей через запятую")
+    fetching.add_argument("--short", action="store_true", help="только первая страница вакансий работодателя")
+    fetching.add_argument("--employers-file", help="файл с ID работодателей (по одному или несколько в строке)")
+    fetching.add_argument("--archive-dir", help="каталог для сохранения необработанных ответов API")
+    fetching.add_argument(
+        "--state-file", help="файл состояния для продолжения прерванной загрузки (ответы сохраняются в архив)"
+    )
+    fetching.add_argument(
+        "--resume", action="store_true", help="продолжить загрузку из файла состояния, пропуская полученные данные"
+    )
+    fetching.add_argument(
+        "--cache-dir",
+        default=os.environ.get(CACHE_DIR_ENV),
+        help=f"каталог дискового кэша ответов API с условными запросами (по умолчанию ${CACHE_DIR_ENV})",
+    )
+
+    output = argparse.ArgumentParser(add_help=False)
+    output.add_argument("--format", choices=["ndjson", "csv"], default="ndjson", help="формат вывода")
+    output.add_argument("--output", "-o", help="файл вывода (по умолчанию stdout)")
+
+    parser = argparse.ArgumentParser(prog="python -m src.cli", description="Поиск вакансий API HH.ru с БД PostgreSQL")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    fetch = subparsers.add_parser("fetch", parents=[common, fetching, output], help="получить вакансии от API HH.ru")
+    fetch.set_defaults(handler=cmd_fetch)
+
+    load = subparsers.add_parser("load", parents=[common, fetching], help="пересоздать БД и загрузить вакансии")
+    load.add_argument("--workers", type=int, default=8, help="количество одновременных запросов к API")
+    load.add_argument("--stream", action="store_true", help="записывать вакансии в БД постранично по мере получения")
+    load.add_argument(
+        "--pipeline", action="store_true", help="получать вакансии в --workers потоках одновременно с записью в БД"
+    )
+    load.add_argument("--queue-size", type=int, default=64, help="максимум страниц, ожидающих записи (--pipeline)")
+    load.set_defaults(handler=cmd_load)
+
+    sync = subparsers.add_parser("sync", parents=[common, fetching], help="инкрементально обновить БД")
+    sync.add_argument("--workers", type=int, default=8, help="количество одновременных запросов к API")
+    sync.set_defaults(handler=cmd_sync)
+
+    replay = subparsers.add_parser("replay", parents=[common], help="загрузить в БД архив ответов API")
+    replay.add_argument("path", help="каталог запуска или файл архива")
+    replay.add_argument("--stream", action="store_true", help="записывать вакансии в БД постранично по мере чтения")
+    replay.add_argument("--sync", action="store_true", help="инкрементально обновить БД вместо пересоздания")
+    replay.set_defaults(handler=cmd_replay)
+
+    query = subparsers.add_parser("query", parents=[common, output], help="выполнить запрос к БД")
+    query.add_argument(
+        "name",
+        choices=[
+            "companies",
+            "stats",
+            "vacancies",
+            "avg-salary",
+            "higher-salary",
+            "keyword",
+            "search",
+            "count-trend",
+            "salary-trend",
+        ],
+    )
+    query.add_argument(
+        "text", nargs="?", help="ключевое слово (keyword), поисковая фраза (search) или ID компании (*-trend)"
+    )
+    query.add_argument("--limit", type=int, default=50, help="количество результатов поиска (search)")
+    query.add_argument(
+        "--date-from", type=date.fromisoformat, help="начало периода истории, ГГГГ-ММ-ДД (по умолчанию год назад)"
+    )
+    query.add_argument("--date-to", type=date.fromisoformat, help="конец периода истории (по умолчанию сегодня)")
+    query.set_defaults(handler=cmd_query)
+
+    serve = subparsers.add_parser("serve", parents=[common], help="запустить HTTP-сервис запросов к БД")
+    serve.add_argument("--host", default="127.0.0.1", help="адрес сервиса")
+    serve.add_argument("--port", type=int, default=8080, help="порт сервиса")
+    serve.add_argument("--cache-ttl", type=float, default=5.0, help="время жизни ответов в кэше, с")
+    serve.add_argument("--maxconn", type=int, default=10, help="максимальное количество соединений с БД")
+    serve.add_argument("--cache-bytes", type=int, default=64 * 1024 * 1024, help="объём кэша результатов запросов")
+    serve.set_defaults(handler=cmd_serve)
+
+    return parser
+
+
+def main(argv: list[str] | None = None) -> int:
+    """Точка входа интерфейса командной строки. Возвращает код завершения."""
+    args = build_parser().parse_args(argv)
+    if args.metrics:
+        metrics.enable(args.metrics)
+    result: int = args.handler(args)
+    return result
+
+
+if __name__ == "__main__":
+    sys.exit(main())
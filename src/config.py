@@ -18,3 +18,18 @@ def config(filename: str = "../database.ini", section: str = "postgresql") -> di
     else:
         raise Exception("Section {0} is not found in the {1} file.".format(section, filename))
     return db
+
+
+def load_employers(filename: str) -> list[str]:
+    """
+    Функция для получения списка ID работодателей из текстового файла.
+    В строке файла может быть один или несколько ID через запятую или пробел,
+    пустые строки и текст после символа # пропускаются. Повторяющиеся ID исключаются с сохранением порядка.
+    Возвращает список ID работодателей.
+    """
+    employers_id: dict[str, None] = {}
+    with open(filename, encoding="utf-8") as file:
+        for line in file:
+            for employer_id in line.split("#", 1)[0].replace(",", " ").split():
+                employers_id[employer_id] = None
+    return list(employers_id)
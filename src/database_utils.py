@@ -1,31 +1,59 @@
-from typing import Any
+import csv
+import hashlib
+import io
+import itertools
+import json
+import os
+import time
+from datetime import date
+from typing import Any, Iterable, Iterator, Sequence
 
 import psycopg2
+from psycopg2.extras import execute_values
 
+from src import metrics
+from src.models import Company, Vacancy
 
-def create_database(database_name: str, params: dict) -> None:
-    """Создание базы данных и таблиц для сохранения данных о компаниях и вакансиях"""
-    conn = psycopg2.connect(dbname="postgres", **params)
-    conn.autocommit = True
-    cur = conn.cursor()
+# Размер порции данных, передаваемой в COPY за одно чтение
+COPY_CHUNK_SIZE = 64 * 1024
 
-    try:
-        cur.execute(f"DROP DATABASE {database_name}")
-    except Exception as e:
-        print(f"Информация: {e}. БД будет создана.")
-    finally:
-        cur.execute(f"CREATE DATABASE {database_name} ENCODING 'UTF8'")
-
-    cur.close()
-    conn.close()
+# Столбцы таблицы vacancies, заполняемые загрузчиком
+VACANCY_COLUMNS = (
+    "hh_id, company_id, name, area, salary_from, salary_to, currency, published_at, responsibility, url, content_hash"
+)
+# Столбцы таблицы vacancies, добавленные после первой версии схемы, с их определениями.
+# Добавляются в существующую таблицу при создании таблиц (ALTER TABLE ... ADD COLUMN IF NOT EXISTS)
+VACANCY_ADDED_COLUMNS = {
+    "salary_mid": """NUMERIC GENERATED ALWAYS AS (
+        (COALESCE(NULLIF(salary_from, 0), NULLIF(salary_to, 0))
+        + COALESCE(NULLIF(salary_to, 0), NULLIF(salary_from, 0))) / 2.0
+    ) STORED""",
+    "salary_from_rub": "NUMERIC",
+    "salary_to_rub": "NUMERIC",
+    "salary_mid_rub": "NUMERIC",
+    "search_vector": """TSVECTOR GENERATED ALWAYS AS (
+        setweight(to_tsvector('russian', coalesce(name, '')), 'A')
+        || setweight(to_tsvector('english', coalesce(name, '')), 'A')
+        || setweight(to_tsvector('russian', coalesce(responsibility, '')), 'B')
+        || setweight(to_tsvector('english', coalesce(responsibility, '')), 'B')
+    ) STORED""",
+}
+# Файл с курсами валют к рублю
+EXCHANGE_RATES_FILE = os.path.join(os.path.dirname(__file__), "data", "exchange_rates.json")
+# Срок хранения истории вакансий в месяцах: более старые месячные секции vacancy_history удаляются
+HISTORY_RETENTION_MONTHS = 24
+# Префикс имён месячных секций таблицы vacancy_history (vacancy_history_YYYYMM)
+HISTORY_PARTITION_PREFIX = "vacancy_history_"
 
-    conn = psycopg2.connect(dbname=database_name, **params)
 
+def _create_tables(conn: Any) -> None:
+    """Создание таблиц для сохранения данных о компаниях и вакансиях, если они ещё не созданы"""
     with conn.cursor() as cur:
         cur.execute(
             """
-            CREATE TABLE companies (
+            CREATE TABLE IF NOT EXISTS companies (
                 company_id SERIAL PRIMARY KEY,
+                hh_id VARCHAR(20) UNIQUE,
                 name VARCHAR(255) NOT NULL,
                 area VARCHAR(255) NOT NULL,
                 open_vacancies INT,
@@ -39,8 +67,9 @@ def create_database(database_name: str, params: dict) -> None:
     with conn.cursor() as cur:
         cur.execute(
             """
-            CREATE TABLE vacancies (
+            CREATE TABLE IF NOT EXISTS vacancies (
                 vacancy_id SERIAL PRIMARY KEY,
+                hh_id VARCHAR(20) UNIQUE,
                 company_id INT REFERENCES companies(company_id),
                 name VARCHAR(255) NOT NULL,
                 area VARCHAR(255) NOT NULL,
@@ -49,61 +78,565 @@ def create_database(database_name: str, params: dict) -> None:
                 currency VARCHAR(10),
                 published_at DATE,
                 responsibility VARCHAR(255),
-                url VARCHAR(255)
+                url VARCHAR(255),
+                content_hash CHAR(32),
+                archived BOOLEAN NOT NULL DEFAULT FALSE,
+                updated_at TIMESTAMP NOT NULL DEFAULT now()
             )
         """
         )
+        # Таблица, созданная предыдущей версией схемы, дополняется недостающими столбцами
+        cur.execute(
+            "SELECT column_name FROM information_schema.columns "
+            "WHERE table_schema = current_schema() AND table_name = 'vacancies'"
+        )
+        existing_columns = {row[0] for row in cur.fetchall()}
+        for column, definition in VACANCY_ADDED_COLUMNS.items():
+            cur.execute(f"ALTER TABLE vacancies ADD COLUMN IF NOT EXISTS {column} {definition}")
+        if "salary_mid_rub" not in existing_columns:
+            # Агрегаты старой схемы считались по зарплате без пересчёта в рубли: представление пересоздаётся ниже
+            cur.execute("DROP MATERIALIZED VIEW IF EXISTS company_stats")
 
+    with conn.cursor() as cur:
+        # Триграммный индекс для поиска подстроки (ILIKE '%...%') и GIN-индекс для полнотекстового поиска
+        cur.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+        cur.execute("CREATE INDEX IF NOT EXISTS vacancies_name_trgm_idx ON vacancies USING gin (name gin_trgm_ops)")
+        cur.execute("CREATE INDEX IF NOT EXISTS vacancies_search_idx ON vacancies USING gin (search_vector)")
+        # Индекс по середине вилки зарплаты в рублях для фильтрации и сортировки по зарплате
+        cur.execute(
+            """
+            CREATE INDEX IF NOT EXISTS vacancies_salary_mid_rub_idx ON vacancies (salary_mid_rub)
+            WHERE NOT archived AND salary_mid_rub IS NOT NULL
+            """
+        )
+
+    with conn.cursor() as cur:
+        # Индексы для сортировки вакансий по компании и названию (пагинация по ключу)
+        cur.execute("CREATE INDEX IF NOT EXISTS companies_name_idx ON companies (name, company_id)")
+        cur.execute(
+            """
+            CREATE INDEX IF NOT EXISTS vacancies_company_name_idx ON vacancies (company_id, name, vacancy_id)
+            WHERE NOT archived
+            """
+        )
+
+    with conn.cursor() as cur:
+        # Агрегаты по компаниям, обновляются после каждой загрузки (refresh_company_stats)
+        cur.execute(
+            """
+            CREATE MATERIALIZED VIEW IF NOT EXISTS company_stats AS
+            SELECT
+                companies.company_id,
+                companies.name,
+                COUNT(vacancies.vacancy_id) AS vacancies_count,
+                COUNT(vacancies.salary_mid_rub) AS salaried_count,
+                ROUND(AVG(vacancies.salary_mid_rub), 2) AS avg_salary,
+                MIN(vacancies.salary_mid_rub) AS min_salary,
+                MAX(vacancies.salary_mid_rub) AS max_salary
+            FROM companies
+            LEFT JOIN vacancies ON companies.company_id = vacancies.company_id AND NOT vacancies.archived
+            GROUP BY companies.company_id, companies.name
+            """
+        )
+        cur.execute("CREATE UNIQUE INDEX IF NOT EXISTS company_stats_company_id_idx ON company_stats (company_id)")
+
+    with conn.cursor() as cur:
+        # Курсы валют к рублю, загружаются из файла EXCHANGE_RATES_FILE при каждой загрузке данных
+        cur.execute(
+            """
+            CREATE TABLE IF NOT EXISTS exchange_rates (
+                currency VARCHAR(10) PRIMARY KEY,
+                rate NUMERIC NOT NULL,
+                version VARCHAR(20) NOT NULL
+            )
+            """
+        )
+
+    with conn.cursor() as cur:
+        # Номер поколения данных, увеличивается каждой загрузкой (используется для сброса кэша DBManager)
+        cur.execute(
+            """
+            CREATE TABLE IF NOT EXISTS load_generation (
+                id BOOLEAN PRIMARY KEY DEFAULT TRUE CHECK (id),
+                generation BIGINT NOT NULL DEFAULT 0
+            )
+            """
+        )
+        cur.execute("INSERT INTO load_generation DEFAULT VALUES ON CONFLICT DO NOTHING")
+
+    with conn.cursor() as cur:
+        # История открытых вакансий: снимок после каждой загрузки, секционирование по месяцам даты снимка.
+        # Компании указываются по ID HH.ru, так как company_id меняется при полной перезагрузке.
+        cur.execute(
+            """
+            CREATE TABLE IF NOT EXISTS vacancy_history (
+                snapshot_date DATE NOT NULL,
+                hh_id VARCHAR(20) NOT NULL,
+                company_hh_id VARCHAR(20) NOT NULL,
+                company_name VARCHAR(255) NOT NULL,
+                name VARCHAR(255) NOT NULL,
+                area VARCHAR(255) NOT NULL,
+                published_at DATE,
+                salary_mid_rub NUMERIC,
+                PRIMARY KEY (snapshot_date, hh_id)
+            ) PARTITION BY RANGE (snapshot_date)
+            """
+        )
+        cur.execute(
+            "CREATE INDEX IF NOT EXISTS vacancy_history_company_idx ON vacancy_history (company_hh_id, snapshot_date)"
+        )
+
+    conn.commit()
+
+
+def _create_database_if_missing(database_name: str, params: dict) -> None:
+    """Создание пустой базы данных, если её ещё нет"""
+    conn = psycopg2.connect(dbname="postgres", **params)
+    conn.autocommit = True
+    with conn.cursor() as cur:
+        cur.execute("SELECT 1 FROM pg_database WHERE datname = %s", (database_name,))
+        if cur.fetchone() is None:
+            cur.execute(f"CREATE DATABASE {database_name} ENCODING 'UTF8'")
+    conn.close()
+
+
+def create_database(database_name: str, params: dict) -> None:
+    """
+    Создание базы данных и таблиц для сохранения данных о компаниях и вакансиях.
+    Таблицы компаний и вакансий пересоздаются, а история вакансий (vacancy_history)
+    и номер поколения данных сохраняются между загрузками.
+    """
+    _create_database_if_missing(database_name, params)
+
+    conn = psycopg2.connect(dbname=database_name, **params)
+    with conn.cursor() as cur:
+        cur.execute("DROP MATERIALIZED VIEW IF EXISTS company_stats")
+        cur.execute("DROP TABLE IF EXISTS vacancies, companies, exchange_rates CASCADE")
     conn.commit()
+    _create_tables(conn)
     conn.close()
 
 
+def ensure_database(database_name: str, params: dict) -> None:
+    """
+    Создание базы данных и таблиц только в случае их отсутствия.
+    В отличие от create_database существующие данные сохраняются, что нужно для инкрементальной синхронизации.
+    """
+    _create_database_if_missing(database_name, params)
+
+    conn = psycopg2.connect(dbname=database_name, **params)
+    _create_tables(conn)
+    conn.close()
+
+
+class _CsvStream:
+    """
+    Файлоподобный объект, лениво формирующий CSV из итератора строк.
+    Используется как источник для COPY ... FROM STDIN, чтобы не держать все данные в памяти.
+    """
+
+    def __init__(self, rows: Iterable[tuple]) -> None:
+        self.rows = iter(rows)
+        self.count = 0
+        self._buffer = io.StringIO()
+        self._writer = csv.writer(self._buffer)
+        self._pending = ""
+
+    def read(self, size: int = -1) -> str:
+        """Чтение очередной порции CSV размером не менее size символов (или до конца данных)"""
+        while size < 0 or len(self._pending) < size:
+            row = next(self.rows, None)
+            if row is None:
+                break
+            self._writer.writerow(row)
+            self.count += 1
+            if self._buffer.tell() >= COPY_CHUNK_SIZE:
+                self._pending += self._buffer.getvalue()
+                self._buffer.seek(0)
+                self._buffer.truncate()
+        self._pending += self._buffer.getvalue()
+        self._buffer.seek(0)
+        self._buffer.truncate()
+        if size < 0:
+            size = len(self._pending)
+        chunk, self._pending = self._pending[:size], self._pending[size:]
+        return chunk
+
+    def readline(self, size: int = -1) -> str:
+        """Метод нужен psycopg2 для распознавания файлоподобного объекта"""
+        return self.read(size)
+
+
+def _content_hash(vacancy: Vacancy) -> str:
+    """Хэш содержимого вакансии (всех полей, кроме ID) для определения изменившихся строк при синхронизации"""
+    content = "\x1f".join(map(str, vacancy[1:]))
+    return hashlib.md5(content.encode("utf-8")).hexdigest()
+
+
+def _company_row(company_data: Company | dict[str, Any]) -> tuple:
+    """Формирование строки таблицы companies из записи Company (или словаря с теми же полями)"""
+    company = Company.coerce(company_data)
+    industry = company.industries[0]["name"] if company.industries else None
+    return company.id, company.name, company.area, company.open_vacancies, industry, company.url, company.vacancies_url
+
+
+def _vacancy_rows(
+    company_id: int, vacancies_data: Iterable[Vacancy | dict[str, Any]], seen: set[str]
+) -> Iterator[tuple]:
+    """
+    Формирование строк таблицы vacancies из записей Vacancy (или словарей с теми же полями).
+    Вакансии, уже встречавшиеся в seen (повторы при постраничной выдаче HH), пропускаются.
+    """
+    for vacancy_data in vacancies_data:
+        vacancy = Vacancy.coerce(vacancy_data)
+        if vacancy.id in seen:
+            continue
+        seen.add(vacancy.id)
+        yield (vacancy.id, company_id, *vacancy[1:], _content_hash(vacancy))
+
+
+def _unique_companies(companies_data: Sequence[Company | dict[str, Any]]) -> list[Company | dict[str, Any]]:
+    """Компании без повторов по ID HH.ru (повторный ID в списке работодателей), в порядке первого появления"""
+    unique: dict[str, Company | dict[str, Any]] = {}
+    for company_data in companies_data:
+        unique.setdefault(str(company_data["id"]), company_data)
+    return list(unique.values())
+
+
+def _insert_companies(cur: Any, companies_data: Sequence[Company | dict[str, Any]]) -> list[int]:
+    """
+    Добавление компаний в таблицу companies одним запросом.
+    Возвращает список company_id в порядке переданных компаний (повторы одной компании получают один company_id).
+    """
+    if not companies_data:
+        return []
+    unique = _unique_companies(companies_data)
+    with metrics.timer("db_statement_seconds", statement="insert_companies"):
+        rows = execute_values(
+            cur,
+            """
+            INSERT INTO companies (hh_id, name, area, open_vacancies, industries, url, vacancies_url)
+            VALUES %s
+            RETURNING hh_id, company_id
+            """,
+            [_company_row(company_data) for company_data in unique],
+            page_size=len(unique),
+            fetch=True,
+        )
+    company_ids = dict(rows)
+    return [company_ids[str(company_data["id"])] for company_data in companies_data]
+
+
+def _copy_vacancies(cur: Any, rows: Iterable[tuple], table: str = "vacancies") -> int:
+    """Потоковая загрузка строк в таблицу вакансий через COPY. Возвращает количество строк."""
+    stream = _CsvStream(rows)
+    with metrics.timer("db_statement_seconds", statement=f"copy_{table}"):
+        cur.copy_expert(
+            f"""
+            COPY {table} ({VACANCY_COLUMNS})
+            FROM STDIN WITH (FORMAT csv)
+            """,
+            stream,
+            size=COPY_CHUNK_SIZE,
+        )
+    return stream.count
+
+
+def _report_load(rows_count: int, started: float) -> None:
+    """Вывод информации о скорости загрузки"""
+    elapsed = time.perf_counter() - started
+    rate = rows_count / elapsed if elapsed > 0 else 0.0
+    metrics.observe("pipeline_stage_seconds", elapsed, stage="load")
+    metrics.inc("db_rows_loaded_total", rows_count)
+    print(f"Загружено вакансий: {rows_count} за {elapsed:.2f} с ({rate:.0f} строк/с)")
+
+
+def refresh_company_stats(cur: Any) -> None:
+    """Обновление агрегатов по компаниям без блокировки чтения представления"""
+    cur.execute("REFRESH MATERIALIZED VIEW CONCURRENTLY company_stats")
+
+
+def load_exchange_rates(cur: Any, filename: str = EXCHANGE_RATES_FILE) -> str:
+    """
+    Загрузка курсов валют к рублю из версионируемого JSON-файла в таблицу exchange_rates.
+    Курсы валют, отсутствующих в файле, удаляются. Возвращает версию курсов.
+    """
+    with open(filename, encoding="utf-8") as file:
+        rates_data = json.load(file)
+    version = rates_data["version"]
+    cur.execute("DELETE FROM exchange_rates WHERE currency <> ALL(%s)", (list(rates_data["rates"]),))
+    execute_values(
+        cur,
+        """
+        INSERT INTO exchange_rates (currency, rate, version) VALUES %s
+        ON CONFLICT (currency) DO UPDATE SET rate = EXCLUDED.rate, version = EXCLUDED.version
+        """,
+        [(currency, rate, version) for currency, rate in rates_data["rates"].items()],
+    )
+    return str(version)
+
+
+def _normalize_salaries(cur: Any) -> None:
+    """
+    Пересчёт зарплат в рубли одним запросом по таблице exchange_rates.
+    У вакансий без зарплаты или в валюте без курса значения в рублях сбрасываются (NULL), в том числе
+    после синхронизации, изменившей зарплату. Перезаписываются только строки, у которых значение изменилось.
+    """
+    cur.execute(
+        """
+        UPDATE vacancies AS v SET
+            salary_from_rub = n.salary_from_rub,
+            salary_to_rub = n.salary_to_rub,
+            salary_mid_rub = n.salary_mid_rub
+        FROM (
+            SELECT
+                vacancies.vacancy_id,
+                NULLIF(vacancies.salary_from, 0) * r.rate AS salary_from_rub,
+                NULLIF(vacancies.salary_to, 0) * r.rate AS salary_to_rub,
+                vacancies.salary_mid * r.rate AS salary_mid_rub
+            FROM vacancies
+            LEFT JOIN exchange_rates AS r ON r.currency = vacancies.currency
+        ) AS n
+        WHERE n.vacancy_id = v.vacancy_id
+        AND (v.salary_mid_rub, v.salary_from_rub, v.salary_to_rub) IS DISTINCT FROM
+            (n.salary_mid_rub, n.salary_from_rub, n.salary_to_rub)
+        """
+    )
+
+
+def _month_start(day: date, shift: int = 0) -> date:
+    """Первый день месяца, отстоящего от месяца даты day на shift месяцев"""
+    month = day.year * 12 + day.month - 1 + shift
+    return date(month // 12, month % 12 + 1, 1)
+
+
+def ensure_history_partition(cur: Any, day: date) -> str:
+    """Создание месячной секции vacancy_history, содержащей дату day, если её ещё нет. Возвращает имя секции."""
+    start = _month_start(day)
+    name = f"{HISTORY_PARTITION_PREFIX}{start:%Y%m}"
+    cur.execute(
+        f"""
+        CREATE TABLE IF NOT EXISTS {name} PARTITION OF vacancy_history
+        FOR VALUES FROM (%s) TO (%s)
+        """,
+        (start, _month_start(day, 1)),
+    )
+    return name
+
+
+def drop_old_history_partitions(
+    cur: Any, retention_months: int = HISTORY_RETENTION_MONTHS, today: date | None = None
+) -> list[str]:
+    """
+    Удаление секций vacancy_history, целиком находящихся за пределами срока хранения.
+    Удаление секции не требует построчного DELETE и не оставляет «мёртвых» строк.
+    Возвращает имена удалённых секций.
+    """
+    cutoff = f"{HISTORY_PARTITION_PREFIX}{_month_start(today or date.today(), -retention_months):%Y%m}"
+    cur.execute(
+        """
+        SELECT child.relname
+        FROM pg_inherits
+        JOIN pg_class parent ON parent.oid = pg_inherits.inhparent
+        JOIN pg_class child ON child.oid = pg_inherits.inhrelid
+        WHERE parent.relname = 'vacancy_history'
+        ORDER BY child.relname
+        """
+    )
+    # Имена секций содержат год и месяц (YYYYMM), поэтому их порядок совпадает с порядком дат
+    dropped = [name for (name,) in cur.fetchall() if name.startswith(HISTORY_PARTITION_PREFIX) and name < cutoff]
+    for name in dropped:
+        cur.execute(f"DROP TABLE {name}")
+    return dropped
+
+
+def snapshot_history(cur: Any, snapshot_date: date | None = None) -> int:
+    """
+    Добавление снимка открытых вакансий в vacancy_history за дату snapshot_date (по умолчанию сегодня).
+    Повторный снимок за ту же дату заменяет предыдущий. Возвращает количество строк снимка.
+    """
+    snapshot_date = snapshot_date or date.today()
+    ensure_history_partition(cur, snapshot_date)
+    cur.execute("DELETE FROM vacancy_history WHERE snapshot_date = %s", (snapshot_date,))
+    cur.execute(
+        """
+        INSERT INTO vacancy_history
+            (snapshot_date, hh_id, company_hh_id, company_name, name, area, published_at, salary_mid_rub)
+        SELECT %s, v.hh_id, c.hh_id, c.name, v.name, v.area, v.published_at, v.salary_mid_rub
+        FROM vacancies v
+        JOIN companies c ON c.company_id = v.company_id
+        WHERE NOT v.archived
+        """,
+        (snapshot_date,),
+    )
+    return int(cur.rowcount)
+
+
+def _finish_load(cur: Any) -> None:
+    """
+    Завершающие действия загрузки: пересчёт зарплат в рубли, обновление агрегатов,
+    снимок вакансий в историю и номер поколения данных
+    """
+    with metrics.timer("db_statement_seconds", statement="load_exchange_rates"):
+        load_exchange_rates(cur)
+    with metrics.timer("db_statement_seconds", statement="normalize_salaries"):
+        _normalize_salaries(cur)
+    with metrics.timer("db_statement_seconds", statement="refresh_company_stats"):
+        refresh_company_stats(cur)
+    with metrics.timer("db_statement_seconds", statement="snapshot_history"):
+        snapshot_history(cur)
+        drop_old_history_partitions(cur)
+    cur.execute("UPDATE load_generation SET generation = generation + 1")
+
+
 def save_data_to_database(data: list[dict[str, Any]], database_name: str, params: dict) -> None:
     """Сохранение данных о компаниях и вакансиях в базу данных."""
+    started = time.perf_counter()
+    conn = psycopg2.connect(dbname=database_name, **params)
+
+    with conn.cursor() as cur:
+        cur.execute("TRUNCATE TABLE companies, vacancies RESTART IDENTITY CASCADE;")
+        company_ids = _insert_companies(cur, [company["company"] for company in data])
+        seen: set[str] = set()
+        rows_count = _copy_vacancies(
+            cur,
+            itertools.chain.from_iterable(
+                _vacancy_rows(company_id, company["vacancies"], seen) for company_id, company in zip(company_ids, data)
+            ),
+        )
+        _finish_load(cur)
+
+    conn.commit()
+    conn.close()
+    _report_load(rows_count, started)
+
 
+def save_stream_to_database(
+    stream: Iterable[tuple[Company | dict[str, Any], Sequence[Vacancy | dict[str, Any]]]],
+    database_name: str,
+    params: dict,
+) -> None:
+    """
+    Потоковое сохранение данных о компаниях и вакансиях в базу данных.
+    Принимает итератор пар (данные о компании, пачка вакансий), например iter_hh_vacancies,
+    и записывает каждую пачку сразу после получения, не накапливая данные в памяти.
+    """
+    started = time.perf_counter()
     conn = psycopg2.connect(dbname=database_name, **params)
 
     with conn.cursor() as cur:
         cur.execute("TRUNCATE TABLE companies, vacancies RESTART IDENTITY CASCADE;")
-        for company in data:
-            company_data = company["company"]
+        company_ids: dict[str, int] = {}
+        rows_count = 0
+        seen: set[str] = set()
+        for company_data, vacancies_data in stream:
+            employer_id = str(company_data["id"])
+            if employer_id not in company_ids:
+                company_ids[employer_id] = _insert_companies(cur, [company_data])[0]
+            rows_count += _copy_vacancies(cur, _vacancy_rows(company_ids[employer_id], vacancies_data, seen))
+        _finish_load(cur)
+
+    conn.commit()
+    conn.close()
+    _report_load(rows_count, started)
+
+
+def sync_data_to_database(
+    data: list[dict[str, Any]], database_name: str, params: dict, archive_missing: bool = True
+) -> None:
+    """
+    Инкрементальная синхронизация данных о компаниях и вакансиях с базой данных.
+    Строки сопоставляются по ID HH.ru: новые вакансии добавляются, изменившиеся (по хэшу содержимого)
+    обновляются, неизменные не перезаписываются. Вакансии синхронизированных компаний,
+    отсутствующие в данных, помечаются как архивные (archive_missing=True).
+    Данные должны содержать все вакансии компаний (get_hh_data_full).
+    """
+    started = time.perf_counter()
+    conn = psycopg2.connect(dbname=database_name, **params)
+
+    with conn.cursor() as cur:
+        # Одна строка не может обновляться дважды в одном INSERT ... ON CONFLICT, поэтому повторы убираются
+        companies_data = _unique_companies([company["company"] for company in data])
+        if companies_data:
+            execute_values(
+                cur,
+                """
+                INSERT INTO companies AS c (hh_id, name, area, open_vacancies, industries, url, vacancies_url)
+                VALUES %s
+                ON CONFLICT (hh_id) DO UPDATE SET
+                    name = EXCLUDED.name,
+                    area = EXCLUDED.area,
+                    open_vacancies = EXCLUDED.open_vacancies,
+                    industries = EXCLUDED.industries,
+                    url = EXCLUDED.url,
+                    vacancies_url = EXCLUDED.vacancies_url
+                WHERE (c.name, c.area, c.open_vacancies, c.industries, c.url, c.vacancies_url)
+                    IS DISTINCT FROM
+                    (EXCLUDED.name, EXCLUDED.area, EXCLUDED.open_vacancies, EXCLUDED.industries,
+                     EXCLUDED.url, EXCLUDED.vacancies_url)
+                """,
+                [_company_row(company_data) for company_data in companies_data],
+                page_size=len(companies_data),
+            )
+        cur.execute(
+            "SELECT hh_id, company_id FROM companies WHERE hh_id = ANY(%s)",
+            ([company_data["id"] for company_data in companies_data],),
+        )
+        company_ids = dict(cur.fetchall())
+
+        cur.execute(
+            f"""
+            CREATE TEMP TABLE vacancies_stage ON COMMIT DROP AS
+            SELECT {VACANCY_COLUMNS} FROM vacancies
+            WITH NO DATA
+            """
+        )
+        seen: set[str] = set()
+        rows_count = _copy_vacancies(
+            cur,
+            itertools.chain.from_iterable(
+                _vacancy_rows(company_ids[str(company["company"]["id"])], company["vacancies"], seen)
+                for company in data
+            ),
+            table="vacancies_stage",
+        )
+        cur.execute(
+            f"""
+            INSERT INTO vacancies AS v ({VACANCY_COLUMNS})
+            SELECT {VACANCY_COLUMNS} FROM vacancies_stage
+            ON CONFLICT (hh_id) DO UPDATE SET
+                company_id = EXCLUDED.company_id,
+                name = EXCLUDED.name,
+                area = EXCLUDED.area,
+                salary_from = EXCLUDED.salary_from,
+                salary_to = EXCLUDED.salary_to,
+                currency = EXCLUDED.currency,
+                published_at = EXCLUDED.published_at,
+                responsibility = EXCLUDED.responsibility,
+                url = EXCLUDED.url,
+                content_hash = EXCLUDED.content_hash,
+                archived = FALSE,
+                updated_at = now()
+            WHERE v.content_hash IS DISTINCT FROM EXCLUDED.content_hash OR v.archived
+            """
+        )
+        changed_count = cur.rowcount
+
+        archived_count = 0
+        if archive_missing:
             cur.execute(
                 """
-                INSERT INTO companies (name, area, open_vacancies, industries, url,vacancies_url)
-                VALUES (%s, %s, %s, %s, %s, %s)
-                RETURNING company_id
+                UPDATE vacancies AS v SET archived = TRUE, updated_at = now()
+                WHERE NOT v.archived
+                AND v.company_id = ANY(%s)
+                AND NOT EXISTS (SELECT 1 FROM vacancies_stage s WHERE s.hh_id = v.hh_id)
                 """,
-                (
-                    company_data["name"],
-                    company_data["area"],
-                    company_data["open_vacancies"],
-                    company_data["industries"][0]["name"],
-                    company_data["url"],
-                    company_data["vacancies_url"],
-                ),
+                (list(company_ids.values()),),
             )
-            company_id = cur.fetchone()[0]
-
-            vacancies_data = company["vacancies"]
-            for vacancy in vacancies_data:
-                cur.execute(
-                    """
-                     INSERT INTO vacancies
-                     (company_id, name, area, salary_from, salary_to, currency, published_at, responsibility, url)
-                     VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s)
-                    """,
-                    (
-                        company_id,
-                        vacancy["name"],
-                        vacancy["area"],
-                        vacancy["salary_from"],
-                        vacancy["salary_to"],
-                        vacancy["currency"],
-                        vacancy["published_at"],
-                        vacancy["responsibility"],
-                        vacancy["url"],
-                    ),
-                )
+            archived_count = cur.rowcount
+        _finish_load(cur)
 
     conn.commit()
     conn.close()
+    _report_load(rows_count, started)
+    print(f"Добавлено или изменено вакансий: {changed_count}. Перенесено в архив: {archived_count}")
@@ -0,0 +1,118 @@
+import hashlib
+import json
+import os
+import tempfile
+import threading
+import time
+from typing import Any
+from urllib.parse import urlencode
+
+
+class ResponseCache:
+    """
+    Дисковый кэш ответов API HH.ru.
+    Ключ записи - URL и параметры запроса. Свежие записи (моложе ttl) отдаются без обращения к сети,
+    устаревшие перепроверяются условным запросом (ETag / Last-Modified).
+    При превышении max_bytes удаляются давно не использовавшиеся записи (LRU по времени изменения файла).
+    """
+
+    def __init__(self, directory: str, ttl: float = 3600, max_bytes: int = 256 * 1024 * 1024) -> None:
+        """Инициализация кэша в каталоге directory"""
+        self.directory = directory
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.revalidated = 0
+        self._lock = threading.Lock()
+        os.makedirs(directory, exist_ok=True)
+        self._size = sum(entry.stat().st_size for entry in os.scandir(directory) if entry.name.endswith(".json"))
+
+    def _path(self, url: str, params: dict[str, Any] | None) -> str:
+        """Путь к файлу записи для URL и параметров запроса"""
+        query = urlencode(sorted((params or {}).items()))
+        key = hashlib.sha256(f"{url}?{query}".encode("utf-8")).hexdigest()
+        return os.path.join(self.directory, f"{key}.json")
+
+    def get(self, url: str, params: dict[str, Any] | None = None) -> dict[str, Any] | None:
+        """Получение записи кэша (свежей или устаревшей). Возвращает None, если записи нет."""
+        path = self._path(url, params)
+        try:
+            with open(path, encoding="utf-8") as file:
+                entry: dict[str, Any] = json.load(file)
+        except (OSError, ValueError):
+            return None
+        # Обновляем время изменения файла для LRU-вытеснения
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+        return entry
+
+    def is_fresh(self, entry: dict[str, Any]) -> bool:
+        """Проверка, что запись моложе ttl"""
+        return bool(time.time() - entry["stored_at"] < self.ttl)
+
+    @staticmethod
+    def conditional_headers(entry: dict[str, Any]) -> dict[str, str]:
+        """Заголовки условного запроса для перепроверки устаревшей записи"""
+        headers = {}
+        if entry.get("etag"):
+            headers["If-None-Match"] = entry["etag"]
+        if entry.get("last_modified"):
+            headers["If-Modified-Since"] = entry["last_modified"]
+        return headers
+
+    def put(
+        self,
+        url: str,
+        params: dict[str, Any] | None,
+        body: Any,
+        etag: str | None = None,
+        last_modified: str | None = None,
+    ) -> None:
+        """Сохранение ответа в кэш с атомарной записью файла"""
+        path = self._path(url, params)
+        entry = {"url": url, "stored_at": time.time(), "etag": etag, "last_modified": last_modified, "body": body}
+        data = json.dumps(entry, ensure_ascii=False).encode("utf-8")
+        fd, tmp_path = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+        with os.fdopen(fd, "wb") as file:
+            file.write(data)
+        with self._lock:
+            try:
+                self._size -= os.path.getsize(path)
+            except OSError:
+                pass
+            os.replace(tmp_path, path)
+            self._size += len(data)
+            if self._size > self.max_bytes:
+                self._evict()
+
+    def refresh(self, url: str, params: dict[str, Any] | None, entry: dict[str, Any]) -> None:
+        """Продление срока жизни записи после ответа 304 Not Modified"""
+        self.put(url, params, entry["body"], entry.get("etag"), entry.get("last_modified"))
+
+    def _evict(self) -> None:
+        """Удаление давно не использовавшихся записей, пока размер кэша превышает max_bytes"""
+        entries = sorted(
+            (entry for entry in os.scandir(self.directory) if entry.name.endswith(".json")),
+            key=lambda entry: entry.stat().st_mtime,
+        )
+        for entry in entries:
+            if self._size <= self.max_bytes:
+                break
+            try:
+                size = entry.stat().st_size
+                os.remove(entry.path)
+            except OSError:
+                continue
+            self._size -= size
+
+    def count(self, counter: str) -> None:
+        """Увеличение счётчика hits, misses или revalidated"""
+        with self._lock:
+            setattr(self, counter, getattr(self, counter) + 1)
+
+    def stats(self) -> dict[str, int]:
+        """Счётчики попаданий и промахов кэша"""
+        return {"hits": self.hits, "misses": self.misses, "revalidated": self.revalidated, "bytes": self._size}
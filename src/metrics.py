@@ -0,0 +1,175 @@
+import atexit
+import json
+import os
+import threading
+import time
+from typing import Any
+
+# Границы корзин гистограмм длительности, в секундах
+BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+# Сбор метрик включён (при выключенном сборе все функции модуля сразу возвращаются)
+ENABLED = False
+
+_lock = threading.Lock()
+_counters: dict[tuple[str, tuple[tuple[str, str], ...]], float] = {}
+_histograms: dict[tuple[str, tuple[tuple[str, str], ...]], list[float]] = {}
+
+
+def _key(name: str, labels: dict[str, Any]) -> tuple[str, tuple[tuple[str, str], ...]]:
+    """Ключ метрики: имя и отсортированные метки"""
+    return name, tuple(sorted((label, str(value)) for label, value in labels.items()))
+
+
+def inc(name: str, value: float = 1, **labels: Any) -> None:
+    """Увеличение счётчика name с метками labels"""
+    if not ENABLED:
+        return
+    key = _key(name, labels)
+    with _lock:
+        _counters[key] = _counters.get(key, 0) + value
+
+
+def observe(name: str, seconds: float, **labels: Any) -> None:
+    """Добавление наблюдения длительности в гистограмму name с метками labels"""
+    if not ENABLED:
+        return
+    key = _key(name, labels)
+    with _lock:
+        # Значения гистограммы: количество по корзинам, затем сумма и общее количество
+        histogram = _histograms.setdefault(key, [0.0] * (len(BUCKETS) + 2))
+        for i, bound in enumerate(BUCKETS):
+            if seconds <= bound:
+                histogram[i] += 1
+        histogram[-2] += seconds
+        histogram[-1] += 1
+
+
+class _Timer:
+    """Контекстный менеджер, записывающий длительность блока в гистограмму"""
+
+    __slots__ = ("name", "labels", "started")
+
+    def __init__(self, name: str, labels: dict[str, Any]) -> None:
+        self.name = name
+        self.labels = labels
+        self.started = 0.0
+
+    def __enter__(self) -> "_Timer":
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type: Any, exc_val: Any, exc_tb: Any) -> None:
+        observe(self.name, time.perf_counter() - self.started, **self.labels)
+
+
+class _NullTimer:
+    """Пустой контекстный менеджер для выключенного сбора метрик"""
+
+    __slots__ = ()
+
+    def __enter__(self) -> "_NullTimer":
+        return self
+
+    def __exit__(self, exc_type: Any, exc_val: Any, exc_tb: Any) -> None:
+        pass
+
+
+_NULL_TIMER = _NullTimer()
+
+
+def timer(name: str, **labels: Any) -> _Timer | _NullTimer:
+    """Замер длительности блока кода: with metrics.timer("db_query_seconds", method="..."): ..."""
+    if not ENABLED:
+        return _NULL_TIMER
+    return _Timer(name, labels)
+
+
+def snapshot() -> dict[str, Any]:
+    """Текущие значения всех метрик в виде словаря (для JSON)"""
+    with _lock:
+        counters = [
+            {"name": name, "labels": dict(labels), "value": value} for (name, labels), value in _counters.items()
+        ]
+        histograms = [
+            {
+                "name": name,
+                "labels": dict(labels),
+                "buckets": {str(bound): count for bound, count in zip(BUCKETS, values)},
+                "sum": values[-2],
+                "count": values[-1],
+            }
+            for (name, labels), values in _histograms.items()
+        ]
+    return {"timestamp": time.time(), "counters": counters, "histograms": histograms}
+
+
+def _format_labels(labels: dict[str, str], **extra: str) -> str:
+    """Метки в формате Prometheus: {a="1",b="2"}"""
+    items = {**labels, **extra}
+    if not items:
+        return ""
+    escaped = []
+    for label, value in items.items():
+        value = value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+        escaped.append(f'{label}="{value}"')
+    return "{" + ",".join(escaped) + "}"
+
+
+def to_prometheus() -> str:
+    """Текущие значения всех метрик в текстовом формате Prometheus"""
+    data = snapshot()
+    lines = []
+    typed: set[str] = set()
+    for counter in data["counters"]:
+        if counter["name"] not in typed:
+            lines.append(f"# TYPE {counter['name']} counter")
+            typed.add(counter["name"])
+        lines.append(f"{counter['name']}{_format_labels(counter['labels'])} {counter['value']}")
+    for histogram in data["histograms"]:
+        name = histogram["name"]
+        if name not in typed:
+            lines.append(f"# TYPE {name} histogram")
+            typed.add(name)
+        for bound, count in histogram["buckets"].items():
+            lines.append(f"{name}_bucket{_format_labels(histogram['labels'], le=bound)} {count}")
+        lines.append(f"{name}_bucket{_format_labels(histogram['labels'], le='+Inf')} {histogram['count']}")
+        lines.append(f"{name}_sum{_format_labels(histogram['labels'])} {histogram['sum']}")
+        lines.append(f"{name}_count{_format_labels(histogram['labels'])} {histogram['count']}")
+    return "\n".join(lines) + "\n"
+
+
+def export(path: str) -> None:
+    """Сохранение метрик в файл: в формате JSON, если имя оканчивается на .json, иначе в формате Prometheus"""
+    content = json.dumps(snapshot(), ensure_ascii=False, indent=2) if path.endswith(".json") else to_prometheus()
+    with open(path, "w", encoding="utf-8") as file:
+        file.write(content)
+
+
+def enable(export_path: str | None = None) -> None:
+    """
+    Включение сбора метрик.
+    :param export_path: Файл, в который метрики будут сохранены при завершении процесса.
+    """
+    global ENABLED
+    ENABLED = True
+    if export_path:
+        atexit.register(export, export_path)
+
+
+def disable() -> None:
+    """Выключение сбора метрик"""
+    global ENABLED
+    ENABLED = False
+
+
+def reset() -> None:
+    """Сброс всех собранных значений"""
+    with _lock:
+        _counters.clear()
+        _histograms.clear()
+
+
+# Сбор метрик можно включить без изменения кода: HH_METRICS_FILE=metrics.prom python main.py
+if os.environ.get("HH_METRICS_FILE"):
+    enable(os.environ["HH_METRICS_FILE"])
@@ -0,0 +1,98 @@
+from typing import Any, Mapping, NamedTuple, Union
+
+from src import metrics
+
+
+class Company(NamedTuple):
+    """Данные о компании. Поддерживает доступ по имени поля: company["name"]."""
+
+    id: str
+    name: str
+    area: str
+    open_vacancies: int
+    industries: list[dict[str, Any]]
+    url: str
+    vacancies_url: str
+
+    def __getitem__(self, key: Any) -> Any:  # type: ignore[override]
+        if isinstance(key, str):
+            return getattr(self, key)
+        return tuple.__getitem__(self, key)
+
+    @classmethod
+    def from_api(cls, employer_id: str, company_data: dict[str, Any]) -> "Company":
+        """Формирование записи о компании из ответа API HH.ru /employers/{id}"""
+        return cls(
+            employer_id,
+            company_data["name"],
+            company_data["area"]["name"],
+            company_data["open_vacancies"],
+            company_data["industries"],
+            company_data["alternate_url"],
+            company_data["vacancies_url"],
+        )
+
+    @classmethod
+    def coerce(cls, company: Union["Company", Mapping[str, Any]]) -> "Company":
+        """Приведение словаря с полями компании к записи Company (запись возвращается без изменений)"""
+        if isinstance(company, cls):
+            return company
+        return cls._make(company[field] for field in cls._fields)
+
+
+class Vacancy(NamedTuple):
+    """
+    Данные одной вакансии. Запись занимает в несколько раз меньше памяти, чем словарь с теми же полями,
+    и поддерживает доступ по имени поля: vacancy["name"].
+    Порядок полей совпадает с порядком столбцов таблицы vacancies (без company_id).
+    """
+
+    id: str
+    name: str
+    area: str
+    salary_from: int
+    salary_to: int
+    currency: str
+    published_at: str
+    responsibility: str | None
+    url: str
+
+    def __getitem__(self, key: Any) -> Any:  # type: ignore[override]
+        if isinstance(key, str):
+            return getattr(self, key)
+        return tuple.__getitem__(self, key)
+
+    @classmethod
+    def from_api(cls, vac: dict[str, Any]) -> "Vacancy":
+        """Формирование записи о вакансии из элемента items ответа API HH.ru /vacancies"""
+        area = vac["area"].get("name")
+        salary: dict[str, Any] | None = vac.get("salary")
+        if salary is None:
+            salary = {"currency": "Не указана"}
+        salary_from: int = salary["from"] if salary.get("from") is not None else 0
+        salary_to: int = salary["to"] if salary.get("to") is not None else salary_from
+        currency: str = salary["currency"] if salary.get("currency") is not None else "Не указано"
+        return cls(
+            vac["id"],
+            vac["name"],
+            area if area is not None else "Нет данных",
+            salary_from,
+            salary_to,
+            currency,
+            vac["published_at"],
+            vac["snippet"]["responsibility"],
+            vac["alternate_url"],
+        )
+
+    @classmethod
+    def coerce(cls, vacancy: Union["Vacancy", Mapping[str, Any]]) -> "Vacancy":
+        """Приведение словаря с полями вакансии к записи Vacancy (запись возвращается без изменений)"""
+        if isinstance(vacancy, cls):
+            return vacancy
+        return cls._make(vacancy[field] for field in cls._fields)
+
+
+def parse_vacancies(data_vac: dict[str, Any]) -> list[Vacancy]:
+    """Формирование списка записей о вакансиях из страницы ответа API HH.ru /vacancies"""
+    with metrics.timer("pipeline_stage_seconds", stage="normalize"):
+        return [Vacancy.from_api(vac) for vac in data_vac.get("items", [])]
@@ -0,0 +1,136 @@
+"""
+Конвейерная загрузка: получение данных от API HH.ru и запись в БД выполняются одновременно.
+
+Несколько потоков-производителей получают вакансии работодателей постранично и кладут страницы
+в ограниченную очередь, а потребитель (save_stream_to_database) записывает их в БД по мере поступления.
+Когда очередь заполнена, производители ждут, поэтому в памяти находится не более queue_size страниц,
+а общее время загрузки приближается к большему из времён получения и записи, а не к их сумме.
+"""
+
+import queue
+import threading
+import time
+from typing import Any, Iterator
+
+from src import metrics
+from src.archive import new_run_dir
+from src.checkpoint import Checkpoint
+from src.database_utils import create_database, save_stream_to_database
+from src.HH_api import MAX_WORKERS, iter_employer_vacancies
+from src.models import Company, Vacancy
+
+# Максимальное количество страниц вакансий в очереди между получением и записью
+QUEUE_SIZE = 64
+# Интервал проверки остановки конвейера при ожидании места в очереди, в секундах
+POLL_INTERVAL = 0.1
+
+# Признак завершения работы производителя
+_DONE = object()
+
+
+class _Producers:
+    """Потоки, получающие вакансии работодателей и передающие страницы в очередь"""
+
+    def __init__(
+        self,
+        employers_id: list[str],
+        workers: int,
+        queue_size: int,
+        full: bool,
+        run_dir: str | None,
+        checkpoint: Checkpoint | None = None,
+    ) -> None:
+        self.queue: queue.Queue[Any] = queue.Queue(maxsize=max(1, queue_size))
+        self.stop = threading.Event()
+        self.full = full
+        self.run_dir = run_dir
+        self.checkpoint = checkpoint
+        self._employers = iter(employers_id)
+        self._employers_lock = threading.Lock()
+        self._threads = [
+            threading.Thread(target=self._work, daemon=True) for _ in range(max(1, min(workers, len(employers_id))))
+        ]
+
+    def start(self) -> "_Producers":
+        for thread in self._threads:
+            thread.start()
+        return self
+
+    def join(self) -> None:
+        """Остановка и ожидание завершения всех производителей"""
+        self.stop.set()
+        for thread in self._threads:
+            thread.join()
+
+    def _next_employer(self) -> str | None:
+        with self._employers_lock:
+            return next(self._employers, None)
+
+    def _put(self, item: Any) -> bool:
+        """Передача элемента в очередь с ожиданием свободного места. Возвращает False, если конвейер остановлен."""
+        started = time.perf_counter()
+        while not self.stop.is_set():
+            try:
+                self.queue.put(item, timeout=POLL_INTERVAL)
+            except queue.Full:
+                continue
+            metrics.observe("pipeline_stage_seconds", time.perf_counter() - started, stage="queue_wait")
+            return True
+        return False
+
+    def _work(self) -> None:
+        """Получение вакансий работодателей, пока они не закончатся или конвейер не будет остановлен"""
+        try:
+            while not self.stop.is_set():
+                employer_id = self._next_employer()
+                if employer_id is None:
+                    break
+                for batch in iter_employer_vacancies(employer_id, self.full, self.run_dir, self.checkpoint):
+                    if not self._put(batch):
+                        return
+        except Exception as e:
+            self._put(e)
+        finally:
+            self._put(_DONE)
+
+    def __iter__(self) -> Iterator[tuple[Company, list[Vacancy]]]:
+        """Выдача страниц из очереди, пока все производители не завершат работу"""
+        finished = 0
+        while finished < len(self._threads):
+            item = self.queue.get()
+            if item is _DONE:
+                finished += 1
+            elif isinstance(item, Exception):
+                raise item
+            else:
+                yield item
+
+
+def run_pipeline(
+    employers_id: list[str],
+    database_name: str,
+    params: dict,
+    workers: int = MAX_WORKERS,
+    queue_size: int = QUEUE_SIZE,
+    full: bool = True,
+    archive_dir: str | None = None,
+    checkpoint: Checkpoint | None = None,
+) -> None:
+    """
+    Пересоздание БД и конвейерная загрузка в неё вакансий от API HH.ru.
+    :param employers_id: Список ID выбираемых компаний.
+    :param database_name: Имя базы данных.
+    :param params: Параметры подключения к PostgreSQL.
+    :param workers: Количество работодателей, данные которых получаются одновременно.
+    :param queue_size: Максимальное количество страниц вакансий, ожидающих записи.
+    :param full: Получать все вакансии работодателя (True) или только первую страницу (False).
+    :param archive_dir: Каталог для сохранения необработанных ответов API (None - не сохранять).
+    :param checkpoint: Контрольная точка для продолжения прерванной загрузки (src.checkpoint).
+    """
+    create_database(database_name, params)
+    run_dir = new_run_dir(archive_dir) if archive_dir and checkpoint is None else None
+    producers = _Producers(employers_id, workers, queue_size, full, run_dir, checkpoint).start()
+    try:
+        save_stream_to_database(producers, database_name, params)
+    finally:
+        producers.join()
@@ -0,0 +1,172 @@
+import threading
+import time
+from typing import Any
+
+from src import metrics
+
+# Ограничение частоты запросов включено (при выключенном ограничении acquire сразу возвращается)
+ENABLED = True
+
+# Начальная, минимальная и максимальная частота запросов в секунду
+INITIAL_RATE = 10.0
+MIN_RATE = 0.5
+MAX_RATE = 50.0
+# Максимальное количество запросов, которые можно отправить подряд без ожидания
+BURST = 10.0
+# Аддитивное увеличение: за каждую секунду успешных запросов частота растёт на INCREASE запросов/с.
+# До первого уменьшения (медленный старт) частота удваивается за каждую секунду успешных запросов.
+INCREASE = 1.0
+# Мультипликативное уменьшение частоты после ответа 429 и после медленного ответа
+THROTTLE_FACTOR = 0.5
+SLOW_FACTOR = 0.9
+# Длительность ответа, начиная с которой сервер считается перегруженным, в секундах
+LATENCY_TARGET = 2.0
+# Минимальный интервал между уменьшениями частоты: одна перегрузка вызывает несколько ответов 429 подряд
+DECREASE_COOLDOWN = 1.0
+
+
+class RateLimiter:
+    """
+    Ограничитель частоты запросов по алгоритму маркерной корзины.
+    Частота подстраивается по схеме AIMD: растёт, пока запросы выполняются успешно и быстро
+    (до первой перегрузки - экспоненциально, затем линейно), и уменьшается в несколько раз
+    после ответа 429 или при росте времени ответа.
+    """
+
+    def __init__(
+        self,
+        rate: float = INITIAL_RATE,
+        min_rate: float = MIN_RATE,
+        max_rate: float = MAX_RATE,
+        burst: float = BURST,
+    ) -> None:
+        """Инициализация ограничителя"""
+        self.rate = rate
+        self.min_rate = min_rate
+        self.max_rate = max_rate
+        self.burst = burst
+        self._tokens = burst
+        self._updated = time.monotonic()
+        self._last_decrease = float("-inf")
+        self._slow_start = True
+        self._lock = threading.Lock()
+        self.throttled = 0
+        self.slow = 0
+        self.waits = 0
+        self.waited_seconds = 0.0
+
+    def _refill(self, now: float) -> None:
+        """Пополнение корзины маркерами за время с последнего обращения"""
+        self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def acquire(self) -> float:
+        """
+        Получение разрешения на запрос. Если маркеров нет, поток ожидает своей очереди.
+        Возвращает время ожидания в секундах.
+        """
+        with self._lock:
+            self._refill(time.monotonic())
+            # Маркер резервируется сразу, поэтому одновременные запросы распределяются по времени
+            self._tokens -= 1
+            wait = -self._tokens / self.rate if self._tokens < 0 else 0.0
+            if wait:
+                self.waits += 1
+                self.waited_seconds += wait
+        if wait:
+            metrics.observe("hh_rate_limit_wait_seconds", wait)
+            time.sleep(wait)
+        return wait
+
+    def _decrease(self, factor: float) -> bool:
+        """Уменьшение частоты не чаще одного раза за DECREASE_COOLDOWN"""
+        now = time.monotonic()
+        if now - self._last_decrease < DECREASE_COOLDOWN:
+            return False
+        self._refill(now)
+        self.rate = max(self.min_rate, self.rate * factor)
+        self._last_decrease = now
+        self._slow_start = False
+        return True
+
+    def on_success(self, latency: float) -> None:
+        """Учёт успешного ответа: увеличение частоты или её уменьшение при медленном ответе"""
+        with self._lock:
+            if latency > LATENCY_TARGET:
+                if self._decrease(SLOW_FACTOR):
+                    self.slow += 1
+                return
+            self._refill(time.monotonic())
+            step = 1.0 if self._slow_start else INCREASE / self.rate
+            self.rate = min(self.max_rate, self.rate + step)
+
+    def on_throttle(self) -> None:
+        """Учёт ответа 429: уменьшение частоты"""
+        metrics.inc("hh_throttled_total")
+        with self._lock:
+            if self._decrease(THROTTLE_FACTOR):
+                self.throttled += 1
+
+    def stats(self) -> dict[str, Any]:
+        """Текущая частота запросов и счётчики ограничителя"""
+        with self._lock:
+            return {
+                "rate": round(self.rate, 3),
+                "throttled": self.throttled,
+                "slow": self.slow,
+                "waits": self.waits,
+                "waited_seconds": round(self.waited_seconds, 3),
+            }
+
+
+_limiter = RateLimiter()
+
+
+def get_limiter() -> RateLimiter:
+    """Получение общего для процесса ограничителя частоты запросов"""
+    return _limiter
+
+
+def configure(
+    rate: float = INITIAL_RATE, min_rate: float = MIN_RATE, max_rate: float = MAX_RATE, burst: float = BURST
+) -> RateLimiter:
+    """Замена общего ограничителя новым с заданными параметрами"""
+    global _limiter
+    _limiter = RateLimiter(rate, min_rate, max_rate, burst)
+    return _limiter
+
+
+def acquire() -> float:
+    """Получение разрешения на запрос у общего ограничителя"""
+    if not ENABLED:
+        return 0.0
+    return _limiter.acquire()
+
+
+def on_success(latency: float) -> None:
+    """Учёт успешного ответа общим ограничителем"""
+    if ENABLED:
+        _limiter.on_success(latency)
+
+
+def on_throttle() -> None:
+    """Учёт ответа 429 общим ограничителем"""
+    if ENABLED:
+        _limiter.on_throttle()
+
+
+def stats() -> dict[str, Any]:
+    """Текущая частота запросов и счётчики общего ограничителя"""
+    return _limiter.stats()
+
+
+def enable() -> None:
+    """Включение ограничения частоты запросов"""
+    global ENABLED
+    ENABLED = True
+
+
+def disable() -> None:
+    """Выключение ограничения частоты запросов (например, для локального тестового сервера)"""
+    global ENABLED
+    ENABLED = False
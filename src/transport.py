@@ -0,0 +1,183 @@
+import random
+import threading
+import time
+from email.utils import parsedate_to_datetime
+from typing import Any
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from src import metrics, rate_limit
+from src.http_cache import ResponseCache
+
+# Таймауты (подключение, чтение) в секундах
+TIMEOUT = (5, 30)
+# Количество повторных попыток после первой неудачной
+MAX_RETRIES = 5
+# Базовая и максимальная задержка экспоненциального ожидания в секундах
+BACKOFF_BASE = 0.5
+BACKOFF_MAX = 30.0
+# Коды ответов, после которых запрос повторяется
+RETRY_STATUSES = frozenset({429, 500, 502, 503, 504})
+# Размер пула соединений с одним хостом
+POOL_SIZE = 16
+
+HEADERS = {
+    "User-Agent": "SkripnikovOV-CourseProj-3/0.1",
+    "Accept": "application/json",
+    "Accept-Encoding": "gzip, deflate",
+}
+
+_session: requests.Session | None = None
+_session_lock = threading.Lock()
+_cache: ResponseCache | None = None
+
+
+class HHApiError(Exception):
+    """Ошибка получения данных от API HH.ru"""
+
+
+def get_session() -> requests.Session:
+    """
+    Получение общей для процесса сессии с пулом keep-alive соединений.
+    Сессия создаётся при первом обращении.
+    """
+    global _session
+    if _session is None:
+        with _session_lock:
+            if _session is None:
+                session = requests.Session()
+                adapter = HTTPAdapter(pool_connections=4, pool_maxsize=POOL_SIZE)
+                session.mount("https://", adapter)
+                session.mount("http://", adapter)
+                session.headers.update(HEADERS)
+                _session = session
+    return _session
+
+
+def close_session() -> None:
+    """Закрытие общей сессии и всех её соединений"""
+    global _session
+    with _session_lock:
+        if _session is not None:
+            _session.close()
+            _session = None
+
+
+def enable_cache(directory: str, ttl: float = 3600, max_bytes: int = 256 * 1024 * 1024) -> ResponseCache:
+    """
+    Включение дискового кэша ответов для всех запросов get_json.
+    :param directory: Каталог для хранения кэша.
+    :param ttl: Время в секундах, в течение которого ответ отдаётся без обращения к API.
+    :param max_bytes: Максимальный размер кэша на диске.
+    :return: Возвращает объект кэша (в том числе для чтения счётчиков попаданий).
+    """
+    global _cache
+    _cache = ResponseCache(directory, ttl, max_bytes)
+    return _cache
+
+
+def disable_cache() -> None:
+    """Отключение дискового кэша ответов"""
+    global _cache
+    _cache = None
+
+
+def get_cache() -> ResponseCache | None:
+    """Получение текущего дискового кэша ответов (None, если кэш отключён)"""
+    return _cache
+
+
+def _backoff(attempt: int) -> float:
+    """Экспоненциальная задержка с полным джиттером"""
+    return random.uniform(0, min(BACKOFF_MAX, BACKOFF_BASE * 2**attempt))
+
+
+def _retry_after(response: requests.Response) -> float | None:
+    """Разбор заголовка Retry-After (число секунд или HTTP-дата)"""
+    value = response.headers.get("Retry-After")
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+def get_json(url: str, params: dict[str, Any] | None = None) -> dict[str, Any]:
+    """
+    Выполнение GET-запроса через общую сессию и разбор JSON-ответа.
+    Ответы 429/5xx, сетевые ошибки и некорректный JSON повторяются до MAX_RETRIES раз
+    с экспоненциальной задержкой и джиттером; заголовок Retry-After имеет приоритет.
+    Частота запросов ограничивается общим ограничителем rate_limit, который снижает её после ответов 429.
+    Если включён дисковый кэш (enable_cache), свежие ответы берутся из него,
+    а устаревшие перепроверяются условным запросом.
+    :param url: Адрес запроса.
+    :param params: Параметры строки запроса.
+    :return: Возвращает словарь с разобранным JSON-ответом.
+    """
+    cache = _cache
+    entry: dict[str, Any] | None = None
+    headers: dict[str, str] = {}
+    if cache is not None:
+        entry = cache.get(url, params)
+        if entry is not None:
+            if cache.is_fresh(entry):
+                cache.count("hits")
+                metrics.inc("hh_cache_total", result="hit")
+                return dict(entry["body"])
+            headers = cache.conditional_headers(entry)
+
+    session = get_session()
+    error = ""
+    for attempt in range(MAX_RETRIES + 1):
+        delay = _backoff(attempt)
+        if attempt:
+            metrics.inc("hh_retries_total")
+        rate_limit.acquire()
+        started = time.perf_counter()
+        try:
+            with metrics.timer("hh_request_seconds"):
+                response = session.get(url, params=params, timeout=TIMEOUT, headers=headers)
+        except (requests.ConnectionError, requests.Timeout) as e:
+            metrics.inc("hh_requests_total", status="error")
+            error = f"сетевая ошибка: {e}"
+        else:
+            metrics.inc("hh_requests_total", status=response.status_code)
+            if response.status_code == 429:
+                rate_limit.on_throttle()
+            elif response.status_code < 500:
+                rate_limit.on_success(time.perf_counter() - started)
+            if response.status_code == 304 and cache is not None and entry is not None:
+                cache.refresh(url, params, entry)
+                cache.count("revalidated")
+                metrics.inc("hh_cache_total", result="revalidated")
+                return dict(entry["body"])
+            if response.status_code in RETRY_STATUSES:
+                error = f"код ответа {response.status_code}"
+                retry_after = _retry_after(response)
+                if retry_after is not None:
+                    delay = min(retry_after, BACKOFF_MAX)
+            elif response.status_code >= 400:
+                raise HHApiError(f"Запрос {url} завершился с кодом {response.status_code}")
+            else:
+                try:
+                    with metrics.timer("hh_json_decode_seconds"):
+                        data: dict[str, Any] = response.json()
+                except ValueError as e:
+                    error = f"некорректный JSON: {e}"
+                else:
+                    if cache is not None:
+                        cache.count("misses")
+                        metrics.inc("hh_cache_total", result="miss")
+                        cache.put(
+                            url, params, data, response.headers.get("ETag"), response.headers.get("Last-Modified")
+                        )
+                    return data
+        if attempt < MAX_RETRIES:
+            time.sleep(delay)
+    raise HHApiError(f"Запрос {url} не выполнен после {MAX_RETRIES + 1} попыток ({error})")
@@ -49,6 +49,16 @@ def db_manager(test_dbname: str, sample_db_params: dict[str, str]) -> Generator[
     conn.close()
 
 
+@pytest.fixture(autouse=True)
+def no_rate_limit() -> Generator[None, None, None]:
+    """Фикстура, отключающая ограничение частоты запросов к API (запросы в тестах не уходят в сеть)"""
+    from src import rate_limit
+
+    rate_limit.disable()
+    yield
+    rate_limit.enable()
+
+
 @pytest.fixture(autouse=True)
 def setup_teardown(test_dbname: str, sample_db_params: dict[str, str]) -> None:
     """Фикстура для создания и удаления тестовой БД"""
@@ -0,0 +1,99 @@
+import json
+import urllib.error
+import urllib.request
+from decimal import Decimal
+from unittest.mock import MagicMock
+
+import pytest
+
+from src import metrics
+from src.api_server import ApiServer, BadRequest, decode_key, encode_key
+
+
+def _get(url: str, headers: dict | None = None) -> tuple[int, dict, dict]:
+    request = urllib.request.Request(url, headers=headers or {})
+    try:
+        with urllib.request.urlopen(request) as response:
+            body = response.read()
+            return response.status, dict(response.headers), json.loads(body) if body else {}
+    except urllib.error.HTTPError as e:
+        body = e.read()
+        return e.code, dict(e.headers), json.loads(body) if body else {}
+
+
+@pytest.fixture
+def api_server():
+    dbmanager = MagicMock()
+    dbmanager.get_companies_and_vacancies_count.return_value = [("Company", 2)]
+    dbmanager.get_avg_salary.return_value = Decimal("100000.50")
+    dbmanager.get_vacancies_page.return_value = (
+        [("Company", "Python", 1, 2, "RUR", "url")],
+        ("Company", "Python", 7),
+    )
+    server = ApiServer(dbmanager, port=0, cache_ttl=60)
+    with server:
+        yield server, dbmanager
+
+
+def test_api_server_cache_and_etag(api_server) -> None:
+    """Проверяет JSON-ответ, кэширование и ответ 304 по ETag"""
+    server, dbmanager = api_server
+
+    status, headers, body = _get(f"{server.url}/companies")
+    assert status == 200
+    assert body == {"items": [{"company_name": "Company", "vacancies_count": 2}]}
+
+    status, _, _ = _get(f"{server.url}/companies", {"If-None-Match": headers["ETag"]})
+    assert status == 304
+    dbmanager.get_companies_and_vacancies_count.assert_called_once()
+
+    assert _get(f"{server.url}/avg-salary")[2] == {"avg_salary": 100000.5}
+
+
+def test_api_server_pagination(api_server) -> None:
+    """Проверяет пагинацию по ключу и ошибки в параметрах запроса"""
+    server, dbmanager = api_server
+
+    _, _, body = _get(f"{server.url}/vacancies?limit=1")
+    assert body["items"][0]["vacancy_name"] == "Python"
+    assert decode_key(body["next"]) == ("Company", "Python", 7)
+
+    _get(f"{server.url}/vacancies?limit=1&after={body['next']}")
+    dbmanager.get_vacancies_page.assert_called_with(("Company", "Python", 7), 1)
+
+    assert _get(f"{server.url}/vacancies?limit=0")[0] == 400
+    assert _get(f"{server.url}/vacancies?after=bad")[0] == 400
+    assert _get(f"{server.url}/search")[0] == 400
+    assert _get(f"{server.url}/unknown")[0] == 404
+    assert encode_key(None) is None
+
+
+def test_decode_key_validates_types() -> None:
+    """Проверяет, что ключ пагинации с элементами неверного типа отклоняется как некорректный параметр"""
+    assert decode_key(encode_key(("Company", "Python", 7))) == ("Company", "Python", 7)
+    for key in ([["a"], "b", 1], ["a", "b", "7"], ["a", "b", 7.5], ["a", "b", True], ["a", None, 1]):
+        with pytest.raises(BadRequest):
+            decode_key(encode_key(key))
+
+
+def test_api_server_errors(api_server, capsys) -> None:
+    """Проверяет ответ 400 на ключ неверного типа и ответ 500 на непредвиденную ошибку обработчика"""
+    server, dbmanager = api_server
+    metrics.reset()
+    metrics.enable()
+
+    assert _get(f"{server.url}/vacancies?after={encode_key((['a'], 'b', 1))}")[0] == 400
+    assert _get(f"{server.url}/vacancies?after={encode_key(('a', 'b', '1'))}")[0] == 400
+
+    dbmanager.get_company_salary_stats.side_effect = RuntimeError("ошибка")
+    status, _, body = _get(f"{server.url}/stats")
+    assert status == 500
+    assert body == {"error": "internal error"}
+    assert _get(f"{server.url}/health")[0] == 200  # "Сервер продолжает обслуживать запросы"
+
+    # Ошибка учитывается в метриках, а трассировка выводится в stderr
+    errors = [counter for counter in metrics.snapshot()["counters"] if counter["name"] == "api_errors_total"]
+    metrics.disable()
+    metrics.reset()
+    assert errors == [{"name": "api_errors_total", "labels": {"path": "/stats"}, "value": 1}]
+    assert "RuntimeError: ошибка" in capsys.readouterr().err
@@ -0,0 +1,58 @@
+from unittest.mock import MagicMock, patch
+
+from src.archive import archive_employer, iter_archive, load_archive
+from src.HH_api import get_hh_data_full
+
+COMPANY_DATA = {
+    "name": "Test Company",
+    "area": {"name": "Moscow"},
+    "open_vacancies": 2,
+    "industries": [{"name": "IT"}],
+    "alternate_url": "test.com",
+    "vacancies_url": "test.com/vac",
+}
+
+
+def _page(page_n: int) -> dict:
+    return {
+        "pages": 2,
+        "items": [
+            {
+                "id": str(page_n),
+                "name": f"Developer {page_n}",
+                "area": {"name": "Moscow"},
+                "salary": None,
+                "published_at": "2023-01-01",
+                "snippet": {"responsibility": "Code"},
+                "alternate_url": f"test.com/vac/{page_n}",
+            }
+        ],
+    }
+
+
+def test_archive_round_trip(tmp_path) -> None:
+    """Проверяет запись ответов API в архив и их повторное чтение"""
+    archive_employer(str(tmp_path), "123", COMPANY_DATA, [_page(0), _page(1)])
+    archive_employer(str(tmp_path), "456", COMPANY_DATA, [{"pages": 0, "items": []}])
+
+    batches = list(iter_archive(str(tmp_path)))
+    assert [(company["id"], len(vacancies)) for company, vacancies in batches] == [("123", 1), ("123", 1), ("456", 0)]
+
+    data = load_archive(str(tmp_path / "123.ndjson.gz"))
+    assert len(data) == 1
+    assert [vacancy["name"] for vacancy in data[0]["vacancies"]] == ["Developer 0", "Developer 1"]
+
+
+def test_get_hh_data_full_archive(tmp_path) -> None:
+    """Проверяет, что повторная загрузка архива даёт те же данные, что и получение от API"""
+
+    def fake_get(url: str, params: dict | None = None, **kwargs: object) -> MagicMock:
+        response = MagicMock(status_code=200)
+        response.json.return_value = COMPANY_DATA if "employers" in url else _page(params["page"] if params else 0)
+        return response
+
+    with patch("requests.Session.get", side_effect=fake_get):
+        data = get_hh_data_full(["123"], archive_dir=str(tmp_path))
+
+    (run_dir,) = tmp_path.iterdir()
+    assert load_archive(str(run_dir)) == data
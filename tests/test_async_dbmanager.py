@@ -0,0 +1,41 @@
+import asyncio
+import sys
+from unittest.mock import patch
+
+import pytest
+
+from src.AsyncDBManager import AsyncDBManager
+from src.database_utils import create_database, save_data_to_database
+from src.HH_api import get_hh_data_short
+
+
+def test_async_dbmanager_requires_psycopg() -> None:
+    """Проверяет понятную ошибку при отсутствии драйвера psycopg 3"""
+    manager = AsyncDBManager("test_vacancies_db", {})
+    with patch.dict(sys.modules, {"psycopg_pool": None}):
+        with pytest.raises(ImportError, match="psycopg"):
+            asyncio.run(manager.connect())
+
+
+def test_async_dbmanager_concurrent_queries(test_dbname, sample_db_params, sample_employers_id) -> None:
+    """Проверяет выполнение нескольких запросов одновременно из одного цикла событий"""
+    pytest.importorskip("psycopg_pool")
+    create_database(test_dbname, sample_db_params)
+    save_data_to_database(get_hh_data_short(sample_employers_id), test_dbname, sample_db_params)
+
+    async def run() -> tuple:
+        async with AsyncDBManager(test_dbname, sample_db_params, maxconn=4) as manager:
+            return await asyncio.gather(
+                manager.get_companies_and_vacancies_count(),
+                manager.get_all_vacancies(),
+                manager.get_avg_salary(),
+                manager.get_vacancies_with_higher_salary(),
+                manager.get_vacancies_with_keywords(["разработчик", "python"]),
+            )
+
+    companies, vacancies, avg_salary, higher, by_keyword = asyncio.run(run())
+    assert len(companies) > 0
+    assert len(vacancies) > 0
+    assert avg_salary >= 0
+    assert len(higher) <= len(vacancies)
+    assert set(by_keyword) == {"разработчик", "python"}
@@ -0,0 +1,141 @@
+import os
+from typing import Any
+from unittest.mock import patch
+
+import pytest
+
+from benchmarks.fake_hh_server import FakeHHServer
+from src.archive import archive_path, iter_archive
+from src.checkpoint import Checkpoint
+from src.HH_api import get_hh_data_full, iter_hh_vacancies
+
+
+class FlakyApi:
+    """Имитация get_json поверх FakeHHServer, прерывающая загрузку после fail_after запросов"""
+
+    def __init__(self, server: FakeHHServer, fail_after: int | None = None) -> None:
+        self.server = server
+        self.fail_after = fail_after
+        self.requests: list[tuple[Any, ...]] = []
+
+    def __call__(self, url: str, params: dict | None = None) -> Any:
+        if self.fail_after is not None and len(self.requests) >= self.fail_after:
+            raise ConnectionError("обрыв соединения")
+        if params is None:
+            self.requests.append((url,))
+            return self.server.employer(url.rsplit("/", 1)[-1])
+        shard = params.get("date_from"), params.get("date_to")
+        self.requests.append((params["employer_id"], *shard, params["page"]))
+        return self.server.vacancies(params["employer_id"], params["page"], params["per_page"], *shard)
+
+
+def _fetch(api: FlakyApi, checkpoint: Checkpoint, employers_id: list[str]) -> list[str]:
+    """Получение ID вакансий через iter_hh_vacancies с контрольной точкой"""
+    with patch("src.HH_api.get_json", side_effect=api):
+        stream = iter_hh_vacancies(employers_id, checkpoint=checkpoint)
+        return [vacancy.id for _, vacancies in stream for vacancy in vacancies]
+
+
+def test_resume_continues_from_last_page(tmp_path) -> None:
+    """Проверяет, что после обрыва загрузка продолжается со следующей страницы без повторных запросов"""
+    server = FakeHHServer(employers=3, pages=3, per_page=10)
+    state_file = str(tmp_path / "state.jsonl")
+    archive_dir = str(tmp_path / "archive")
+
+    # Прерывание на третьей странице второго работодателя: работодатель и 3 страницы, работодатель и 2 страницы
+    api = FlakyApi(server, fail_after=7)
+    with pytest.raises(ConnectionError):
+        _fetch(api, Checkpoint.open(state_file, archive_dir), server.employers_id)
+
+    checkpoint = Checkpoint.open(state_file, archive_dir, resume=True)
+    assert checkpoint.get("1").done
+    assert checkpoint.get("2").pages == 2 and not checkpoint.get("2").done
+    resumed = FlakyApi(server)
+    vacancies_id = _fetch(resumed, checkpoint, server.employers_id)
+
+    assert len(vacancies_id) == len(set(vacancies_id)) == 90
+    assert not set(api.requests) & set(resumed.requests)
+    assert len(api.requests) + len(resumed.requests) == 3 * (1 + 3)
+    # Архив запуска содержит все вакансии и читается без контрольной точки
+    assert sum(len(vacancies) for _, vacancies in iter_archive(checkpoint.run_dir)) == 90
+
+
+def test_resume_sharded_employer(tmp_path) -> None:
+    """Проверяет продолжение загрузки работодателя, поиск которого разбит на интервалы дат публикации"""
+    server = FakeHHServer(employers=1, pages=45, per_page=100)
+    state_file = str(tmp_path / "state.jsonl")
+    archive_dir = str(tmp_path / "archive")
+
+    fresh = FlakyApi(server)
+    with patch("src.HH_api.get_json", side_effect=fresh):
+        get_hh_data_full(["1"], checkpoint=Checkpoint.open(state_file, archive_dir))
+
+    api = FlakyApi(server, fail_after=len(fresh.requests) // 2)
+    with pytest.raises(ConnectionError):
+        _fetch(api, Checkpoint.open(state_file, archive_dir), ["1"])
+
+    checkpoint = Checkpoint.open(state_file, archive_dir, resume=True)
+    assert checkpoint.get("1").shards
+    resumed = FlakyApi(server)
+    with patch("src.HH_api.get_json", side_effect=resumed):
+        data = get_hh_data_full(["1"], checkpoint=checkpoint)
+
+    vacancies_id = [vacancy.id for vacancy in data[0]["vacancies"]]
+    assert len(vacancies_id) == len(set(vacancies_id)) == 4500
+    assert len(resumed.requests) < len(fresh.requests) - len(api.requests) // 2
+
+
+def test_load_skips_truncated_line(tmp_path) -> None:
+    """Проверяет чтение файла состояния, последняя строка которого записана не полностью"""
+    state_file = tmp_path / "state.jsonl"
+    checkpoint = Checkpoint.open(str(state_file), str(tmp_path / "archive"), full=False)
+    checkpoint.page_done("1", 1, 100)
+    checkpoint.employer_done("1")
+    checkpoint.page_done("2", 1, 50)
+    with open(state_file, "a", encoding="utf-8") as file:
+        file.write('{"employer": "2", "pa')
+
+    loaded = Checkpoint.open(str(state_file), full=False, resume=True)
+    assert loaded.run_dir == checkpoint.run_dir
+    assert loaded.get("1").done
+    assert (loaded.get("2").pages, loaded.get("2").size, loaded.get("2").done) == (1, 50, False)
+    with pytest.raises(ValueError):
+        Checkpoint.open(str(state_file), full=True, resume=True)
+
+
+def test_append_after_truncated_line(tmp_path) -> None:
+    """Проверяет, что записи после обрыва не склеиваются с оборванной строкой и читаются при следующем продолжении"""
+    state_file = tmp_path / "state.jsonl"
+    checkpoint = Checkpoint.open(str(state_file), str(tmp_path / "archive"), full=False)
+    checkpoint.page_done("1", 1, 100)
+    with open(state_file, "a", encoding="utf-8") as file:
+        file.write('{"employer": "1", "pa')
+
+    resumed = Checkpoint.open(str(state_file), full=False, resume=True)
+    resumed.employer_done("1")
+    resumed.page_done("2", 1, 50)
+
+    loaded = Checkpoint.open(str(state_file), full=False, resume=True)
+    assert loaded.get("1").done
+    assert loaded.get("2").pages == 1
+
+
+def test_resume_refetches_employer_with_missing_archive(tmp_path) -> None:
+    """Проверяет, что завершённый работодатель, файл архива которого утерян, получается заново полностью"""
+    server = FakeHHServer(employers=2, pages=3, per_page=10)
+    state_file = str(tmp_path / "state.jsonl")
+    archive_dir = str(tmp_path / "archive")
+
+    checkpoint = Checkpoint.open(state_file, archive_dir)
+    assert len(_fetch(FlakyApi(server), checkpoint, server.employers_id)) == 60
+    os.remove(archive_path(checkpoint.run_dir, "1"))
+
+    resumed = FlakyApi(server)
+    vacancies_id = _fetch(resumed, Checkpoint.open(state_file, archive_dir, resume=True), server.employers_id)
+    assert len(vacancies_id) == len(set(vacancies_id)) == 60
+    assert len(resumed.requests) == 1 + 3  # "Запросы только для работодателя без архива"
+
+    # Повторное продолжение читает восстановленный архив без обращения к сети
+    again = FlakyApi(server)
+    assert len(_fetch(again, Checkpoint.open(state_file, archive_dir, resume=True), server.employers_id)) == 60
+    assert not again.requests
@@ -0,0 +1,117 @@
+import io
+import json
+import subprocess
+import sys
+from unittest.mock import MagicMock, patch
+
+from src import cli
+
+
+def test_write_rows_formats() -> None:
+    """Проверяет потоковую запись строк в CSV и NDJSON"""
+    rows = [("Company", "Python", 100000, None, "RUR", "https://hh.ru/vacancy/1")]
+
+    output = io.StringIO()
+    assert cli.write_rows(iter(rows), cli.VACANCY_COLUMNS, "csv", output) == 1
+    lines = output.getvalue().splitlines()
+    assert lines[0] == ",".join(cli.VACANCY_COLUMNS)
+    assert lines[1] == "Company,Python,100000,,RUR,https://hh.ru/vacancy/1"
+
+    output = io.StringIO()
+    cli.write_rows(iter(rows), cli.VACANCY_COLUMNS, "ndjson", output)
+    record = json.loads(output.getvalue())
+    assert record["vacancy_name"] == "Python"
+    assert record["salary_to"] is None
+
+
+def test_query_command(tmp_path) -> None:
+    """Проверяет команду query: вывод результата запроса DBManager в файл"""
+    dbmanager = MagicMock()
+    dbmanager.iter_vacancies_with_keyword.return_value = iter([("Company", "Python", 1, 2, "RUR", "url")])
+    output = tmp_path / "result.ndjson"
+
+    with patch("src.config.config", return_value={}), patch("src.DBManager.DBManager", return_value=dbmanager):
+        code = cli.main(["query", "keyword", "python", "--output", str(output)])
+
+    assert code == 0
+    dbmanager.iter_vacancies_with_keyword.assert_called_once_with("python")
+    dbmanager.disconnect.assert_called_once()
+    assert json.loads(output.read_text(encoding="utf-8"))["company_name"] == "Company"
+
+
+def test_fetch_command(tmp_path) -> None:
+    """Проверяет команду fetch: вывод вакансий от API HH.ru в CSV"""
+    company = {"id": "1", "name": "Company"}
+    vacancy = {
+        "id": "10",
+        "name": "Python",
+        "area": "Москва",
+        "salary_from": 100000,
+        "salary_to": None,
+        "currency": "RUR",
+        "published_at": "2025-06-01",
+        "responsibility": "Разработка",
+        "url": "https://hh.ru/vacancy/10",
+    }
+    output = tmp_path / "result.csv"
+
+    with patch("src.HH_api.iter_hh_vacancies", return_value=iter([(company, [vacancy])])) as mock_iter:
+        code = cli.main(["fetch", "--employers", "1, 2", "--format", "csv", "-o", str(output)])
+
+    assert code == 0
+    mock_iter.assert_called_once_with(["1", "2"], full=True, archive_dir=None, checkpoint=None)
+    lines = output.read_text(encoding="utf-8").splitlines()
+    assert len(lines) == 2
+    assert lines[1].startswith("1,Company,10,Python,")
+
+
+def test_fetch_command_cache_dir(tmp_path) -> None:
+    """Проверяет, что --cache-dir включает дисковый кэш ответов API до получения данных"""
+    cache_dir = str(tmp_path / "cache")
+    with (
+        patch("src.transport.enable_cache") as mock_enable,
+        patch("src.HH_api.iter_hh_vacancies", return_value=iter([])),
+    ):
+        code = cli.main(["fetch", "--employers", "1", "--cache-dir", cache_dir, "-o", str(tmp_path / "out.ndjson")])
+
+    assert code == 0
+    mock_enable.assert_called_once_with(cache_dir)
+
+    with (
+        patch("src.transport.enable_cache") as mock_enable,
+        patch("src.HH_api.iter_hh_vacancies", return_value=iter([])),
+    ):
+        cli.main(["fetch", "--employers", "1", "-o", str(tmp_path / "out.ndjson")])
+    mock_enable.assert_not_called()
+
+
+def test_cache_dir_from_environment(monkeypatch) -> None:
+    """Проверяет, что каталог кэша по умолчанию берётся из переменной окружения HH_CACHE_DIR"""
+    monkeypatch.setenv(cli.CACHE_DIR_ENV, "/tmp/hh_cache")
+    for command in ("fetch", "load", "sync"):
+        assert cli.build_parser().parse_args([command]).cache_dir == "/tmp/hh_cache"
+
+
+def test_cli_imports_lazily() -> None:
+    """Проверяет, что импорт модуля CLI не загружает requests и psycopg2"""
+    code = "import sys, src.cli; print('requests' in sys.modules or 'psycopg2' in sys.modules)"
+    result = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True)
+    assert result.stdout.strip() == "False"
+
+
+def test_query_trend_command(tmp_path) -> None:
+    """Проверяет команду query salary-trend: передачу периода и ID компании в DBManager"""
+    from datetime import date
+
+    dbmanager = MagicMock()
+    dbmanager.get_median_salary_trend.return_value = [(date(2025, 6, 1), "Company", 150000)]
+    output = tmp_path / "result.csv"
+
+    with patch("src.config.config", return_value={}), patch("src.DBManager.DBManager", return_value=dbmanager):
+        code = cli.main(
+            ["query", "salary-trend", "1740", "--date-from", "2025-01-01", "--format", "csv", "-o", str(output)]
+        )
+
+    assert code == 0
+    dbmanager.get_median_salary_trend.assert_called_once_with(date(2025, 1, 1), None, "1740")
+    assert output.read_text(encoding="utf-8").splitlines()[1] == "2025-06-01,Company,150000"
@@ -21,3 +21,13 @@ def test_config_returns_dict(sample_db_params: dict[str, str]) -> None:
     result = config("database.ini")
     assert isinstance(result, dict), "Функция config должна возвращать словарь"
     assert "host" in result, "В словаре конфигурации должен быть ключ 'host'"
+
+
+def test_load_employers(tmp_path) -> None:
+    """Проверяет чтение списка ID работодателей из файла"""
+    from src.config import load_employers
+
+    filename = tmp_path / "employers.txt"
+    filename.write_text("# Работодатели\n1740\n80, 3529  # Яндекс\n\n1740 15478\n", encoding="utf-8")
+
+    assert load_employers(str(filename)) == ["1740", "80", "3529", "15478"]
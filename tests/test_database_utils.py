@@ -43,3 +43,367 @@ def test_save_data_to_database(test_dbname: str, sample_db_params: dict[str, str
         vacancies_count = cur.fetchone()[0]
         assert vacancies_count > 0  # Должны быть добавлены вакансии
     conn.close()
+
+
+def test_save_stream_to_database(test_dbname: str, sample_db_params: dict[str, str]) -> None:
+    """Проверяет потоковое сохранение пачек вакансий в базу"""
+    from src.database_utils import create_database, save_stream_to_database
+
+    create_database(test_dbname, sample_db_params)
+
+    company = {
+        "id": "1",
+        "name": "Test Company",
+        "area": "Moscow",
+        "open_vacancies": 2,
+        "industries": [{"name": "IT"}],
+        "url": "test.com",
+        "vacancies_url": "test.com/vac",
+    }
+    vacancy = {
+        "id": "10",
+        "name": "Developer",
+        "area": "Moscow",
+        "salary_from": 100000,
+        "salary_to": 150000,
+        "currency": "RUR",
+        "published_at": "2023-01-01",
+        "responsibility": "Code",
+        "url": "test.com/vac/1",
+    }
+    stream = iter([(company, [vacancy]), (company, [{**vacancy, "id": "11"}, vacancy])])
+
+    save_stream_to_database(stream, test_dbname, sample_db_params)
+
+    import psycopg2
+
+    conn = psycopg2.connect(dbname=test_dbname, **sample_db_params)
+    with conn.cursor() as cur:
+        cur.execute("SELECT COUNT(*) FROM companies")
+        assert cur.fetchone()[0] == 1  # Компания добавляется один раз
+        cur.execute("SELECT COUNT(*) FROM vacancies")
+        assert cur.fetchone()[0] == 2  # Добавлены вакансии обеих пачек без повторов
+    conn.close()
+
+
+def test_sync_data_to_database(test_dbname: str, sample_db_params: dict[str, str]) -> None:
+    """Проверяет инкрементальную синхронизацию: обновление изменённых и архивирование пропавших вакансий"""
+    from src.database_utils import ensure_database, sync_data_to_database
+
+    ensure_database(test_dbname, sample_db_params)
+
+    company = {
+        "id": "1",
+        "name": "Test Company",
+        "area": "Moscow",
+        "open_vacancies": 2,
+        "industries": [{"name": "IT"}],
+        "url": "test.com",
+        "vacancies_url": "test.com/vac",
+    }
+    vacancy = {
+        "id": "10",
+        "name": "Developer",
+        "area": "Moscow",
+        "salary_from": 100000,
+        "salary_to": 150000,
+        "currency": "RUR",
+        "published_at": "2023-01-01",
+        "responsibility": "Code",
+        "url": "test.com/vac/10",
+    }
+    other_vacancy = {**vacancy, "id": "11", "url": "test.com/vac/11"}
+
+    sync_data_to_database([{"company": company, "vacancies": [vacancy, other_vacancy]}], test_dbname, sample_db_params)
+    changed_vacancy = {**vacancy, "salary_to": 200000}
+    sync_data_to_database([{"company": company, "vacancies": [changed_vacancy]}], test_dbname, sample_db_params)
+
+    import psycopg2
+
+    conn = psycopg2.connect(dbname=test_dbname, **sample_db_params)
+    with conn.cursor() as cur:
+        cur.execute("SELECT hh_id, salary_to, archived FROM vacancies ORDER BY hh_id")
+        assert cur.fetchall() == [("10", 200000, False), ("11", 150000, True)]
+        cur.execute("SELECT COUNT(*) FROM companies")
+        assert cur.fetchone()[0] == 1
+    conn.close()
+
+
+def test_salaries_normalized_to_rub(test_dbname: str, sample_db_params: dict[str, str]) -> None:
+    """Проверяет пересчёт зарплат в рубли по курсам из файла"""
+    import json
+
+    from src.database_utils import EXCHANGE_RATES_FILE, create_database, save_data_to_database
+
+    create_database(test_dbname, sample_db_params)
+
+    company = {
+        "id": "1",
+        "name": "Test Company",
+        "area": "Moscow",
+        "open_vacancies": 2,
+        "industries": [{"name": "IT"}],
+        "url": "test.com",
+        "vacancies_url": "test.com/vac",
+    }
+    vacancy = {
+        "id": "10",
+        "name": "Developer",
+        "area": "Moscow",
+        "salary_from": 1000,
+        "salary_to": 3000,
+        "currency": "USD",
+        "published_at": "2023-01-01",
+        "responsibility": "Code",
+        "url": "test.com/vac/10",
+    }
+    no_salary = {**vacancy, "id": "11", "salary_from": 0, "salary_to": 0, "currency": "Не указано"}
+    save_data_to_database([{"company": company, "vacancies": [vacancy, no_salary]}], test_dbname, sample_db_params)
+
+    with open(EXCHANGE_RATES_FILE, encoding="utf-8") as file:
+        usd_rate = json.load(file)["rates"]["USD"]
+
+    import psycopg2
+
+    conn = psycopg2.connect(dbname=test_dbname, **sample_db_params)
+    with conn.cursor() as cur:
+        cur.execute("SELECT hh_id, salary_mid_rub FROM vacancies ORDER BY hh_id")
+        rows = cur.fetchall()
+        assert float(rows[0][1]) == 2000 * usd_rate  # Середина вилки пересчитана в рубли
+        assert rows[1][1] is None  # Вакансия без зарплаты не учитывается
+    conn.close()
+
+
+def test_load_exchange_rates_removes_stale(tmp_path, test_dbname: str, sample_db_params: dict[str, str]) -> None:
+    """Проверяет, что курсы валют, удалённые из файла, удаляются из таблицы exchange_rates"""
+    import json
+
+    import psycopg2
+
+    from src.database_utils import create_database, load_exchange_rates
+
+    create_database(test_dbname, sample_db_params)
+    rates_file = tmp_path / "rates.json"
+    rates_file.write_text(json.dumps({"version": "2", "base": "RUR", "rates": {"RUR": 1, "USD": 80}}))
+
+    conn = psycopg2.connect(dbname=test_dbname, **sample_db_params)
+    with conn.cursor() as cur:
+        load_exchange_rates(cur)
+        assert load_exchange_rates(cur, str(rates_file)) == "2"
+        cur.execute("SELECT currency, rate FROM exchange_rates ORDER BY currency")
+        assert cur.fetchall() == [("RUR", 1), ("USD", 80)]
+    conn.close()
+
+
+def test_sync_resets_rub_salary(test_dbname: str, sample_db_params: dict[str, str]) -> None:
+    """Проверяет, что после синхронизации вакансии без зарплаты или в валюте без курса зарплата в рублях сброшена"""
+    import psycopg2
+
+    from src.database_utils import ensure_database, sync_data_to_database
+
+    ensure_database(test_dbname, sample_db_params)
+
+    company = {
+        "id": "1",
+        "name": "Test Company",
+        "area": "Moscow",
+        "open_vacancies": 2,
+        "industries": [{"name": "IT"}],
+        "url": "test.com",
+        "vacancies_url": "test.com/vac",
+    }
+    vacancy = {
+        "id": "10",
+        "name": "Developer",
+        "area": "Moscow",
+        "salary_from": 1000,
+        "salary_to": 3000,
+        "currency": "USD",
+        "published_at": "2023-01-01",
+        "responsibility": "Code",
+        "url": "test.com/vac/10",
+    }
+    other = {**vacancy, "id": "11", "url": "test.com/vac/11"}
+    sync_data_to_database([{"company": company, "vacancies": [vacancy, other]}], test_dbname, sample_db_params)
+
+    no_salary = {**vacancy, "salary_from": 0, "salary_to": 0, "currency": "Не указана"}
+    no_rate = {**other, "currency": "XXX"}
+    sync_data_to_database([{"company": company, "vacancies": [no_salary, no_rate]}], test_dbname, sample_db_params)
+
+    conn = psycopg2.connect(dbname=test_dbname, **sample_db_params)
+    with conn.cursor() as cur:
+        cur.execute("SELECT hh_id, salary_from_rub, salary_to_rub, salary_mid_rub FROM vacancies ORDER BY hh_id")
+        assert cur.fetchall() == [("10", None, None, None), ("11", None, None, None)]
+    conn.close()
+
+
+def test_ensure_database_upgrades_old_schema(test_dbname: str, sample_db_params: dict[str, str]) -> None:
+    """Проверяет, что ensure_database добавляет новые столбцы в таблицу вакансий, созданную прежней схемой"""
+    import psycopg2
+
+    from src.database_utils import VACANCY_ADDED_COLUMNS, ensure_database, sync_data_to_database
+
+    ensure_database(test_dbname, sample_db_params)
+    conn = psycopg2.connect(dbname=test_dbname, **sample_db_params)
+    with conn.cursor() as cur:
+        for column in VACANCY_ADDED_COLUMNS:
+            cur.execute(f"ALTER TABLE vacancies DROP COLUMN {column} CASCADE")
+    conn.commit()
+    conn.close()
+
+    company = {
+        "id": "1",
+        "name": "Test Company",
+        "area": "Moscow",
+        "open_vacancies": 1,
+        "industries": [{"name": "IT"}],
+        "url": "test.com",
+        "vacancies_url": "test.com/vac",
+    }
+    vacancy = {
+        "id": "10",
+        "name": "Developer",
+        "area": "Moscow",
+        "salary_from": 100000,
+        "salary_to": 150000,
+        "currency": "RUR",
+        "published_at": "2023-01-01",
+        "responsibility": "Code",
+        "url": "test.com/vac/10",
+    }
+    ensure_database(test_dbname, sample_db_params)
+    sync_data_to_database([{"company": company, "vacancies": [vacancy]}], test_dbname, sample_db_params)
+
+    conn = psycopg2.connect(dbname=test_dbname, **sample_db_params)
+    with conn.cursor() as cur:
+        cur.execute("SELECT salary_mid_rub FROM vacancies")
+        assert cur.fetchone()[0] == 125000
+        cur.execute("SELECT avg_salary FROM company_stats")
+        assert cur.fetchone()[0] == 125000
+    conn.close()
+
+
+def test_insert_companies_skips_repeated_employers() -> None:
+    """Проверяет, что повторный ID работодателя добавляется в companies один раз и получает тот же company_id"""
+    from unittest.mock import MagicMock, patch
+
+    from src.database_utils import _insert_companies
+    from src.models import Company
+
+    companies = [Company(employer_id, "Company", "Moscow", 1, [], "test.com", "test.com/vac") for employer_id in "121"]
+    with patch("src.database_utils.execute_values", return_value=[("1", 10), ("2", 11)]) as mock_execute:
+        assert _insert_companies(MagicMock(), companies) == [10, 11, 10]
+    assert [row[0] for row in mock_execute.call_args.args[2]] == ["1", "2"]
+
+
+def test_save_repeated_employer(test_dbname: str, sample_db_params: dict[str, str]) -> None:
+    """Проверяет загрузку и синхронизацию данных, в которых работодатель повторяется"""
+    import psycopg2
+
+    from src.database_utils import create_database, save_data_to_database, sync_data_to_database
+
+    company = {
+        "id": "1",
+        "name": "Test Company",
+        "area": "Moscow",
+        "open_vacancies": 1,
+        "industries": [{"name": "IT"}],
+        "url": "test.com",
+        "vacancies_url": "test.com/vac",
+    }
+    vacancy = {
+        "id": "10",
+        "name": "Developer",
+        "area": "Moscow",
+        "salary_from": 100000,
+        "salary_to": 150000,
+        "currency": "RUR",
+        "published_at": "2023-01-01",
+        "responsibility": "Code",
+        "url": "test.com/vac/10",
+    }
+    data = [{"company": company, "vacancies": [vacancy]}, {"company": company, "vacancies": [vacancy]}]
+
+    create_database(test_dbname, sample_db_params)
+    save_data_to_database(data, test_dbname, sample_db_params)
+    sync_data_to_database(data, test_dbname, sample_db_params)
+
+    conn = psycopg2.connect(dbname=test_dbname, **sample_db_params)
+    with conn.cursor() as cur:
+        cur.execute("SELECT COUNT(*) FROM companies")
+        assert cur.fetchone()[0] == 1
+        cur.execute("SELECT COUNT(*) FROM vacancies")
+        assert cur.fetchone()[0] == 1
+    conn.close()
+
+
+def test_month_start() -> None:
+    """Проверяет вычисление границ месячных секций истории вакансий"""
+    from datetime import date
+
+    from src.database_utils import _month_start
+
+    assert _month_start(date(2025, 6, 15)) == date(2025, 6, 1)
+    assert _month_start(date(2025, 12, 31), 1) == date(2026, 1, 1)
+    assert _month_start(date(2025, 1, 10), -24) == date(2023, 1, 1)
+
+
+def test_vacancy_history(test_dbname: str, sample_db_params: dict[str, str]) -> None:
+    """Проверяет снимки истории вакансий: сохранение между загрузками, секции по месяцам и удаление старых секций"""
+    from datetime import date, timedelta
+
+    import psycopg2
+
+    from src.database_utils import (_month_start, create_database, drop_old_history_partitions, save_data_to_database,
+                                    snapshot_history)
+
+    # Снимок прошлого месяца: при загрузке удаляются только секции старше срока хранения от текущей даты
+    this_month = _month_start(date.today())
+    last_month = _month_start(this_month, -1) + timedelta(days=14)
+
+    company = {
+        "id": "1",
+        "name": "Test Company",
+        "area": "Moscow",
+        "open_vacancies": 2,
+        "industries": [{"name": "IT"}],
+        "url": "test.com",
+        "vacancies_url": "test.com/vac",
+    }
+    vacancy = {
+        "id": "10",
+        "name": "Developer",
+        "area": "Moscow",
+        "salary_from": 100000,
+        "salary_to": 150000,
+        "currency": "RUR",
+        "published_at": "2023-01-01",
+        "responsibility": "Code",
+        "url": "test.com/vac/10",
+    }
+    data = [{"company": company, "vacancies": [vacancy, {**vacancy, "id": "11", "url": "test.com/vac/11"}]}]
+
+    create_database(test_dbname, sample_db_params)
+    save_data_to_database(data, test_dbname, sample_db_params)
+    conn = psycopg2.connect(dbname=test_dbname, **sample_db_params)
+    with conn.cursor() as cur:
+        assert snapshot_history(cur, last_month) == 2
+    conn.commit()
+    conn.close()
+
+    # Полная перезагрузка пересоздаёт таблицы вакансий, но не историю
+    create_database(test_dbname, sample_db_params)
+    save_data_to_database(data, test_dbname, sample_db_params)
+
+    conn = psycopg2.connect(dbname=test_dbname, **sample_db_params)
+    with conn.cursor() as cur:
+        cur.execute("SELECT snapshot_date, COUNT(*) FROM vacancy_history GROUP BY snapshot_date ORDER BY 1")
+        assert cur.fetchall() == [(last_month, 2), (date.today(), 2)]
+
+        # Через год секция прошлого месяца выходит за срок хранения, секция текущего месяца - ещё нет
+        dropped = drop_old_history_partitions(cur, retention_months=12, today=_month_start(this_month, 12))
+        assert dropped == [f"vacancy_history_{last_month:%Y%m}"]
+        cur.execute("SELECT COUNT(*) FROM vacancy_history WHERE snapshot_date < %s", (this_month,))
+        assert cur.fetchone()[0] == 0
+    conn.commit()
+    conn.close()
@@ -1,3 +1,5 @@
+from unittest.mock import MagicMock, patch
+
 from src.database_utils import create_database, save_data_to_database
 from src.HH_api import get_hh_data_short
 
@@ -80,3 +82,264 @@ def test_get_vacancies_with_keyword(db_manager, test_dbname, sample_db_params, s
             assert isinstance(item, tuple)  # "Каждый элемент должен быть кортежем"
             assert len(item) == 6  # "Каждый кортеж должен содержать 6 элементов"
             assert keyword.lower() in item[1].lower()  # "Название вакансии должно содержать ключевое слово"
+
+
+def test_pool_reuses_connection(db_manager, test_dbname, sample_db_params) -> None:
+    """Проверяет, что запросы переиспользуют соединение из пула"""
+    create_database(test_dbname, sample_db_params)
+
+    db_manager.get_companies_and_vacancies_count()
+    pool = db_manager.pool
+    assert pool is not None  # "Пул должен быть создан при первом запросе"
+    conn = pool._pool[0]
+
+    db_manager.get_all_vacancies()
+    assert db_manager.pool is pool  # "Пул должен сохраняться между вызовами"
+    assert pool._pool == [conn]  # "Соединение должно вернуться в пул и переиспользоваться"
+    assert not conn.closed
+
+    db_manager.disconnect()
+    assert conn.closed  # "После disconnect соединения пула закрыты"
+
+
+def test_search_vacancies(db_manager, test_dbname, sample_db_params, sample_employers_id) -> None:
+    """Проверяет метод search_vacancies"""
+
+    # Подготавливаем тестовые данные
+    create_database(test_dbname, sample_db_params)
+    hh_data = get_hh_data_short(sample_employers_id)
+    save_data_to_database(hh_data, test_dbname, sample_db_params)
+
+    # Тестируем метод
+    result = db_manager.search_vacancies("разработчик", limit=5)
+    assert isinstance(result, list)  # "Метод должен возвращать список"
+    assert len(result) <= 5  # "Количество результатов ограничено limit"
+    for item in result:
+        assert isinstance(item, tuple)  # "Каждый элемент должен быть кортежем"
+        assert len(item) == 6  # "Каждый кортеж должен содержать 6 элементов"
+
+
+def test_get_vacancies_with_higher_salary(db_manager, test_dbname, sample_db_params, sample_employers_id) -> None:
+    """Проверяет метод get_vacancies_with_higher_salary"""
+
+    # Подготавливаем тестовые данные
+    create_database(test_dbname, sample_db_params)
+    hh_data = get_hh_data_short(sample_employers_id)
+    save_data_to_database(hh_data, test_dbname, sample_db_params)
+
+    # Тестируем метод
+    avg_salary = db_manager.get_avg_salary()
+    result = db_manager.get_vacancies_with_higher_salary()
+    assert isinstance(result, list)  # "Метод должен возвращать список"
+    for item in result:
+        assert len(item) == 6  # "Каждый кортеж должен содержать 6 элементов"
+
+    # Зарплаты сравниваются в рублях: ожидаемые вакансии выбираются по salary_mid_rub
+    with db_manager._cursor() as cur:
+        cur.execute("SELECT url, salary_mid_rub FROM vacancies WHERE NOT archived AND salary_mid_rub IS NOT NULL")
+        salaries = dict(cur.fetchall())
+    expected = {url for url, salary in salaries.items() if salary > avg_salary}
+    assert {item[5] for item in result} == expected  # "Выбраны все вакансии с зарплатой выше средней и только они"
+
+
+def test_get_company_salary_stats(db_manager, test_dbname, sample_db_params, sample_employers_id) -> None:
+    """Проверяет метод get_company_salary_stats"""
+
+    # Подготавливаем тестовые данные
+    create_database(test_dbname, sample_db_params)
+    hh_data = get_hh_data_short(sample_employers_id)
+    save_data_to_database(hh_data, test_dbname, sample_db_params)
+
+    # Тестируем метод
+    result = db_manager.get_company_salary_stats()
+    counts = dict(db_manager.get_companies_and_vacancies_count())
+    assert len(result) == len(counts)  # "Статистика должна быть по каждой компании"
+    for item in result:
+        assert len(item) == 6  # "Каждый кортеж должен содержать 6 элементов"
+        assert item[1] == counts[item[0]]  # "Количество вакансий совпадает с get_companies_and_vacancies_count"
+        assert item[2] <= item[1]  # "Вакансий с зарплатой не больше общего количества"
+
+
+def test_iter_all_vacancies(db_manager, test_dbname, sample_db_params, sample_employers_id) -> None:
+    """Проверяет, что iter_all_vacancies выдаёт те же строки, что и get_all_vacancies"""
+
+    # Подготавливаем тестовые данные
+    create_database(test_dbname, sample_db_params)
+    hh_data = get_hh_data_short(sample_employers_id)
+    save_data_to_database(hh_data, test_dbname, sample_db_params)
+
+    # Тестируем метод
+    assert list(db_manager.iter_all_vacancies(batch_size=7)) == db_manager.get_all_vacancies()
+
+
+def test_get_vacancies_page(db_manager, test_dbname, sample_db_params, sample_employers_id) -> None:
+    """Проверяет пагинацию по ключу в get_vacancies_page"""
+
+    # Подготавливаем тестовые данные
+    create_database(test_dbname, sample_db_params)
+    hh_data = get_hh_data_short(sample_employers_id)
+    save_data_to_database(hh_data, test_dbname, sample_db_params)
+
+    # Собираем все страницы
+    pages = []
+    rows, next_key = db_manager.get_vacancies_page(limit=10)
+    pages.extend(rows)
+    while next_key is not None:
+        rows, next_key = db_manager.get_vacancies_page(after=next_key, limit=10)
+        assert len(rows) <= 10  # "Размер страницы не превышает limit"
+        pages.extend(rows)
+
+    assert len(pages) == len(db_manager.get_all_vacancies())  # "Все вакансии выданы ровно один раз"
+
+
+def test_get_vacancies_page_uses_index(db_manager, test_dbname, sample_db_params, sample_employers_id) -> None:
+    """Проверяет, что страница после ключа находится по индексу companies_name_idx, а не перебором предыдущих строк"""
+    create_database(test_dbname, sample_db_params)
+    save_data_to_database(get_hh_data_short(sample_employers_id), test_dbname, sample_db_params)
+    _, last_key = db_manager.get_vacancies_page(limit=1)
+
+    with db_manager._cursor() as cur:
+        # Тестовых данных мало, без запрета последовательного чтения планировщик выбирает его
+        cur.execute("SET enable_seqscan = off")
+        query, params = db_manager._page_query(last_key, 10)
+        cur.execute("EXPLAIN (FORMAT JSON) " + query, params)
+        plan = cur.fetchone()[0][0]["Plan"]
+        cur.execute("RESET enable_seqscan")
+
+    nodes = [plan]
+    for node in nodes:
+        nodes.extend(node.get("Plans", []))
+    conditions = [node.get("Index Cond", "") for node in nodes if node.get("Index Name") == "companies_name_idx"]
+    assert any(">=" in condition for condition in conditions)  # "Условие по названию компании выполняется индексом"
+
+
+def test_query_cache_invalidated_by_generation() -> None:
+    """Проверяет кэш результатов: повторный запрос берётся из кэша, новая загрузка сбрасывает кэш"""
+    from src.DBManager import DBManager
+
+    manager = DBManager("test_vacancies_db", {}, cache_bytes=10_000)
+    loader = MagicMock(return_value=[("Company", 1)])
+    with patch.object(DBManager, "_get_generation", side_effect=[(1, 100), (1, 100), (2, 100)]):
+        assert manager._cached(("get_companies_and_vacancies_count",), loader) == [("Company", 1)]
+        assert manager._cached(("get_companies_and_vacancies_count",), loader) == [("Company", 1)]
+        assert loader.call_count == 1  # "Повторный запрос обслуживается из кэша"
+        manager._cached(("get_companies_and_vacancies_count",), loader)
+        assert loader.call_count == 2  # "После новой загрузки данные запрашиваются заново"
+
+    assert manager.cache_hits == 1
+    assert manager.cache_misses == 2
+
+
+def _mock_pool(conns: list) -> MagicMock:
+    """Пул соединений, как и ThreadedConnectionPool, выдающий последнее возвращённое соединение"""
+    free = list(conns)
+    pool = MagicMock(closed=False)
+    pool.getconn.side_effect = lambda: free.pop()
+    pool.putconn.side_effect = lambda conn, close=False: None if close else free.append(conn)
+    return pool
+
+
+def _mock_conn() -> MagicMock:
+    """Исправное соединение без открытой транзакции"""
+    from psycopg2.extensions import TRANSACTION_STATUS_IDLE
+
+    conn = MagicMock(closed=0)
+    conn.get_transaction_status.return_value = TRANSACTION_STATUS_IDLE
+    return conn
+
+
+def test_connect_does_not_hold_pool_slot() -> None:
+    """Проверяет, что connect() не занимает место в пуле: запрос в with-блоке при maxconn=1 не блокируется"""
+    import threading
+
+    from src.DBManager import DBManager
+
+    result = []
+
+    def run() -> None:
+        with DBManager("test_vacancies_db", {}, maxconn=1) as manager:
+            result.append(manager.get_companies_and_vacancies_count())
+
+    with patch("src.DBManager.ThreadedConnectionPool", return_value=_mock_pool([_mock_conn()])):
+        thread = threading.Thread(target=run, daemon=True)
+        thread.start()
+        thread.join(timeout=5)
+    assert not thread.is_alive()  # "Запрос не должен ждать соединения, занятого connect()"
+    assert len(result) == 1
+
+
+def test_checkout_replaces_dropped_connection() -> None:
+    """Проверяет, что простаивавшее соединение, разорванное сервером, заменяется при выдаче из пула"""
+    import psycopg2
+
+    from src import DBManager as dbmanager_module
+    from src.DBManager import DBManager
+
+    dropped, fresh = _mock_conn(), _mock_conn()
+    dropped.cursor.return_value.__enter__.return_value.execute.side_effect = psycopg2.OperationalError("closed")
+    pool = _mock_pool([fresh, dropped])
+    manager = DBManager("test_vacancies_db", {}, maxconn=2)
+    with (
+        patch("src.DBManager.ThreadedConnectionPool", return_value=pool),
+        patch.object(dbmanager_module, "PING_IDLE_SECONDS", 0.0),
+    ):
+        manager._release(manager._checkout())  # Соединение побывало в пуле и будет проверено при выдаче
+        conn = manager._checkout()
+    assert conn is fresh
+    pool.putconn.assert_any_call(dropped, close=True)
+
+
+def test_get_vacancies_page_query() -> None:
+    """Проверяет запрос страницы после ключа и ключ следующей страницы без подключения к БД"""
+    from src.DBManager import DBManager
+
+    conn = _mock_conn()
+    cur = conn.cursor.return_value.__enter__.return_value
+    cur.fetchall.return_value = [("Company", "Python", 1, 2, "RUR", "url", 7)]
+    with patch("src.DBManager.ThreadedConnectionPool", return_value=_mock_pool([conn])):
+        rows, next_key = DBManager("test_vacancies_db", {}).get_vacancies_page(("A", "B", 3), limit=1)
+
+    assert rows == [("Company", "Python", 1, 2, "RUR", "url")]
+    assert next_key == ("Company", "Python", 7)
+    query, params = cur.execute.call_args.args
+    assert "companies.name >= %s" in query
+    assert params == ("A", "A", "B", 3, 1)
+
+
+def test_trends(db_manager, test_dbname, sample_db_params) -> None:
+    """Проверяет методы get_vacancies_count_trend и get_median_salary_trend по истории вакансий"""
+    from datetime import date
+
+    company = {
+        "id": "1",
+        "name": "Test Company",
+        "area": "Moscow",
+        "open_vacancies": 3,
+        "industries": [{"name": "IT"}],
+        "url": "test.com",
+        "vacancies_url": "test.com/vac",
+    }
+    vacancy = {
+        "id": "10",
+        "name": "Developer",
+        "area": "Moscow",
+        "salary_from": 100000,
+        "salary_to": 100000,
+        "currency": "RUR",
+        "published_at": "2023-01-01",
+        "responsibility": "Code",
+        "url": "test.com/vac/10",
+    }
+    vacancies = [
+        vacancy,
+        {**vacancy, "id": "11", "salary_from": 200000, "salary_to": 200000},
+        {**vacancy, "id": "12", "salary_from": 0, "salary_to": 0, "currency": "Не указано"},
+    ]
+    create_database(test_dbname, sample_db_params)
+    save_data_to_database([{"company": company, "vacancies": vacancies}], test_dbname, sample_db_params)
+
+    today = date.today()
+    assert db_manager.get_vacancies_count_trend(date(2000, 1, 1)) == [(today, "Test Company", 3)]
+    assert db_manager.get_vacancies_count_trend(date(2000, 1, 1), employer_id="2") == []
+    result = db_manager.get_median_salary_trend(date(2000, 1, 1), today, "1")
+    assert [(row[0], row[1], float(row[2])) for row in result] == [(today, "Test Company", 150000.0)]
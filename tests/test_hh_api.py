@@ -1,11 +1,15 @@
+from datetime import timedelta
+from typing import Callable
 from unittest.mock import MagicMock, patch
 
-from src.HH_api import get_hh_data_full, get_hh_data_short
+from benchmarks.fake_hh_server import FakeHHServer
+from src import metrics
+from src.HH_api import get_hh_data_full, get_hh_data_short, iter_hh_vacancies
 
 
 def test_get_hh_data_short() -> None:
     """Тестирование получения кратких данных с HH API"""
-    mock_company_response = MagicMock()
+    mock_company_response = MagicMock(status_code=200)
     mock_company_response.json.return_value = {
         "name": "Test Company",
         "area": {"name": "Moscow"},
@@ -15,10 +19,11 @@ def test_get_hh_data_short() -> None:
         "vacancies_url": "test.com/vac",
     }
 
-    mock_vacancies_response = MagicMock()
+    mock_vacancies_response = MagicMock(status_code=200)
     mock_vacancies_response.json.return_value = {
         "items": [
             {
+                "id": "1",
                 "name": "Developer",
                 "area": {"name": "Moscow"},
                 "salary": {"from": 100000, "to": 150000, "currency": "RUR"},
@@ -29,7 +34,7 @@ def test_get_hh_data_short() -> None:
         ]
     }
 
-    with patch("requests.get", side_effect=[mock_company_response, mock_vacancies_response]):
+    with patch("requests.Session.get", side_effect=[mock_company_response, mock_vacancies_response]):
         result = get_hh_data_short(["123"])
 
         assert len(result) == 1
@@ -39,7 +44,7 @@ def test_get_hh_data_short() -> None:
 
 def test_get_hh_data_full() -> None:
     """Тестирование получения полных данных с HH API"""
-    mock_company_response = MagicMock()
+    mock_company_response = MagicMock(status_code=200)
     mock_company_response.json.return_value = {
         "name": "Test Company",
         "area": {"name": "Moscow"},
@@ -49,10 +54,11 @@ def test_get_hh_data_full() -> None:
         "vacancies_url": "test.com/vac",
     }
 
-    mock_vacancies_page1 = MagicMock()
+    mock_vacancies_page1 = MagicMock(status_code=200)
     mock_vacancies_page1.json.return_value = {
         "items": [
             {
+                "id": "1",
                 "name": "Developer 1",
                 "area": {"name": "Moscow"},
                 "salary": {"from": 100000, "to": 150000, "currency": "RUR"},
@@ -63,12 +69,174 @@ def test_get_hh_data_full() -> None:
         ]
     }
 
-    mock_vacancies_page2 = MagicMock()
+    mock_vacancies_page2 = MagicMock(status_code=200)
     mock_vacancies_page2.json.return_value = {"items": []}
 
-    with patch("requests.get", side_effect=[mock_company_response, mock_vacancies_page1, mock_vacancies_page2]):
+    responses = [mock_company_response, mock_vacancies_page1, mock_vacancies_page2]
+    with patch("requests.Session.get", side_effect=responses):
         result = get_hh_data_full(["123"])
 
         assert len(result) == 1
         assert len(result[0]["vacancies"]) == 1
         assert result[0]["vacancies"][0]["name"] == "Developer 1"
+
+
+def test_get_hh_data_full_concurrent_order() -> None:
+    """Тестирование параллельного получения данных: порядок компаний и страниц сохраняется"""
+
+    def fake_get(url: str, params: dict | None = None, **kwargs: object) -> MagicMock:
+        response = MagicMock(status_code=200)
+        if "employers" in url:
+            employer_id = url.rsplit("/", 1)[-1]
+            response.json.return_value = {
+                "name": f"Company {employer_id}",
+                "area": {"name": "Moscow"},
+                "open_vacancies": 3,
+                "industries": [{"name": "IT"}],
+                "alternate_url": "test.com",
+                "vacancies_url": "test.com/vac",
+            }
+        else:
+            assert params is not None
+            response.json.return_value = {
+                "pages": 3,
+                "items": [
+                    {
+                        "id": f"{params['employer_id']}-{params['page']}",
+                        "name": f"Vacancy {params['employer_id']}-{params['page']}",
+                        "area": {"name": "Moscow"},
+                        "salary": None,
+                        "published_at": "2023-01-01",
+                        "snippet": {"responsibility": "Code"},
+                        "alternate_url": "test.com/vac/1",
+                    }
+                ],
+            }
+        return response
+
+    with patch("requests.Session.get", side_effect=fake_get):
+        result = get_hh_data_full(["1", "2", "3"], max_workers=4)
+
+    assert [item["company"]["name"] for item in result] == ["Company 1", "Company 2", "Company 3"]
+    assert [vac["name"] for vac in result[1]["vacancies"]] == ["Vacancy 2-0", "Vacancy 2-1", "Vacancy 2-2"]
+
+
+def test_iter_hh_vacancies_yields_pages() -> None:
+    """Тестирование потокового получения вакансий постранично"""
+    mock_company_response = MagicMock(status_code=200)
+    mock_company_response.json.return_value = {
+        "name": "Test Company",
+        "area": {"name": "Moscow"},
+        "open_vacancies": 2,
+        "industries": [{"name": "IT"}],
+        "alternate_url": "test.com",
+        "vacancies_url": "test.com/vac",
+    }
+    pages = []
+    for page_n in range(2):
+        mock_page = MagicMock(status_code=200)
+        mock_page.json.return_value = {
+            "pages": 2,
+            "items": [
+                {
+                    "id": str(page_n),
+                    "name": f"Developer {page_n}",
+                    "area": {"name": "Moscow"},
+                    "salary": None,
+                    "published_at": "2023-01-01",
+                    "snippet": {"responsibility": "Code"},
+                    "alternate_url": "test.com/vac/1",
+                }
+            ],
+        }
+        pages.append(mock_page)
+
+    with patch("requests.Session.get", side_effect=[mock_company_response, *pages]):
+        batches = list(iter_hh_vacancies(["123"]))
+
+    assert len(batches) == 2
+    assert batches[0][0]["id"] == "123"
+    assert [batch[1][0]["name"] for batch in batches] == ["Developer 0", "Developer 1"]
+
+
+def test_get_hh_data_full_shards_deep_search() -> None:
+    """Тестирование разбиения поиска по датам публикации, когда вакансий больше глубины выдачи API"""
+    server = FakeHHServer(employers=1, pages=45, per_page=100)
+    requested = []
+
+    def fake_get(url: str, params: dict | None = None, **kwargs: object) -> MagicMock:
+        response = MagicMock(status_code=200)
+        if "employers" in url:
+            response.json.return_value = server.employer(url.rsplit("/", 1)[-1])
+        else:
+            assert params is not None
+            requested.append(params)
+            shard = params.get("date_from"), params.get("date_to")
+            page = server.vacancies(params["employer_id"], params["page"], params["per_page"], *shard)
+            response.json.return_value = page
+        return response
+
+    with patch("requests.Session.get", side_effect=fake_get):
+        result = get_hh_data_full(["1"], max_workers=4)
+        batches = list(iter_hh_vacancies(["1"]))
+
+    vacancies_id = [vac["id"] for vac in result[0]["vacancies"]]
+    assert len(vacancies_id) == len(set(vacancies_id)) == 4500
+    assert all(params["page"] * params["per_page"] < 2000 for params in requested)
+    assert sum(len(vacancies) for _, vacancies in batches) == 4500
+
+
+def _sharded_api(server: FakeHHServer, drop_pages: bool = False) -> Callable[..., dict]:
+    """Имитация get_json поверх FakeHHServer (drop_pages - ответы интервалов дат без поля pages)"""
+
+    def fake_get_json(url: str, params: dict | None = None) -> dict:
+        if params is None:
+            return server.employer(url.rsplit("/", 1)[-1])
+        shard = params.get("date_from"), params.get("date_to")
+        page = server.vacancies(params["employer_id"], params["page"], params["per_page"], *shard)
+        if drop_pages and shard[0] is not None:
+            del page["pages"]
+        return page
+
+    return fake_get_json
+
+
+def test_shards_include_vacancies_before_period() -> None:
+    """Проверяет, что вакансии, опубликованные раньше периода SHARD_PERIOD_DAYS, тоже получаются"""
+    # 4500 вакансий с шагом 10 минут публикуются за 31 день, период разбиения - последние 10 дней
+    server = FakeHHServer(employers=1, pages=45, per_page=100)
+    with patch("src.HH_api.SHARD_PERIOD_DAYS", 10), patch("src.HH_api.get_json", side_effect=_sharded_api(server)):
+        result = get_hh_data_full(["1"], max_workers=4)
+        batches = list(iter_hh_vacancies(["1"]))
+
+    assert len({vac["id"] for vac in result[0]["vacancies"]}) == 4500
+    assert sum(len(vacancies) for _, vacancies in batches) == 4500
+
+
+def test_shards_without_pages_field() -> None:
+    """Проверяет, что при отсутствии поля pages количество страниц интервала вычисляется из found"""
+    server = FakeHHServer(employers=1, pages=45, per_page=100)
+    with patch("src.HH_api.get_json", side_effect=_sharded_api(server, drop_pages=True)):
+        result = get_hh_data_full(["1"], max_workers=4)
+        batches = list(iter_hh_vacancies(["1"]))
+
+    assert len({vac["id"] for vac in result[0]["vacancies"]}) == 4500
+    assert sum(len(vacancies) for _, vacancies in batches) == 4500
+
+
+def test_incomplete_shards_reported_to_stderr(capsys) -> None:
+    """Проверяет, что предупреждение о неполном интервале выводится в stderr и учитывается в метриках"""
+    server = FakeHHServer(employers=1, pages=45, per_page=100)
+    metrics.reset()
+    metrics.enable()
+    fake_get_json = _sharded_api(server)
+    with patch("src.HH_api.MIN_SHARD", timedelta(days=1000)), patch("src.HH_api.get_json", side_effect=fake_get_json):
+        get_hh_data_full(["1"], max_workers=4)
+    counters = [c for c in metrics.snapshot()["counters"] if c["name"] == "hh_shards_incomplete_total"]
+    metrics.disable()
+    metrics.reset()
+
+    captured = capsys.readouterr()
+    assert captured.out == ""
+    assert "получены не все вакансии" in captured.err
+    assert counters and all(counter["labels"]["reason"] == "search_depth" for counter in counters)
@@ -0,0 +1,52 @@
+from unittest.mock import MagicMock, patch
+
+from src.http_cache import ResponseCache
+from src.transport import disable_cache, enable_cache, get_json
+
+
+def test_cache_put_get(tmp_path) -> None:
+    """Проверяет сохранение и получение записи кэша"""
+    cache = ResponseCache(str(tmp_path), ttl=60)
+    cache.put("https://api.hh.ru/vacancies", {"page": 0, "employer_id": "1"}, {"items": []}, etag='"abc"')
+
+    entry = cache.get("https://api.hh.ru/vacancies", {"employer_id": "1", "page": 0})
+    assert entry is not None
+    assert entry["body"] == {"items": []}
+    assert cache.is_fresh(entry)
+    assert cache.conditional_headers(entry) == {"If-None-Match": '"abc"'}
+    assert cache.get("https://api.hh.ru/vacancies", {"employer_id": "2", "page": 0}) is None
+
+
+def test_cache_evicts_least_recently_used(tmp_path) -> None:
+    """Проверяет вытеснение записей при превышении размера кэша"""
+    cache = ResponseCache(str(tmp_path), ttl=60, max_bytes=1000)
+    for page_n in range(20):
+        cache.put("https://api.hh.ru/vacancies", {"page": page_n}, {"items": ["x" * 50]})
+
+    assert cache.stats()["bytes"] <= 1000
+    assert cache.get("https://api.hh.ru/vacancies", {"page": 19}) is not None
+    assert cache.get("https://api.hh.ru/vacancies", {"page": 0}) is None
+
+
+def test_get_json_uses_cache_and_revalidates(tmp_path) -> None:
+    """Проверяет попадание в кэш и перепроверку устаревшей записи через 304"""
+    response = MagicMock(status_code=200, headers={"ETag": '"v1"'})
+    response.json.return_value = {"name": "Test"}
+    not_modified = MagicMock(status_code=304, headers={})
+
+    cache = enable_cache(str(tmp_path), ttl=60)
+    try:
+        with patch("requests.Session.get", side_effect=[response, not_modified]) as mock_get:
+            assert get_json("https://api.hh.ru/employers/1") == {"name": "Test"}
+            assert get_json("https://api.hh.ru/employers/1") == {"name": "Test"}
+            assert mock_get.call_count == 1
+
+            cache.ttl = 0
+            assert get_json("https://api.hh.ru/employers/1") == {"name": "Test"}
+            assert mock_get.call_args.kwargs["headers"] == {"If-None-Match": '"v1"'}
+    finally:
+        disable_cache()
+
+    assert cache.stats()["hits"] == 1
+    assert cache.stats()["misses"] == 1
+    assert cache.stats()["revalidated"] == 1
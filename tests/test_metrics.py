@@ -0,0 +1,37 @@
+from src import metrics
+
+
+def test_metrics_disabled_records_nothing() -> None:
+    """Проверяет, что при выключенном сборе метрики не записываются"""
+    metrics.disable()
+    metrics.reset()
+    metrics.inc("hh_requests_total", status=200)
+    with metrics.timer("db_query_seconds", method="get_all_vacancies"):
+        pass
+
+    assert metrics.snapshot()["counters"] == []
+    assert metrics.snapshot()["histograms"] == []
+
+
+def test_metrics_export(tmp_path) -> None:
+    """Проверяет запись счётчиков и гистограмм и выгрузку в форматах Prometheus и JSON"""
+    metrics.reset()
+    metrics.enable()
+    try:
+        metrics.inc("hh_requests_total", status=200)
+        metrics.inc("hh_requests_total", status=200)
+        metrics.observe("db_query_seconds", 0.02, method="get_all_vacancies")
+        metrics.observe("db_query_seconds", 3.0, method="get_all_vacancies")
+    finally:
+        metrics.disable()
+
+    text = metrics.to_prometheus()
+    assert 'hh_requests_total{status="200"} 2' in text
+    assert 'db_query_seconds_bucket{method="get_all_vacancies",le="0.025"} 1' in text
+    assert 'db_query_seconds_bucket{method="get_all_vacancies",le="+Inf"} 2' in text
+    assert 'db_query_seconds_count{method="get_all_vacancies"} 2' in text
+
+    path = tmp_path / "metrics.json"
+    metrics.export(str(path))
+    assert '"hh_requests_total"' in path.read_text(encoding="utf-8")
+    metrics.reset()
@@ -0,0 +1,41 @@
+from src.models import Company, Vacancy
+
+
+def test_vacancy_from_api() -> None:
+    """Проверяет разбор вакансии из ответа API HH.ru и доступ к полям по имени"""
+    vacancy = Vacancy.from_api(
+        {
+            "id": "1",
+            "name": "Developer",
+            "area": {"name": None},
+            "salary": {"from": 100000, "to": None, "currency": "RUR"},
+            "published_at": "2023-01-01",
+            "snippet": {"responsibility": "Code"},
+            "alternate_url": "test.com/vac/1",
+        }
+    )
+
+    assert vacancy["name"] == vacancy.name == "Developer"
+    assert vacancy["area"] == "Нет данных"
+    assert (vacancy["salary_from"], vacancy["salary_to"]) == (100000, 100000)
+    assert vacancy[1:3] == ("Developer", "Нет данных")
+    assert Vacancy.coerce(vacancy._asdict()) == vacancy
+
+
+def test_company_from_api() -> None:
+    """Проверяет разбор компании из ответа API HH.ru"""
+    company = Company.from_api(
+        "123",
+        {
+            "name": "Test Company",
+            "area": {"name": "Moscow"},
+            "open_vacancies": 10,
+            "industries": [{"name": "IT"}],
+            "alternate_url": "test.com",
+            "vacancies_url": "test.com/vac",
+        },
+    )
+
+    assert company["id"] == "123"
+    assert company["url"] == "test.com"
+    assert Company.coerce(company) is company
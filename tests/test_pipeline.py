@@ -0,0 +1,104 @@
+import threading
+from unittest.mock import patch
+
+import pytest
+
+from src import pipeline
+from src.models import Company, Vacancy
+
+
+def _batches(employer_id: str, full: bool = True, run_dir: str | None = None, checkpoint=None):
+    """Имитация iter_employer_vacancies: две страницы по одной вакансии"""
+    company = Company(employer_id, f"Company {employer_id}", "Москва", 2, [], "https://hh.ru", "https://api.hh.ru")
+    for page in range(2):
+        vacancy_id = f"{employer_id}-{page}"
+        yield company, [Vacancy(vacancy_id, "Python", "Москва", 1, 2, "RUR", "2025-06-01", "", f"url/{vacancy_id}")]
+
+
+def test_run_pipeline_writes_all_batches() -> None:
+    """Проверяет, что все страницы всех работодателей передаются потребителю, и БД пересоздаётся до записи"""
+    calls = []
+    written = []
+
+    def consume(stream, database_name, params) -> None:
+        calls.append("save")
+        for company, vacancies in stream:
+            written.extend(vacancy.id for vacancy in vacancies)
+
+    with (
+        patch("src.pipeline.iter_employer_vacancies", side_effect=_batches),
+        patch("src.pipeline.create_database", side_effect=lambda *args: calls.append("create")),
+        patch("src.pipeline.save_stream_to_database", side_effect=consume),
+    ):
+        pipeline.run_pipeline(["1", "2", "3"], "test_db", {}, workers=2, queue_size=1)
+
+    assert calls == ["create", "save"]
+    assert sorted(written) == ["1-0", "1-1", "2-0", "2-1", "3-0", "3-1"]
+
+
+def test_run_pipeline_bounded_queue() -> None:
+    """Проверяет, что производители не опережают запись больше, чем на размер очереди"""
+    produced = []
+    lock = threading.Lock()
+
+    def batches(employer_id: str, full: bool = True, run_dir: str | None = None, checkpoint=None):
+        for batch in _batches(employer_id):
+            with lock:
+                produced.append(employer_id)
+            yield batch
+
+    def consume(stream, database_name, params) -> None:
+        iterator = iter(stream)
+        next(iterator)
+        # Ждём, пока производители заполнят очередь
+        threading.Event().wait(0.5)
+        # Одна страница прочитана, queue_size в очереди и по одной у каждого ожидающего производителя
+        assert len(produced) <= 1 + 2 + 2
+        for _ in iterator:
+            pass
+
+    with (
+        patch("src.pipeline.iter_employer_vacancies", side_effect=batches),
+        patch("src.pipeline.create_database"),
+        patch("src.pipeline.save_stream_to_database", side_effect=consume),
+    ):
+        pipeline.run_pipeline([str(n) for n in range(10)], "test_db", {}, workers=2, queue_size=2)
+
+    assert len(produced) == 20
+
+
+def test_run_pipeline_producer_error() -> None:
+    """Проверяет, что ошибка получения данных передаётся потребителю, а потоки завершаются"""
+
+    def batches(employer_id: str, full: bool = True, run_dir: str | None = None, checkpoint=None):
+        if employer_id == "2":
+            raise RuntimeError("HH недоступен")
+        yield from _batches(employer_id)
+
+    def consume(stream, database_name, params) -> None:
+        for _ in stream:
+            pass
+
+    with (
+        patch("src.pipeline.iter_employer_vacancies", side_effect=batches),
+        patch("src.pipeline.create_database"),
+        patch("src.pipeline.save_stream_to_database", side_effect=consume),
+        pytest.raises(RuntimeError, match="HH недоступен"),
+    ):
+        pipeline.run_pipeline(["1", "2", "3"], "test_db", {}, workers=1)
+
+
+def test_run_pipeline_consumer_error() -> None:
+    """Проверяет, что при ошибке записи производители останавливаются и не блокируются на заполненной очереди"""
+
+    def consume(stream, database_name, params) -> None:
+        next(iter(stream))
+        raise RuntimeError("ошибка БД")
+
+    with (
+        patch("src.pipeline.iter_employer_vacancies", side_effect=_batches),
+        patch("src.pipeline.create_database"),
+        patch("src.pipeline.save_stream_to_database", side_effect=consume),
+        pytest.raises(RuntimeError, match="ошибка БД"),
+    ):
+        pipeline.run_pipeline([str(n) for n in range(20)], "test_db", {}, workers=4, queue_size=1)
@@ -0,0 +1,75 @@
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from src import rate_limit
+from src.rate_limit import RateLimiter
+from src.transport import get_json
+
+
+class FakeClock:
+    """Часы для time.monotonic и time.sleep: время идёт только при ожидании"""
+
+    def __init__(self) -> None:
+        self.now = 1000.0
+        self.slept: list[float] = []
+
+    def monotonic(self) -> float:
+        return self.now
+
+    def sleep(self, seconds: float) -> None:
+        self.slept.append(seconds)
+        self.now += seconds
+
+
+def test_rate_limiter_paces_requests() -> None:
+    """Проверяет, что после исчерпания запаса запросы распределяются с заданной частотой"""
+    clock = FakeClock()
+    with (
+        patch("src.rate_limit.time.monotonic", side_effect=clock.monotonic),
+        patch("src.rate_limit.time.sleep", side_effect=clock.sleep),
+    ):
+        limiter = RateLimiter(rate=50, burst=1)
+        for _ in range(6):
+            limiter.acquire()
+
+    assert clock.slept == pytest.approx([0.02] * 5)
+    assert clock.now - 1000.0 == pytest.approx(0.1)
+    assert limiter.stats()["waits"] == 5
+
+
+def test_rate_limiter_aimd() -> None:
+    """Проверяет увеличение частоты после успешных ответов и уменьшение после 429"""
+    limiter = RateLimiter(rate=10, min_rate=1, max_rate=40)
+    for _ in range(10):
+        limiter.on_success(0.1)
+    assert limiter.rate == 20  # медленный старт: удвоение
+
+    limiter.on_throttle()
+    limiter.on_throttle()  # повторный 429 в пределах DECREASE_COOLDOWN не уменьшает частоту
+    assert limiter.rate == 10
+    assert limiter.stats()["throttled"] == 1
+
+    for _ in range(10):
+        limiter.on_success(0.1)
+    assert 10.9 < limiter.rate < 11
+
+
+def test_get_json_reports_throttle() -> None:
+    """Проверяет, что ответ 429 снижает частоту запросов общего ограничителя"""
+    throttled = MagicMock(status_code=429, headers={"Retry-After": "0"})
+    ok = MagicMock(status_code=200, headers={})
+    ok.json.return_value = {"items": []}
+
+    enabled = rate_limit.ENABLED
+    rate_limit.enable()
+    limiter = rate_limit.configure(rate=10)
+    try:
+        with patch("requests.Session.get", side_effect=[throttled, ok]), patch("time.sleep"):
+            assert get_json("https://api.hh.ru/vacancies") == {"items": []}
+    finally:
+        rate_limit.configure()
+        rate_limit.ENABLED = enabled
+
+    assert limiter.stats()["throttled"] == 1
+    assert limiter.rate < 10
@@ -0,0 +1,48 @@
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from src.transport import HHApiError, get_json
+
+
+def make_response(status_code: int, data: dict | None = None, headers: dict | None = None) -> MagicMock:
+    response = MagicMock(status_code=status_code, headers=headers or {})
+    response.json.return_value = data
+    return response
+
+
+def test_get_json_retries_with_retry_after() -> None:
+    """Проверяет повтор запроса после 429 с учётом заголовка Retry-After"""
+    responses = [make_response(429, headers={"Retry-After": "2"}), make_response(200, {"items": []})]
+    with patch("requests.Session.get", side_effect=responses), patch("time.sleep") as mock_sleep:
+        result = get_json("https://api.hh.ru/vacancies")
+
+    assert result == {"items": []}
+    mock_sleep.assert_called_once_with(2.0)
+
+
+def test_get_json_retries_invalid_json() -> None:
+    """Проверяет повтор запроса при некорректном теле ответа"""
+    bad_response = make_response(200)
+    bad_response.json.side_effect = ValueError("Expecting value")
+    with (
+        patch("requests.Session.get", side_effect=[bad_response, make_response(200, {"name": "Test"})]),
+        patch("time.sleep"),
+    ):
+        assert get_json("https://api.hh.ru/employers/1") == {"name": "Test"}
+
+
+def test_get_json_client_error_is_not_retried() -> None:
+    """Проверяет, что ошибки 4xx (кроме 429) не повторяются"""
+    with patch("requests.Session.get", return_value=make_response(404)) as mock_get, patch("time.sleep"):
+        with pytest.raises(HHApiError):
+            get_json("https://api.hh.ru/employers/0")
+    assert mock_get.call_count == 1
+
+
+def test_get_json_gives_up_after_max_retries() -> None:
+    """Проверяет ограничение количества повторов"""
+    with patch("requests.Session.get", return_value=make_response(503)) as mock_get, patch("time.sleep"):
+        with pytest.raises(HHApiError):
+            get_json("https://api.hh.ru/vacancies")
+    assert mock_get.call_count == 6